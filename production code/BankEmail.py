@@ -1,6 +1,9 @@
 import smtplib
 import os
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from html import escape
 
 # Read environment variables. Make sure to enter these in your system before hand.
 SENDER_EMAIL = os.environ.get("EMAIL_USER")
@@ -54,6 +57,53 @@ def send_alert_email(to_email, subject, body):
         print("Email sending failed:", e)
         return False
     
+#Statement email with charts shown inline. images maps a content ID (e.g. the chart name) to the
+#image bytes and mimetype, as chartRenderer.render_statement_charts returns them. Mail clients that
+#only show text still get the plain body.
+def build_statement_message(to_email, subject, body, images):
+    msg = MIMEMultipart('related')
+    msg['Subject'] = subject
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = to_email
+
+    text = escape(body).replace("\n", "<br>")
+    html = f"<p>{text}</p>"
+    for cid in images:
+        html += f'<p><img src="cid:{cid}" alt="{escape(cid.replace("_", " "))}"></p>'
+    alternative = MIMEMultipart('alternative')
+    alternative.attach(MIMEText(body))
+    alternative.attach(MIMEText(f"<html><body>{html}</body></html>", 'html'))
+    msg.attach(alternative)
+
+    for cid, (image, mimetype) in images.items():
+        subtype = mimetype.split('/')[1]
+        part = MIMEImage(image, _subtype=subtype)
+        part.add_header('Content-ID', f"<{cid}>")
+        part.add_header('Content-Disposition', 'inline', filename=f"{cid}.{subtype.split('+')[0]}")
+        msg.attach(part)
+    return msg
+
+#Function to send a statement email with embedded charts to the user.
+def send_statement_email(to_email, subject, body, images):
+    if not SENDER_EMAIL or not SENDER_PASSWORD:
+        print("Missing email environment variables.")
+        return False
+
+    msg = build_statement_message(to_email, subject, body, images)
+
+    try:
+        server = smtplib.SMTP("smtp.gmail.com", 587)
+        server.starttls()
+        server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        server.send_message(msg)
+        server.quit()
+        print("Statement email sent!")
+        return True
+
+    except Exception as e:
+        print("Email sending failed:", e)
+        return False
+
 #Making sure the email and app password are set.
 if __name__ == "__main__":
     print("EMAIL_USER =", SENDER_EMAIL)
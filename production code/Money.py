@@ -1,20 +1,36 @@
+import base64
+from bisect import bisect_left, bisect_right
+from calendar import monthrange
 from datetime import date, datetime, timedelta
 from enum import Enum
-from typing import List, Optional, Tuple
+import json
+import sys
+import threading
+from concurrency import ReadWriteLock, reads, writes
+from downsample import downsample
+from typing import Dict, Iterator, List, Optional, Tuple
 
 class ExpenseType(Enum):
     FIXED = "fixed"
     VARIABLE = "variable"
 
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+#Slotted record: no per-instance __dict__, the amount is kept as integer cents and
+#payee/userID strings are interned so repeated merchants share one string object.
 class Transaction:
+    __slots__ = ('transactionID', 'userID', 'totalCents', 'date', 'payee', 'categoryID', 'notes',
+                 'isRecurring', 'dateRecurr', 'expenseType', 'isTaxRelated', 'isTravelRelated')
+
     def __init__ (self, transactionID: int, userID: str, total: float, date: date, 
                   payee: str, categoryID: int, notes: str = "", isRecurring: bool = False, 
                   dateRecurr: date = None, expenseType: ExpenseType = None, isTaxRelated: bool = False, isTravelRelated: bool = False):
         self.transactionID = transactionID
-        self.userID = userID
+        self.userID = _intern(userID)
         self.total = total
         self.date = date
-        self.payee = payee
+        self.payee = _intern(payee)
         self.categoryID = categoryID
         self.notes = notes
         self.isRecurring = isRecurring
@@ -23,6 +39,13 @@ class Transaction:
         self.isTaxRelated = isTaxRelated
         self.isTravelRelated = isTravelRelated
 
+    @property
+    def total(self) -> float:
+        return self.totalCents / 100
+    @total.setter
+    def total(self, total: float):
+        self.totalCents = round(total * 100)
+
     #getters
     def get_transactionID(self):
         return self.transactionID
@@ -49,13 +72,13 @@ class Transaction:
     def set_transactionID(self, transactionID):
         self.transactionID = transactionID
     def set_userID(self, userID):
-        self.userID = userID
+        self.userID = _intern(userID)
     def set_total (self, total):
         self.total = total
     def set_date (self, date):
         self.date = date
     def set_payee (self, payee):
-        self.payee = payee
+        self.payee = _intern(payee)
     def set_categoryID (self, categoryID):
         self.categoryID = categoryID
     def set_notes (self, notes):
@@ -89,7 +112,7 @@ class Transaction:
                          categoryID: int = None, notes: str = None, expenseType: ExpenseType = None):
         if total: self.total = total
         if date: self.date = date
-        if payee: self.payee = payee
+        if payee: self.payee = _intern(payee)
         if categoryID: self.categoryID = categoryID
         if notes: self.notes = notes
         if expenseType: self.expenseType = expenseType
@@ -115,27 +138,609 @@ class Transaction:
 
 
 
-class TransactionManager:
+#Materialized spending totals and counts keyed by (user, category, expense type) within each month,
+#plus running per-category and per-expense-type totals. Updated in O(1) per added or removed transaction.
+#Totals are kept in integer cents so repeated edits and deletes never drift.
+class SpendingRollup:
+    def __init__(self):
+        self.cells: Dict[Tuple[int, int], Dict[tuple, List]] = {}
+        self.categoryTotals: Dict[int, List] = {}
+        self.expenseTypeTotals: Dict[Optional[ExpenseType], List] = {}
+
+    @staticmethod
+    def _apply(table: dict, key, amount: float, count: int):
+        cell = table.get(key)
+        if cell is None:
+            cell = table[key] = [0, 0]
+        cell[0] += amount
+        cell[1] += count
+        if cell[1] == 0:
+            del table[key]
+
+    def add(self, userID: str, categoryID: int, expenseType: Optional[ExpenseType], month: Tuple[int, int], amount: int):
+        self._apply(self.cells.setdefault(month, {}), (userID, categoryID, expenseType), amount, 1)
+        self._apply(self.categoryTotals, categoryID, amount, 1)
+        self._apply(self.expenseTypeTotals, expenseType, amount, 1)
+
+    def remove(self, userID: str, categoryID: int, expenseType: Optional[ExpenseType], month: Tuple[int, int], amount: int):
+        monthCells = self.cells.get(month)
+        if monthCells is None:
+            return
+        self._apply(monthCells, (userID, categoryID, expenseType), -amount, -1)
+        if not monthCells:
+            del self.cells[month]
+        self._apply(self.categoryTotals, categoryID, -amount, -1)
+        self._apply(self.expenseTypeTotals, expenseType, -amount, -1)
+
+    #(month, cells) for every month with spending, in order; months are inclusive (year, month) pairs
+    def iter_months(self, firstMonth: Tuple[int, int], lastMonth: Tuple[int, int]):
+        for index in range(firstMonth[0] * 12 + firstMonth[1] - 1, lastMonth[0] * 12 + lastMonth[1]):
+            year, monthIndex = divmod(index, 12)
+            monthCells = self.cells.get((year, monthIndex + 1))
+            if monthCells:
+                yield (year, monthIndex + 1), monthCells
+
+    def get_spending_by_category(self, firstMonth: Tuple[int, int], lastMonth: Tuple[int, int],
+                                 userID: str = None) -> dict:
+        category_cents = {}
+        for month, monthCells in self.iter_months(firstMonth, lastMonth):
+            for (cellUser, categoryID, expenseType), (cents, count) in monthCells.items():
+                if userID is None or cellUser == userID:
+                    category_cents[categoryID] = category_cents.get(categoryID, 0) + cents
+        return {categoryID: cents / 100 for categoryID, cents in category_cents.items()}
+
+    def get_category_total(self, categoryID: int) -> Tuple[float, int]:
+        cents, count = self.categoryTotals.get(categoryID, (0, 0))
+        return cents / 100, count
+
+    def get_expense_type_total(self, expenseType: Optional[ExpenseType]) -> Tuple[float, int]:
+        cents, count = self.expenseTypeTotals.get(expenseType, (0, 0))
+        return cents / 100, count
+
+#Splits a date range into the whole months it covers, as inclusive (year, month) pairs (both None when
+#it covers none), and the partial months before and after them as (start, end) ranges or None.
+def split_whole_months(start_date: date, end_date: date) -> tuple:
+    firstIndex = start_date.year * 12 + start_date.month - (1 if start_date.day == 1 else 0)
+    lastIndex = end_date.year * 12 + end_date.month - 1
+    if end_date.day != monthrange(end_date.year, end_date.month)[1]:
+        lastIndex -= 1
+    if firstIndex > lastIndex:
+        return None, None, (start_date, end_date), None
+
+    firstMonth = (firstIndex // 12, firstIndex % 12 + 1)
+    lastMonth = (lastIndex // 12, lastIndex % 12 + 1)
+    head = tail = None
+    if start_date.day != 1:
+        head = (start_date, date(firstMonth[0], firstMonth[1], 1) - timedelta(days=1))
+    if lastIndex != end_date.year * 12 + end_date.month - 1:
+        tail = (date(end_date.year, end_date.month, 1), end_date)
+    return firstMonth, lastMonth, head, tail
+
+
+#Bucket number of a date at each series resolution. Weeks start on Monday (ordinal 1 is a Monday).
+SERIES_BUCKETS = {
+    'day': lambda day: day.toordinal(),
+    'week': lambda day: (day.toordinal() - 1) // 7,
+    'month': lambda day: day.year * 12 + day.month - 1,
+}
+
+#first day of a bucket
+SERIES_STARTS = {
+    'day': lambda bucket: date.fromordinal(bucket),
+    'week': lambda bucket: date.fromordinal(bucket * 7 + 1),
+    'month': lambda bucket: date(bucket // 12, bucket % 12 + 1, 1),
+}
+
+#Spending in cents per bucket (day, week or month), per user and over all users, updated as
+#transactions are added and removed. Any window of a trend is a slice of consecutive buckets.
+class SpendingSeries:
+    def __init__(self, resolution: str):
+        self.resolution = resolution
+        self.bucketOf = SERIES_BUCKETS[resolution]
+        self.userBuckets: Dict[str, Dict[int, int]] = {}
+        self.totals: Dict[int, int] = {}
+
+    @staticmethod
+    def _apply(buckets: Dict[int, int], bucket: int, cents: int):
+        cents += buckets.get(bucket, 0)
+        if cents:
+            buckets[bucket] = cents
+        else:
+            buckets.pop(bucket, None)
+
+    def add(self, userID: str, day: date, cents: int):
+        bucket = self.bucketOf(day)
+        self._apply(self.userBuckets.setdefault(userID, {}), bucket, cents)
+        self._apply(self.totals, bucket, cents)
+
+    def remove(self, userID: str, day: date, cents: int):
+        bucket = self.bucketOf(day)
+        userBuckets = self.userBuckets.get(userID)
+        if userBuckets is not None:
+            self._apply(userBuckets, bucket, -cents)
+            if not userBuckets:
+                del self.userBuckets[userID]
+        self._apply(self.totals, bucket, -cents)
+
+    #cents for every bucket from the one holding start_date to the one holding end_date, empty ones included
+    def get_range(self, start_date: date, end_date: date, userID: str = None) -> Tuple[range, List[int]]:
+        buckets = self.totals if userID is None else self.userBuckets.get(userID, {})
+        bucketRange = range(self.bucketOf(start_date), self.bucketOf(end_date) + 1)
+        return bucketRange, [buckets.get(bucket, 0) for bucket in bucketRange]
+
+
+#Keys kept sorted with the matching transactions in a parallel list, so a key range is two binary
+#searches and one slice, and the N highest keys are one slice off the end.
+class SortedIndex:
+    __slots__ = ('keys', 'items')
+
+    def __init__(self):
+        self.keys: List[tuple] = []
+        self.items: List[Transaction] = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def insert(self, key: tuple, transaction: Transaction):
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.items.insert(position, transaction)
+
+    def remove(self, key: tuple) -> bool:
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            del self.keys[position]
+            del self.items[position]
+            return True
+        return False
+
+    #Merges a batch with one pass over the existing keys, copying the runs between insertion points
+    #as slices, instead of shifting the whole list once per row.
+    def merge(self, entries: List[Tuple[tuple, Transaction]]):
+        entries.sort(key=lambda entry: entry[0])
+        keys = []
+        items = []
+        previous = 0
+        for key, transaction in entries:
+            position = bisect_right(self.keys, key, previous)
+            keys += self.keys[previous:position]
+            items += self.items[previous:position]
+            keys.append(key)
+            items.append(transaction)
+            previous = position
+        keys += self.keys[previous:]
+        items += self.items[previous:]
+        self.keys = keys
+        self.items = items
+
+    #transactions with low <= key < high, in key order
+    def range(self, low: tuple, high: tuple) -> List[Transaction]:
+        return self.items[bisect_left(self.keys, low):bisect_left(self.keys, high)]
+
+    #the count transactions with the highest keys, highest first
+    def last(self, count: int) -> List[Transaction]:
+        if count <= 0:
+            return []
+        return self.items[:-count - 1:-1]
+
+    #Keyset paging: up to limit transactions after the key `after` in the requested direction, plus
+    #the key to continue from (None on the last page). Costs the same on every page.
+    def page(self, limit: int, after: tuple = None, descending: bool = False) -> Tuple[List[Transaction], Optional[tuple]]:
+        if descending:
+            end = len(self.keys) if after is None else bisect_left(self.keys, after)
+            start = max(0, end - limit)
+            return self.items[start:end][::-1], self.keys[start] if start > 0 else None
+        start = 0 if after is None else bisect_right(self.keys, after)
+        end = start + limit
+        return self.items[start:end], self.keys[end - 1] if end < len(self.keys) else None
+
+#Sort keys for the per-user sort indexes, built from the tuple returned by
+#TransactionStore._index_keys. The transactionID comes last so every key is unique.
+SORT_KEYS = {
+    'amount': lambda keys, transactionID: (keys[6], transactionID),
+    'payee': lambda keys, transactionID: ((keys[7] or '').casefold(), transactionID),
+    'category': lambda keys, transactionID: (keys[1], keys[5], transactionID),
+}
+SORT_FIELDS = ('date',) + tuple(SORT_KEYS)
+
+
+#Hash index on transactionID plus secondary indexes, kept in sync on add/edit/delete.
+#Each secondary index maps a key to a {transactionID: Transaction} bucket so removal is O(1).
+class TransactionStore:
     def __init__(self):
         self.transactions: List[Transaction] = []
-    def add_transaction(self, transaction: Transaction):
+        self.byID: Dict[int, Transaction] = {}
+        #index of each transaction in self.transactions, so a delete swaps in the last one instead of
+        #shifting the list (the list is therefore in insertion order only until the first delete)
+        self.positions: Dict[int, int] = {}
+        self.byUser: Dict[str, Dict[int, Transaction]] = {}
+        self.byCategory: Dict[int, Dict[int, Transaction]] = {}
+        self.byExpenseType: Dict[Optional[ExpenseType], Dict[int, Transaction]] = {}
+        self.taxRelated: Dict[int, Transaction] = {}
+        self.travelRelated: Dict[int, Transaction] = {}
+        #(date ordinal, transactionID) indexes over every transaction and over each user's own,
+        #so date ranges and a user's most recent transactions never need a sort
+        self.byDate = SortedIndex()
+        self.userDates: Dict[str, SortedIndex] = {}
+        #per-user indexes for the other SORT_KEYS orders, built on first use and maintained from then on
+        self.userSortIndexes: Dict[str, Dict[str, SortedIndex]] = {}
+        self.sortIndexLock = threading.Lock()
+        #per-user change counters, bumped by every write that touches one of the user's transactions
+        self.userVersions: Dict[str, int] = {}
+        #bumped together with any user's counter, for results that cover every user in the store
+        self.version = 0
+        #set by add_many so index entries are merged once per batch instead of inserted one by one
+        self.pendingEntries: Optional[Dict[SortedIndex, List[Tuple[tuple, Transaction]]]] = None
+        self.rollup = SpendingRollup()
+        #spending per resolution; months are always kept, weeks and days from their first use on
+        self.series: Dict[str, SpendingSeries] = {'month': SpendingSeries('month')}
+        #keys each transaction was indexed under, so edits can be diffed without the caller
+        self.indexedKeys: Dict[int, tuple] = {}
+
+    def __len__(self):
+        return len(self.byID)
+
+    def _index_keys(self, transaction: Transaction) -> tuple:
+        return (transaction.userID, transaction.categoryID, transaction.expenseType,
+                transaction.isTaxRelated, transaction.isTravelRelated, transaction.date.toordinal(),
+                transaction.totalCents, transaction.payee)
+
+    def _link(self, transaction: Transaction, keys: tuple):
+        transactionID = transaction.transactionID
+        userID, categoryID, expenseType, isTaxRelated, isTravelRelated, dateOrdinal, totalCents, payee = keys
+
+        self.byUser.setdefault(userID, {})[transactionID] = transaction
+        self.touch(userID)
+        self.byCategory.setdefault(categoryID, {})[transactionID] = transaction
+        self.byExpenseType.setdefault(expenseType, {})[transactionID] = transaction
+        if isTaxRelated:
+            self.taxRelated[transactionID] = transaction
+        if isTravelRelated:
+            self.travelRelated[transactionID] = transaction
+        #one key tuple is shared by both date indexes
+        dateKey = (dateOrdinal, transactionID)
+        userDates = self.userDates.get(userID)
+        if userDates is None:
+            userDates = self.userDates[userID] = SortedIndex()
+        if self.pendingEntries is not None:
+            self.pendingEntries.setdefault(self.byDate, []).append((dateKey, transaction))
+            self.pendingEntries.setdefault(userDates, []).append((dateKey, transaction))
+        else:
+            self.byDate.insert(dateKey, transaction)
+            userDates.insert(dateKey, transaction)
+        sortIndexes = self.userSortIndexes.get(userID)
+        if sortIndexes:
+            for field, index in sortIndexes.items():
+                sortKey = SORT_KEYS[field](keys, transactionID)
+                if self.pendingEntries is not None:
+                    self.pendingEntries.setdefault(index, []).append((sortKey, transaction))
+                else:
+                    index.insert(sortKey, transaction)
+        self.rollup.add(userID, categoryID, expenseType, (transaction.date.year, transaction.date.month), totalCents)
+        for series in self.series.values():
+            series.add(userID, transaction.date, totalCents)
+        self.indexedKeys[transactionID] = keys
+
+    def _unlink(self, transaction: Transaction, keys: tuple):
+        transactionID = transaction.transactionID
+        userID, categoryID, expenseType, isTaxRelated, isTravelRelated, dateOrdinal, totalCents, payee = keys
+
+        self._discard(self.byUser, userID, transactionID)
+        self.touch(userID)
+        self._discard(self.byCategory, categoryID, transactionID)
+        self._discard(self.byExpenseType, expenseType, transactionID)
+        self.taxRelated.pop(transactionID, None)
+        self.travelRelated.pop(transactionID, None)
+        dateKey = (dateOrdinal, transactionID)
+        self.byDate.remove(dateKey)
+        userDates = self.userDates.get(userID)
+        if userDates is not None:
+            userDates.remove(dateKey)
+            if not userDates:
+                del self.userDates[userID]
+        sortIndexes = self.userSortIndexes.get(userID)
+        if sortIndexes:
+            for field, index in sortIndexes.items():
+                index.remove(SORT_KEYS[field](keys, transactionID))
+            if userID not in self.userDates:
+                del self.userSortIndexes[userID]
+        day = date.fromordinal(dateOrdinal)
+        self.rollup.remove(userID, categoryID, expenseType, (day.year, day.month), totalCents)
+        for series in self.series.values():
+            series.remove(userID, day, totalCents)
+
+    def touch(self, userID: str):
+        self.userVersions[userID] = self.userVersions.get(userID, 0) + 1
+        self.version += 1
+
+    def get_version(self, userID: str = None) -> int:
+        return self.version if userID is None else self.userVersions.get(userID, 0)
+
+    @staticmethod
+    def _discard(index: dict, key, transactionID: int):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(transactionID, None)
+            if not bucket:
+                del index[key]
+
+    def add(self, transaction: Transaction):
+        if transaction.transactionID in self.byID:
+            raise ValueError(f"Transaction with ID {transaction.transactionID} already exists")
+        self.positions[transaction.transactionID] = len(self.transactions)
         self.transactions.append(transaction)
+        self.byID[transaction.transactionID] = transaction
+        self._link(transaction, self._index_keys(transaction))
+
+    def add_many(self, transactions: List[Transaction]):
+        self.pendingEntries = {}
+        try:
+            for transaction in transactions:
+                self.add(transaction)
+        finally:
+            pending, self.pendingEntries = self.pendingEntries, None
+            for index, entries in pending.items():
+                index.merge(entries)
+
+    def remove(self, transactionID: int) -> Optional[Transaction]:
+        transaction = self.byID.pop(transactionID, None)
+        if transaction is None:
+            return None
+        self._unlink(transaction, self.indexedKeys.pop(transactionID))
+        position = self.positions.pop(transactionID)
+        last = self.transactions.pop()
+        if last is not transaction:
+            self.transactions[position] = last
+            self.positions[last.transactionID] = position
+        return transaction
+
+    def reindex(self, transaction: Transaction):
+        oldKeys = self.indexedKeys[transaction.transactionID]
+        newKeys = self._index_keys(transaction)
+        if oldKeys != newKeys:
+            self._unlink(transaction, oldKeys)
+            self._link(transaction, newKeys)
+
+    def get(self, transactionID: int) -> Optional[Transaction]:
+        return self.byID.get(transactionID)
+    def get_by_user(self, userID: str) -> List[Transaction]:
+        return list(self.byUser.get(userID, {}).values())
+    def get_by_category(self, categoryID: int) -> List[Transaction]:
+        return list(self.byCategory.get(categoryID, {}).values())
+    def get_by_expense_type(self, expenseType: Optional[ExpenseType]) -> List[Transaction]:
+        return list(self.byExpenseType.get(expenseType, {}).values())
+    def get_tax_related(self) -> List[Transaction]:
+        return list(self.taxRelated.values())
+    def get_travel_related(self) -> List[Transaction]:
+        return list(self.travelRelated.values())
+    def get_date_range(self, start_date: date, end_date: date) -> List[Transaction]:
+        return self.byDate.range((start_date.toordinal(),), (end_date.toordinal() + 1,))
+    #newest first; transactions on the same day come newest ID first
+    def get_recent_by_user(self, userID: str, limit: int) -> List[Transaction]:
+        userDates = self.userDates.get(userID)
+        return userDates.last(limit) if userDates is not None else []
+    #A user's transactions ordered by one of SORT_FIELDS. Only the date index always exists; the
+    #others are built the first time a user sorts by them, under a lock since that can happen
+    #from several reading threads at once.
+    def get_sort_index(self, userID: str, field: str) -> Optional[SortedIndex]:
+        if field == 'date':
+            return self.userDates.get(userID)
+        index = self.userSortIndexes.get(userID, {}).get(field)
+        if index is None and userID in self.byUser:
+            with self.sortIndexLock:
+                sortIndexes = self.userSortIndexes.setdefault(userID, {})
+                index = sortIndexes.get(field)
+                if index is None:
+                    index = SortedIndex()
+                    index.merge([(SORT_KEYS[field](self.indexedKeys[transactionID], transactionID), transaction)
+                                 for transactionID, transaction in self.byUser[userID].items()])
+                    sortIndexes[field] = index
+        return index
+    #Built from the indexed keys on first use, like the sort indexes
+    def get_series(self, resolution: str) -> SpendingSeries:
+        if resolution not in SERIES_BUCKETS:
+            raise ValueError(f"Unknown series resolution {resolution}; use one of {', '.join(SERIES_BUCKETS)}")
+        series = self.series.get(resolution)
+        if series is None:
+            with self.sortIndexLock:
+                series = self.series.get(resolution)
+                if series is None:
+                    series = SpendingSeries(resolution)
+                    for keys in self.indexedKeys.values():
+                        series.add(keys[0], date.fromordinal(keys[5]), keys[6])
+                    self.series[resolution] = series
+        return series
+    def get_user_page(self, userID: str, field: str, limit: int, after: tuple = None,
+                      descending: bool = False) -> Tuple[List[Transaction], Optional[tuple]]:
+        index = self.get_sort_index(userID, field)
+        if index is None:
+            return [], None
+        return index.page(limit, after, descending)
+
+    #Aggregation kernels. TransactionManager routes its summaries through these so a store
+    #backend (e.g. columnarStore.ColumnarTransactionStore) can replace them.
+    def get_spending_by_category(self, start_date: date, end_date: date) -> dict:
+        #Whole months inside the period come from the rollup; only the partial months at either end
+        #are summed from the date index.
+        firstMonth, lastMonth, head, tail = split_whole_months(start_date, end_date)
+        category_spending = self.rollup.get_spending_by_category(firstMonth, lastMonth) if firstMonth else {}
+        for partial in (head, tail):
+            if partial is not None:
+                self._sum_spending_by_category(category_spending, self.get_date_range(*partial))
+        return category_spending
+
+    def _sum_spending_by_category(self, category_spending: dict, transactions: List[Transaction]) -> dict:
+        for transaction in transactions:
+            cat_id = transaction.categoryID
+            if cat_id not in category_spending:
+                category_spending[cat_id] = 0.0
+            category_spending[cat_id] += transaction.total
+        
+        return category_spending
+
+    #{expenseType or None: (total, count)} over every stored transaction
+    def get_expense_type_totals(self) -> dict:
+        return {expenseType: self.rollup.get_expense_type_total(expenseType)
+                for expenseType in (ExpenseType.FIXED, ExpenseType.VARIABLE, None)}
+
+    #{categoryID: (total, count)} for tax-related (flag='tax') or travel-related (flag='travel') transactions
+    def get_flagged_totals_by_category(self, flag: str, start_date: date = None, end_date: date = None) -> dict:
+        flagged = self.taxRelated if flag == 'tax' else self.travelRelated
+        category_totals = {}
+        for transaction in flagged.values():
+            if start_date and end_date and not start_date <= transaction.date <= end_date:
+                continue
+            cents, count = category_totals.get(transaction.categoryID, (0, 0))
+            category_totals[transaction.categoryID] = (cents + transaction.totalCents, count + 1)
+        return {categoryID: (cents / 100, count) for categoryID, (cents, count) in category_totals.items()}
+
+
+#Central source of transaction IDs. IDs only ever increase, so they are never reused after a
+#delete, and callers no longer derive them from len(transactions). The critical section is a
+#couple of integer operations, so request threads contend for nanoseconds at most.
+class TransactionIDAllocator:
+    def __init__(self, start: int = 1):
+        self._lock = threading.Lock()
+        self._next = start
+
+    #Starts after the highest ID already stored, e.g. TransactionDB.get_max_transaction_id()
+    @classmethod
+    def from_database(cls, transactionDB) -> 'TransactionIDAllocator':
+        return cls((transactionDB.get_max_transaction_id() or 0) + 1)
+
+    def next_id(self) -> int:
+        with self._lock:
+            transactionID = self._next
+            self._next += 1
+        return transactionID
+
+    #Reserves a contiguous block of IDs, e.g. one block per bulk import chunk
+    def reserve(self, count: int) -> range:
+        with self._lock:
+            first = self._next
+            self._next += count
+        return range(first, first + count)
+
+    #Moves past an ID that was assigned elsewhere (sample data, database rows, ...)
+    def observe(self, transactionID: int):
+        if transactionID < self._next:
+            return
+        with self._lock:
+            if transactionID >= self._next:
+                self._next = transactionID + 1
+
+    def peek(self) -> int:
+        return self._next
+
+
+class TransactionManager:
+    def __init__(self, store: TransactionStore = None, idAllocator: TransactionIDAllocator = None):
+        self.store = store if store is not None else TransactionStore()
+        self.transactions: List[Transaction] = self.store.transactions
+        self.idAllocator = idAllocator if idAllocator is not None else TransactionIDAllocator()
+        #readers share the store, writers get it to themselves; see concurrency.ReadWriteLock
+        self.lock = ReadWriteLock()
+    def next_transaction_id(self) -> int:
+        return self.idAllocator.next_id()
+    def reserve_transaction_ids(self, count: int) -> range:
+        return self.idAllocator.reserve(count)
+    @writes
+    def add_transaction(self, transaction: Transaction):
+        self.store.add(transaction)
+        self.idAllocator.observe(transaction.transactionID)
+    @writes
+    def add_transactions(self, transactions: List[Transaction]):
+        self.store.add_many(transactions)
+        if transactions:
+            self.idAllocator.observe(max(t.transactionID for t in transactions))
+    @writes
+    def edit_transaction(self, transactionID: int, total: float = None, date: date = None, payee: str = None,
+                         categoryID: int = None, notes: str = None, expenseType: ExpenseType = None) -> bool:
+        transaction = self.store.get(transactionID)
+        if transaction is None:
+            return False
+        transaction.edit_transaction(total, date, payee, categoryID, notes, expenseType)
+        self.store.reindex(transaction)
+        #notes are not indexed, so reindex alone may not have bumped the version
+        self.store.touch(transaction.userID)
+        return True
+    @writes
+    def delete_transaction(self, transactionID: int) -> bool:
+        return self.store.remove(transactionID) is not None
+    #Call after changing an indexed field (category, flags, ...) on a transaction directly.
+    @writes
+    def reindex_transaction(self, transaction: Transaction):
+        self.store.reindex(transaction)
+        self.store.touch(transaction.userID)
+    #Changes whenever any of the user's transactions (or, with no userID, any transaction) is added,
+    #edited or deleted
+    def get_version(self, userID: str = None) -> int:
+        return self.store.get_version(userID)
+    @reads
     def get_transactions_by_expense_type(self, expenseType: ExpenseType) -> List[Transaction]:
-        return [t for t in self.transactions if t.expenseType == expenseType]
+        return self.store.get_by_expense_type(expenseType)
+    @reads
     def get_recent_transactions(self, userID: str, limit: int = 10) -> List[Transaction]:
-        userTransactions = [t for t in self.transactions if t.userID == userID]
-
-        userTransactions.sort(key=lambda t: t.date, reverse=True)
-        return userTransactions[:limit]
+        return self.store.get_recent_by_user(userID, limit)
+    #One page of a user's transactions sorted by a SORT_FIELDS field. Returns the page and an opaque
+    #cursor for the next one (None on the last page).
+    @reads
+    def get_transactions_page(self, userID: str, sort_by: str = 'date', descending: bool = True, limit: int = 50,
+                              cursor: str = None) -> Tuple[List[Transaction], Optional[str]]:
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort_by}; use one of {', '.join(SORT_FIELDS)}")
+        after = self.decode_cursor(cursor, sort_by, descending) if cursor else None
+        try:
+            transactions, nextKey = self.store.get_user_page(userID, sort_by, limit, after, descending)
+        except TypeError:
+            raise ValueError("Invalid cursor")
+        return transactions, self.encode_cursor(sort_by, descending, nextKey) if nextKey is not None else None
+    #Streams a user's transactions in date order, optionally limited to a date range, a category or
+    #the tax/travel flags (True for flagged only, False for unflagged only). The date index is walked
+    #chunkSize rows at a time by key, taking the read lock only while each chunk is fetched, so a
+    #long export uses constant memory and never holds writers off for more than one chunk.
+    def iter_transactions(self, userID: str, start_date: date = None, end_date: date = None, categoryID: int = None,
+                          taxRelated: bool = None, travelRelated: bool = None, chunkSize: int = 1000) -> Iterator[Transaction]:
+        after = (start_date.toordinal(),) if start_date else None
+        lastOrdinal = end_date.toordinal() if end_date else None
+        while True:
+            with self.lock.read_locked():
+                chunk, after = self.store.get_user_page(userID, 'date', chunkSize, after)
+            for transaction in chunk:
+                if lastOrdinal is not None and transaction.date.toordinal() > lastOrdinal:
+                    return
+                if categoryID is not None and transaction.categoryID != categoryID:
+                    continue
+                if taxRelated is not None and transaction.isTaxRelated != taxRelated:
+                    continue
+                if travelRelated is not None and transaction.isTravelRelated != travelRelated:
+                    continue
+                yield transaction
+            if after is None:
+                return
+    @staticmethod
+    def encode_cursor(sort_by: str, descending: bool, key: tuple) -> str:
+        payload = json.dumps([sort_by, descending, list(key)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    @staticmethod
+    def decode_cursor(cursor: str, sort_by: str, descending: bool) -> tuple:
+        try:
+            cursorSort, cursorDescending, key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            key = tuple(key)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if cursorSort != sort_by or cursorDescending != descending:
+            raise ValueError("Cursor was issued for a different sort order")
+        return key
+    @reads
     def get_transaction_by_id(self, transactionID: int) -> Optional[Transaction]:
-        for transaction in self.transactions:
-            if transaction.transactionID == transactionID:
-                return transaction
-        return None
+        return self.store.get(transactionID)
+    @reads
     def get_expense_type_summary(self) -> dict:
-        fixedTotal = sum(t.total for t in self.transactions if t.expenseType == ExpenseType.FIXED)
-        variableTotal = sum(t.total for t in self.transactions if t.expenseType == ExpenseType.VARIABLE)
-        untaggedTotal = sum(t.total for t in self.transactions if t.expenseType is None)
+        totals = self.store.get_expense_type_totals()
+        fixedTotal = totals[ExpenseType.FIXED][0]
+        variableTotal = totals[ExpenseType.VARIABLE][0]
+        untaggedTotal = totals[None][0]
 
         return{
             ExpenseType.FIXED: fixedTotal,
@@ -143,6 +748,7 @@ class TransactionManager:
             "untagged": untaggedTotal,
             "total_expenses": fixedTotal + variableTotal + untaggedTotal
         }
+    @reads
     def get_expense_type_breakdown(self, expenseType: ExpenseType = None) -> List[dict]:
         transactions = self.transactions
         if expenseType:
@@ -161,6 +767,7 @@ class TransactionManager:
                 'isRecurring': transaction.isRecurring
             })
         return breakdown
+    @reads
     def calculate_future_expenses(self, months: int = 3) -> dict:
         currentDate = date.today()
         futureExpenses = {}
@@ -189,51 +796,137 @@ class TransactionManager:
                 'total': monthlyFixed + avgVariable
             }
         return futureExpenses
-    def get_expense_type_stats(self) -> dict:
-        summary = self.get_expense_type_summary()
-        totalExpenses = summary['total_expenses']
+    #With no dates the amounts and counts come straight from the store's live per-expense-type
+    #counters; with a date range they come from one pass over that range.
+    @reads
+    def get_expense_type_stats(self, start_date: date = None, end_date: date = None) -> dict:
+        if start_date and end_date:
+            totals = self.scan_expense_type_totals(self.get_transactions_by_date_range(start_date, end_date))
+        else:
+            totals = self.store.get_expense_type_totals()
+
+        fixedAmount, fixedCount = totals[ExpenseType.FIXED]
+        variableAmount, variableCount = totals[ExpenseType.VARIABLE]
+        totalExpenses = fixedAmount + variableAmount + totals[None][0]
 
         if totalExpenses > 0:
-            fixedPercentage = (summary[ExpenseType.FIXED] / totalExpenses) * 100
-            variablePercentage = (summary[ExpenseType.VARIABLE] / totalExpenses) * 100
+            fixedPercentage = (fixedAmount / totalExpenses) * 100
+            variablePercentage = (variableAmount / totalExpenses) * 100
         else:
             fixedPercentage = variablePercentage = 0
         
         return {
-            'fixed_amount': summary[ExpenseType.FIXED],
-            'variable_amount': summary[ExpenseType.VARIABLE],
+            'fixed_amount': fixedAmount,
+            'variable_amount': variableAmount,
             'fixed_percentage': round(fixedPercentage, 2),
             'variable_percentage': round(variablePercentage, 2),
             'total_expenses': totalExpenses,
-            'fixed_count': len(self.get_transactions_by_expense_type(ExpenseType.FIXED)),
-            'variable_count': len(self.get_transactions_by_expense_type(ExpenseType.VARIABLE))
+            'fixed_count': fixedCount,
+            'variable_count': variableCount
         }
+
+    #Single-pass {expenseType or None: (total, count)} over any sequence of transactions
+    @staticmethod
+    def scan_expense_type_totals(transactions) -> dict:
+        cents = {ExpenseType.FIXED: 0, ExpenseType.VARIABLE: 0, None: 0}
+        counts = {ExpenseType.FIXED: 0, ExpenseType.VARIABLE: 0, None: 0}
+        for transaction in transactions:
+            cents[transaction.expenseType] += transaction.totalCents
+            counts[transaction.expenseType] += 1
+        return {expenseType: (cents[expenseType] / 100, counts[expenseType]) for expenseType in cents}
     
     #====Part of sprint 4 by Temka====
+    @reads
     def get_transactions_by_date_range(self, start_date: date, end_date: date) -> List[Transaction]:
-        return [t for t in self.transactions 
-                if start_date <= t.date <= end_date]
+        return self.store.get_date_range(start_date, end_date)
 
+    @reads
     def get_spending_by_category_period(self, start_date: date, end_date: date) -> dict:
-        transactions = self.get_transactions_by_date_range(start_date, end_date)
-        category_spending = {}
-        
-        for transaction in transactions:
-            cat_id = transaction.categoryID
-            if cat_id not in category_spending:
-                category_spending[cat_id] = 0.0
-            category_spending[cat_id] += transaction.total
-        
-        return category_spending
+        return self.store.get_spending_by_category(start_date, end_date)
+
+    #Spending over the date range grouped by category, by month and by (month, category), shared by
+    #the monthly and yearly spending charts. Whole months are read from the store's rollup cells and
+    #only the partial months at either end are swept, so whole-month charts never touch a transaction.
+    @reads
+    def get_spending_aggregate(self, start_date: date, end_date: date) -> dict:
+        by_category = {}
+        by_month = {}
+        month_totals = {}
+        total_cents = 0
+        transaction_count = 0
+        firstMonth, lastMonth, head, tail = split_whole_months(start_date, end_date)
+
+        #(month, categoryID, cents, count) rows: partial months from the date index, whole ones from the rollup
+        def rows():
+            if head is not None:
+                for transaction in self.store.get_date_range(*head):
+                    yield (transaction.date.year, transaction.date.month), transaction.categoryID, transaction.totalCents, 1
+            if firstMonth is not None:
+                for month, monthCells in self.store.rollup.iter_months(firstMonth, lastMonth):
+                    for (userID, cat_id, expenseType), (cents, count) in monthCells.items():
+                        yield month, cat_id, cents, count
+            if tail is not None:
+                for transaction in self.store.get_date_range(*tail):
+                    yield (transaction.date.year, transaction.date.month), transaction.categoryID, transaction.totalCents, 1
+
+        for (year, month), cat_id, cents, count in rows():
+            month_key = f"{year}-{month:02d}"
+            by_category[cat_id] = by_category.get(cat_id, 0) + cents
+            month_spending = by_month.setdefault(month_key, {})
+            month_spending[cat_id] = month_spending.get(cat_id, 0) + cents
+            month_totals[month_key] = month_totals.get(month_key, 0) + cents
+            total_cents += cents
+            transaction_count += count
+
+        return {
+            'by_category': {cat_id: cents / 100 for cat_id, cents in by_category.items()},
+            'by_month': {month_key: {cat_id: cents / 100 for cat_id, cents in spending.items()}
+                         for month_key, spending in by_month.items()},
+            'month_totals': {month_key: cents / 100 for month_key, cents in month_totals.items()},
+            'total_spending': total_cents / 100,
+            'transaction_count': transaction_count,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+
+    #What the dashboard charts need from the transactions, read under one lock: the spending trend
+    #and the live per-expense-type totals. Neither scans transactions.
+    @reads
+    def get_chart_snapshot(self, start_date: date, end_date: date, resolution: str = 'month',
+                           maxPoints: int = None, mode: str = 'sum') -> dict:
+        return {
+            'trend': self.get_spending_series(start_date, end_date, resolution, maxPoints=maxPoints, mode=mode),
+            'expense_type_totals': self.store.get_expense_type_totals()
+        }
 
+    #Spending per day, week or month from the bucket holding start_date to the one holding end_date,
+    #for one user or (userID=None) for every transaction in the store. Each bucket is labelled with its
+    #first day. Read from the store's running series, so the cost depends on the number of buckets,
+    #not of transactions. With maxPoints the series is reduced to at most that many points by a
+    #downsample.DOWNSAMPLERS mode: 'sum' adds up runs of buckets (each labelled with its first day),
+    #'minmax' and 'lttb' keep selected buckets as they are.
+    @reads
+    def get_spending_series(self, start_date: date, end_date: date, resolution: str = 'month', userID: str = None,
+                            maxPoints: int = None, mode: str = 'sum') -> dict:
+        series = self.store.get_series(resolution)
+        buckets, cents = series.get_range(start_date, end_date, userID)
+        if maxPoints is not None:
+            positions, cents = downsample(cents, maxPoints, mode)
+            buckets = [buckets[position] for position in positions]
+        bucketStart = SERIES_STARTS[resolution]
+        return {
+            'resolution': resolution,
+            'labels': [bucketStart(bucket) for bucket in buckets],
+            'totals': [amount / 100 for amount in cents]
+        }
+
+    @reads
     def get_monthly_spending_chart_data(self, year: int, month: int) -> dict:
-        from calendar import monthrange
-        
         start_date = date(year, month, 1)
         last_day = monthrange(year, month)[1]
         end_date = date(year, month, last_day)
         
-        spending = self.get_spending_by_category_period(start_date, end_date)
+        spending = self.get_spending_aggregate(start_date, end_date)['by_category']
         
         return {
             'period': f"{year}-{month:02d}",
@@ -242,28 +935,30 @@ class TransactionManager:
             'end_date': end_date
         }
 
+    @reads
     def get_yearly_spending_chart_data(self, year: int) -> dict:
         start_date = date(year, 1, 1)
         end_date = date(year, 12, 31)
         
-        spending = self.get_spending_by_category_period(start_date, end_date)
+        aggregate = self.get_spending_aggregate(start_date, end_date)
         
         monthly_breakdown = {}
         for month in range(1, 13):
-            month_data = self.get_monthly_spending_chart_data(year, month)
-            monthly_breakdown[f"{year}-{month:02d}"] = month_data['spending']
+            month_key = f"{year}-{month:02d}"
+            monthly_breakdown[month_key] = aggregate['by_month'].get(month_key, {})
         
         return {
             'period': str(year),
-            'total_spending': spending,
+            'total_spending': aggregate['by_category'],
             'monthly_breakdown': monthly_breakdown,
             'start_date': start_date,
             'end_date': end_date
         }
 
+    @reads
     def get_category_transactions(self, categoryID: int, start_date: date = None, 
                                 end_date: date = None) -> List[Transaction]:
-        transactions = [t for t in self.transactions if t.categoryID == categoryID]
+        transactions = self.store.get_by_category(categoryID)
         
         if start_date and end_date:
             transactions = [t for t in transactions 
@@ -271,11 +966,15 @@ class TransactionManager:
         
         return transactions
 
+    @reads
     def get_category_detail_view(self, categoryID: int, start_date: date = None, 
                                 end_date: date = None) -> dict:
         transactions = self.get_category_transactions(categoryID, start_date, end_date)
         
-        total_spent = sum(t.total for t in transactions)
+        if start_date and end_date:
+            total_spent = sum(t.total for t in transactions)
+        else:
+            total_spent = self.store.rollup.get_category_total(categoryID)[0]
         
         return {
             'categoryID': categoryID,
@@ -295,8 +994,9 @@ class TransactionManager:
     #=====End of part of sprint 4 by Temka====
 
     #Sprint 5 part Temka Tax
+    @reads
     def get_tax_related_transactions(self, start_date: date = None, end_date: date = None) -> List[Transaction]:
-        tax_transactions = [t for t in self.transactions if t.isTaxRelated]
+        tax_transactions = self.store.get_tax_related()
         
         if start_date and end_date:
             tax_transactions = [t for t in tax_transactions 
@@ -304,6 +1004,7 @@ class TransactionManager:
         
         return tax_transactions
 
+    @reads
     def get_tax_summary(self, year: int = None) -> dict:
         if year is None:
             year = date.today().year
@@ -316,26 +1017,22 @@ class TransactionManager:
         category_totals = {}
         total_tax_expenses = 0.0
         
+        for cat_id, (total, count) in self.store.get_flagged_totals_by_category('tax', start_date, end_date).items():
+            category_totals[cat_id] = {
+                'total': total,
+                'count': count,
+                'transactions': []
+            }
+            total_tax_expenses += total
+        
         for transaction in tax_transactions:
-            cat_id = transaction.categoryID
-            if cat_id not in category_totals:
-                category_totals[cat_id] = {
-                    'total': 0.0,
-                    'count': 0,
-                    'transactions': []
-                }
-            
-            category_totals[cat_id]['total'] += transaction.total
-            category_totals[cat_id]['count'] += 1
-            category_totals[cat_id]['transactions'].append({
+            category_totals[transaction.categoryID]['transactions'].append({
                 'transactionID': transaction.transactionID,
                 'date': transaction.date,
                 'payee': transaction.payee,
                 'amount': transaction.total,
                 'notes': transaction.notes
             })
-            
-            total_tax_expenses += transaction.total
         
         return {
             'year': year,
@@ -348,6 +1045,7 @@ class TransactionManager:
             }
         }
 
+    @reads
     def export_tax_report(self, year: int = None) -> dict:
         summary = self.get_tax_summary(year)
         
@@ -373,8 +1071,9 @@ class TransactionManager:
          #end of Sprint 5 part Temka Tax
 
     #Another sprint 5 part Temka Travel
+    @reads
     def get_travel_transactions(self, start_date: date = None, end_date: date = None) -> List[Transaction]:
-        travel_transactions = [t for t in self.transactions if t.isTravelRelated]
+        travel_transactions = self.store.get_travel_related()
         
         if start_date and end_date:
             travel_transactions = [t for t in travel_transactions 
@@ -382,23 +1081,19 @@ class TransactionManager:
         
         return travel_transactions
 
+    @reads
     def get_travel_summary(self, start_date: date = None, end_date: date = None) -> dict:
         travel_transactions = self.get_travel_transactions(start_date, end_date)
         
         category_breakdown = {}
         total_travel_spending = 0.0
         
-        for transaction in travel_transactions:
-            cat_id = transaction.categoryID
-            if cat_id not in category_breakdown:
-                category_breakdown[cat_id] = {
-                    'total': 0.0,
-                    'count': 0
-                }
-            
-            category_breakdown[cat_id]['total'] += transaction.total
-            category_breakdown[cat_id]['count'] += 1
-            total_travel_spending += transaction.total
+        for cat_id, (total, count) in self.store.get_flagged_totals_by_category('travel', start_date, end_date).items():
+            category_breakdown[cat_id] = {
+                'total': total,
+                'count': count
+            }
+            total_travel_spending += total
         
         return {
             'total_travel_spending': total_travel_spending,
@@ -420,6 +1115,7 @@ class TransactionManager:
             ]
         }
 
+    @writes
     def bulk_flag_travel(self, transaction_ids: List[int]) -> Tuple[int, List[int]]:
         success_count = 0
         failed_ids = []
@@ -428,12 +1124,14 @@ class TransactionManager:
             transaction = self.get_transaction_by_id(trans_id)
             if transaction:
                 transaction.flag_as_travel()
+                self.store.reindex(transaction)
                 success_count += 1
             else:
                 failed_ids.append(trans_id)
         
         return success_count, failed_ids
 
+    @writes
     def bulk_unflag_travel(self, transaction_ids: List[int]) -> Tuple[int, List[int]]:
         success_count = 0
         failed_ids = []
@@ -442,15 +1140,17 @@ class TransactionManager:
             transaction = self.get_transaction_by_id(trans_id)
             if transaction:
                 transaction.unflag_travel()
+                self.store.reindex(transaction)
                 success_count += 1
             else:
                 failed_ids.append(trans_id)
         
         return success_count, failed_ids
 
+    @reads
     def filter_by_travel_flag(self, include_travel: bool = True) -> List[Transaction]:
         if include_travel:
-            return [t for t in self.transactions if t.isTravelRelated]
+            return self.store.get_travel_related()
         else:
             return [t for t in self.transactions if not t.isTravelRelated]
     #end of Another sprint 5 part Temka Travel
@@ -612,7 +1312,7 @@ class Income:
                            payee: str, categoryID: int, notes: str = "", expenseType: ExpenseType = None):
 
         new_transaction = Transaction(
-            transactionID=len(transaction_manager.transactions) + 1,
+            transactionID=transaction_manager.next_transaction_id(),
             userID=userID,
             total=total,
             date=date_,
@@ -4,9 +4,10 @@ from Money import Transaction, TransactionManager
 from chart import *
 
 class Dashboard:
-    def __init__ (self, userID, transactionManager: TransactionManager):
+    def __init__ (self, userID, transactionManager: TransactionManager, chartManager: 'BudgetChartManager' = None):
        self.userID = userID
        self.transactionManager = transactionManager
+       self.chartManager = chartManager
 
     #getters
     def get_userID (self):
@@ -1,84 +1,294 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, request, session
 from flask_cors import CORS
-from datetime import date, datetime
+from werkzeug.security import check_password_hash, generate_password_hash
+from datetime import date, datetime, timedelta
+import gzip
+import hashlib
+import io
 import json
+import os
+import secrets
+import zlib
+from functools import wraps
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 from budget import *
 from Money import *
 from Pages import *
 from User import User
+from transactionExport import EXPORTERS
+from transactionImport import ROW_READERS, TransactionImporter
+from responseCache import ResponseCache
+from serializer import dumps
+from userState import UserState, UserStateRegistry, database_loader
 
 app = Flask(__name__)
-CORS(app)
-
-transactionManager = TransactionManager()
-budgetManager = BudgetManager()
-
-sampleBudget = Budget(
-    budgetID = 1,
-    userID='user1',
-    name="Montly Budget",
-    totalPlannedAmnt=3000.0,
-    month='October',
-    income=4500.0
-)
-
-sampleCategories = [
-    Category(1, "Groceries", "Food", 300, 120, None),
-    Category(2, "Rent", "Housing", 1200, 1200, None),
-    Category(3, "Utilities", "Bills", 200, 150,  None),
-    Category(4, "Entertainment", "Leisure", 150, 90, None)
-]
-
-for category in sampleCategories:
-    sampleBudget.addCategory(category)
-    budgetManager.add_category(category)
-
-sampleTransactions = [
-    Transaction(1, "user1", 5.0, date(2025, 10, 1), "Amazon", 1, "Sample note"),
-    Transaction(2, "user1", 12.5, date(2025, 10, 2), "Starbucks", 4, "Coffee"),
-    Transaction(3, "user1", 35.0, date(2025, 10, 3), "Walmart", 1, "Groceries"),
-    Transaction(4, "user1", 18.0, date(2025, 10, 4), "Uber", 3, "Transportation"),
-    Transaction(5, "user1", 9.99, date(2025, 10, 5), "Amazon", 4, "Entertainment"),
-    Transaction(6, "user1", 27.5, date(2025, 10, 6), "Target", 1, "Household"),
-    Transaction(7, "user1", 15.49, date(2025, 10, 7), "Netflix", 4, "Subscription"),
-    Transaction(8, "user1", 20.0, date(2025, 10, 8), "Domino's", 1, "Food"),
-    Transaction(9, "user1", 2.99, date(2025, 10, 9), "Apple", 4, "App Store")
-]
-
-for transaction in sampleTransactions:
-    transactionManager.add_transaction(transaction)
-    budgetManager.record_transaction(transaction)
-
-dashboard = Dashboard("user1", transactionManager)
+# Signs the session cookie. Without SECRET_KEY every restart logs all users out.
+app.secret_key = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
+# The session cookie is sent cross-origin, so only the frontend's own origins may read responses
+frontendOrigins = [origin.strip() for origin in os.environ.get('FRONTEND_ORIGINS', 'http://localhost:3000').split(',') if origin.strip()]
+CORS(app, origins=frontendOrigins, expose_headers=['X-Next-Cursor', 'ETag'], supports_credentials=True)
+
+# Replaces jsonify: encodes with the fastest available encoder (orjson when installed) and takes
+# dates, enums and Decimals as they are. Dates come out as ISO strings.
+def json_response(payload, status: int = 200):
+    return app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+# With BANK_DB_NAME set (and BANK_DB_HOST, BANK_DB_USER, BANK_DB_PASSWORD) the API logs in the
+# bankUser accounts and serves their data from MySQL, inserting every write before applying it.
+# Without it the API serves only the demo user, from memory.
+def connect_database():
+    import mysql.connector
+    return mysql.connector.connect(
+        host=os.environ.get('BANK_DB_HOST', 'localhost'),
+        user=os.environ.get('BANK_DB_USER', 'root'),
+        password=os.environ.get('BANK_DB_PASSWORD', ''),
+        database=os.environ['BANK_DB_NAME']
+    )
+
+if os.environ.get('BANK_DB_NAME'):
+    from budgetDB import BudgetDB
+    from transactionDB import TransactionDB
+    from userDB import UserDB
+    # each class gets its own connection, so they never share a cursor
+    transactionDB = TransactionDB(connect_database())
+    userDB = UserDB(connect_database())
+    # One allocator for every user so transaction IDs stay unique across users
+    idAllocator = TransactionIDAllocator.from_database(transactionDB)
+else:
+    transactionDB = None
+    userDB = None
+    idAllocator = TransactionIDAllocator()
+
+# Demo data for user1 when no database is configured
+def load_sample_state(userID: str) -> UserState:
+    if userID != 'user1':
+        return UserState(userID, idAllocator=idAllocator)
+
+    sampleBudget = Budget(
+        budgetID = 1,
+        userID='user1',
+        name="Montly Budget",
+        totalPlannedAmnt=3000.0,
+        month='October',
+        income=4500.0
+    )
+
+    sampleCategories = [
+        Category(1, "Groceries", "Food", 300, 120, None),
+        Category(2, "Rent", "Housing", 1200, 1200, None),
+        Category(3, "Utilities", "Bills", 200, 150,  None),
+        Category(4, "Entertainment", "Leisure", 150, 90, None)
+    ]
+
+    for category in sampleCategories:
+        sampleBudget.addCategory(category)
+
+    sampleTransactions = [
+        Transaction(1, "user1", 5.0, date(2025, 10, 1), "Amazon", 1, "Sample note"),
+        Transaction(2, "user1", 12.5, date(2025, 10, 2), "Starbucks", 4, "Coffee"),
+        Transaction(3, "user1", 35.0, date(2025, 10, 3), "Walmart", 1, "Groceries"),
+        Transaction(4, "user1", 18.0, date(2025, 10, 4), "Uber", 3, "Transportation"),
+        Transaction(5, "user1", 9.99, date(2025, 10, 5), "Amazon", 4, "Entertainment"),
+        Transaction(6, "user1", 27.5, date(2025, 10, 6), "Target", 1, "Household"),
+        Transaction(7, "user1", 15.49, date(2025, 10, 7), "Netflix", 4, "Subscription"),
+        Transaction(8, "user1", 20.0, date(2025, 10, 8), "Domino's", 1, "Food"),
+        Transaction(9, "user1", 2.99, date(2025, 10, 9), "Apple", 4, "App Store")
+    ]
+
+    return UserState('user1', sampleBudget, sampleTransactions, idAllocator)
+
+# Serialized responses of the read endpoints, checked against the user's data version on every hit
+responseCache = ResponseCache()
+
+if transactionDB is not None:
+    userStates = UserStateRegistry(database_loader(transactionDB, BudgetDB(connect_database()), idAllocator),
+                                   onEvict=responseCache.invalidate_user)
+    demoAccounts = {}
+else:
+    userStates = UserStateRegistry(load_sample_state, onEvict=responseCache.invalidate_user)
+    # Load the demo user up front so its fixed IDs are claimed before anyone else gets one
+    userStates.get('user1')
+    # email -> (userID, password hash). The demo password is taken from DEMO_PASSWORD.
+    demoAccounts = {
+        'demo@example.com': ('user1', generate_password_hash(os.environ.get('DEMO_PASSWORD') or secrets.token_urlsafe(16)))
+    }
+
+# The user ID for a login, or None when the email or password is wrong
+def authenticate(email: str, password: str):
+    if userDB is not None:
+        userID = userDB.check_login(email, password)
+        return None if userID is None else str(userID)
+    account = demoAccounts.get(email)
+    if account is None or not check_password_hash(account[1], password):
+        return None
+    return account[0]
+
+# Every API write has been inserted by now, so the state matches the database again. Without a
+# database the writes exist only in memory and the registry keeps the user loaded.
+def mark_saved(state: UserState):
+    if transactionDB is not None:
+        state.mark_saved()
+
+PUBLIC_ENDPOINTS = ('login', 'logout', 'get_chart_config')
+
+# The user comes from the signed session cookie set by /api/login. Their state is held for the whole
+# request so it cannot be evicted while the request writes to it.
+@app.before_request
+def load_user_state():
+    if request.method == 'OPTIONS' or request.endpoint in PUBLIC_ENDPOINTS:
+        return None
+    userID = session.get('userID')
+    if userID is None:
+        return json_response({'error': 'Not logged in'}, 401)
+    g.userState = userStates.acquire(userID)
+    return None
+
+@app.teardown_request
+def release_user_state(exception=None):
+    state = g.pop('userState', None)
+    if state is not None:
+        userStates.release(state)
+
+def get_user_state() -> UserState:
+    return g.userState
+
+# The ETag is built from the user's data versions, so it changes with any write that could change
+# the response and an unchanged poll is answered before any aggregation runs
+# Today's date is part of it because the chart periods end today. The tag is weak because the same
+# data may be sent with different compression.
+def data_etag(state: UserState) -> str:
+    return (f"{zlib.crc32(state.userID.encode()):x}-{state.generation}-{state.transactionManager.get_version(state.userID)}"
+            f"-{state.budgetManager.version}-{state.budget.get_version()}-{date.today().toordinal()}")
+
+# Read endpoints: 304 when the client already has the current version, otherwise the cached body
+# when it was built from the current version, otherwise the view runs and its body is cached.
+def conditional(view):
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        state = get_user_state()
+        etag = data_etag(state)
+        if request.if_none_match.contains_weak(etag):
+            response = app.response_class(status=304)
+        else:
+            cacheKey = (state.userID, request.path, tuple(sorted(request.args.items(multi=True))))
+            cached = responseCache.get(cacheKey, etag)
+            if cached is not None:
+                response = app.response_class(cached[0], mimetype=cached[1])
+            else:
+                response = view(*args, **kwargs)
+                if not isinstance(response, app.response_class) or response.status_code != 200:
+                    return response
+                responseCache.put(cacheKey, etag, response.get_data(), response.mimetype)
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Cookie')
+        return response
+    return wrapped
+
+# Compress JSON responses above a size threshold with brotli (when installed) or gzip. Streamed
+# exports are left alone so their first bytes are not held back.
+COMPRESS_MIN_BYTES = 512
+COMPRESSIBLE_TYPES = ('application/json', 'text/csv', 'application/x-ndjson')
+
+@app.after_request
+def compress_response(response):
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        response.set_data(brotli.compress(body, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(body, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        return response
+    response.vary.add('Accept-Encoding')
+    return response
+
+# Static chart config (Chart.js options, dataset styles, preferences) is served once per distinct
+# content under /api/chart-config/<version>, where the version is a hash of the content, so clients
+# and proxies can cache it forever and data-only chart responses just point at it.
+chartConfigs = {}
+chartConfigVersions = {}
+
+def get_chart_config_url(chartManager) -> str:
+    preferencesKey = dumps(chartManager.get_preferences_data())
+    version = chartConfigVersions.get(preferencesKey)
+    if version is None:
+        body = dumps(chartManager.get_static_chart_config())
+        version = hashlib.sha1(body).hexdigest()[:16]
+        chartConfigs[version] = body
+        chartConfigVersions[preferencesKey] = version
+    return f'/api/chart-config/{version}'
 
 #API Calls
+@app.route('/api/login', methods=['POST'])
+def login():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return json_response({'error': 'Expected email and password'}, 400)
+    userID = authenticate(str(data.get('email', '')).strip().lower(), str(data.get('password', '')))
+    if userID is None:
+        return json_response({'error': 'Invalid email or password'}, 401)
+    session.clear()
+    session['userID'] = userID
+    return json_response({'message': 'Logged in', 'userID': userID})
+
+@app.route('/api/logout', methods=['POST'])
+def logout():
+    session.clear()
+    return json_response({'message': 'Logged out'})
+
 @app.route('/api/dashboard', methods=['GET'])
+@conditional
 def get_dashboard():
     try:
-        recentTransactions = dashboard.get_recent_transactions_widget_data(10)
+        state = get_user_state()
+        transactionManager = state.transactionManager
+        budgetManager = state.budgetManager
 
-        totalSpending = sum(transaction.total for transaction in transactionManager.transactions)
+        # both locks are held so recent transactions, totals and spending come from the same moment
+        with transactionManager.lock.read_locked(), budgetManager.lock.read_locked():
+            recentTransactions = state.dashboard.get_recent_transactions_widget_data(10)
+            totalSpending = sum(transaction.total for transaction in transactionManager.transactions)
+            spending = budgetManager.get_spending_snapshot()
 
-        return jsonify({
-            'income': sampleBudget.income,
+        return json_response({
+            'income': state.budget.income,
             'expenses': totalSpending,
             'recentTransactions': recentTransactions,
             'budgets': [{
                 'id': cat.categoryID,
                 'name': cat.name,
                 'total': cat.categoryLimit,
-                'spent': budgetManager.spending.get(cat.categoryID, 0.0)
-            } for cat in sampleBudget.categories]
+                'spent': spending.get(cat.categoryID, 0.0)
+            } for cat in state.budget.categories]
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
     
 @app.route('/api/transactions', methods=['GET'])
 def get_transactions():
     try:
+        # ?sort=date|amount|payee|category&order=asc|desc&limit=50&cursor=<X-Next-Cursor of the previous page>
         sortBy = request.args.get('sort', 'date')
-        transactions = dashboard.get_recent_transaction(50)
+        defaultOrder = 'asc' if sortBy in ('payee', 'category') else 'desc'
+        descending = request.args.get('order', defaultOrder) == 'desc'
+        limit = max(1, min(int(request.args.get('limit', 50)), 500))
+        state = get_user_state()
+        transactions, nextCursor = state.transactionManager.get_transactions_page(
+            state.userID, sortBy, descending, limit, request.args.get('cursor'))
         
         transactionsData = []
         for transaction in transactions:
@@ -86,24 +296,30 @@ def get_transactions():
                 'id': transaction.transactionID,
                 'payee': transaction.payee,
                 'amount': transaction.total,
-                'date': transaction.date.isoformat(),
+                'date': transaction.date,
                 'categoryID': transaction.categoryID,
                 'notes': transaction.notes
             })
         
-        return jsonify(transactionsData)
+        response = json_response(transactionsData)
+        if nextCursor:
+            response.headers['X-Next-Cursor'] = nextCursor
+        return response
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/transactions', methods=['POST'])
 def add_transaction():
     try:
         data = request.get_json()
+        state = get_user_state()
         
         # Create new transaction
         newTransaction = Transaction(
-            transactionID=len(transactionManager.transactions) + 1,
-            userID="user1",
+            transactionID=state.transactionManager.next_transaction_id(),
+            userID=state.userID,
             total=float(data['amount']),
             date=datetime.strptime(data['date'], '%Y-%m-%d').date(),
             payee=data['payee'],
@@ -113,41 +329,195 @@ def add_transaction():
             expenseType=ExpenseType.VARIABLE
         )
         
-        transactionManager.add_transaction(newTransaction)
-        budgetManager.record_transaction(newTransaction)
+        # both write locks, in the order TransactionImporter.import_batch takes them, so the dashboard
+        # never sees the transaction without its spending
+        with state.transactionManager.lock.write_locked(), state.budgetManager.lock.write_locked():
+            if transactionDB is not None:
+                transactionDB.insert_transactions([newTransaction])
+            state.transactionManager.add_transaction(newTransaction)
+            state.budgetManager.record_transaction(newTransaction)
+        mark_saved(state)
         
-        return jsonify({'message': 'Transaction added successfully', 'id': newTransaction.transactionID})
+        return json_response({'message': 'Transaction added successfully', 'id': newTransaction.transactionID})
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+MAX_BATCH_ROWS = 5000
+
+# Offline sync: {"transactions": [{amount, date, payee, categoryID, notes, expenseType, clientID}, ...]}
+# Either every row is added or none is; the response has one result per row, in order.
+@app.route('/api/transactions/batch', methods=['POST'])
+def add_transactions_batch():
+    try:
+        data = request.get_json(silent=True)
+        rows = data.get('transactions') if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not rows:
+            return json_response({'error': 'Expected a non-empty list of transactions'}, 400)
+        if len(rows) > MAX_BATCH_ROWS:
+            return json_response({'error': f'A batch can hold at most {MAX_BATCH_ROWS} transactions'}, 413)
+
+        state = get_user_state()
+        for row in rows:
+            # the app's default, as in POST /api/transactions
+            if isinstance(row, dict) and not row.get('expenseType'):
+                row['expenseType'] = ExpenseType.VARIABLE.value
+        importer = TransactionImporter(state.transactionManager, state.budgetManager, transactionDB)
+        result = importer.import_batch(rows, state.userID)
+        mark_saved(state)
+
+        return json_response(result, 200 if result['applied'] else 400)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+@app.route('/api/transactions/import', methods=['POST'])
+def import_transactions():
+    try:
+        upload = request.files.get('file')
+        if upload is None:
+            return json_response({'error': 'No file uploaded'}, 400)
+
+        fileFormat = request.form.get('format') or upload.filename.rsplit('.', 1)[-1].lower()
+        if fileFormat in ('json', 'ndjson'):
+            fileFormat = 'jsonl'
+        if fileFormat not in ROW_READERS:
+            return json_response({'error': f'Unsupported import format: {fileFormat}'}, 400)
+
+        # Stream the upload so large histories are never held in memory at once
+        lines = io.TextIOWrapper(upload.stream, encoding='utf-8', newline='')
+        state = get_user_state()
+        importer = TransactionImporter(state.transactionManager, state.budgetManager, transactionDB)
+        try:
+            result = importer.import_rows(ROW_READERS[fileFormat](lines), state.userID)
+        finally:
+            # chunks applied before a failure were inserted first
+            mark_saved(state)
+
+        return json_response(result)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+def parse_flag_arg(name: str):
+    value = request.args.get(name)
+    return None if value is None else value.lower() in ('1', 'true', 'yes')
+
+# ?format=ndjson|csv&start=YYYY-MM-DD&end=YYYY-MM-DD&categoryID=1&tax=true&travel=false
+# Rows are streamed in date order as they are read, so the download starts at once and the whole
+# history is never held in memory.
+@app.route('/api/transactions/export', methods=['GET'])
+def export_transactions():
+    try:
+        fileFormat = request.args.get('format', 'ndjson')
+        if fileFormat not in EXPORTERS:
+            return json_response({'error': f'Unsupported export format: {fileFormat}'}, 400)
+        startDate = request.args.get('start')
+        endDate = request.args.get('end')
+        categoryID = request.args.get('categoryID')
+        state = get_user_state()
+
+        transactions = state.transactionManager.iter_transactions(
+            state.userID,
+            date.fromisoformat(startDate) if startDate else None,
+            date.fromisoformat(endDate) if endDate else None,
+            int(categoryID) if categoryID else None,
+            parse_flag_arg('tax'),
+            parse_flag_arg('travel')
+        )
+        exporter, mimetype, extension = EXPORTERS[fileFormat]
+        response = Response(exporter(transactions), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename=transactions.{extension}'
+        return response
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/budgets', methods=['GET'])
+@conditional
 def get_budgets():
     try:
-        budgetData = sampleBudget.get_budget_data()
+        state = get_user_state()
+        budgetData = state.budget.get_budget_data()
+        spending = state.budgetManager.get_spending_snapshot()
         
         # Add spending data from budget manager
         for category in budgetData['categories']:
-            category['spent'] = budgetManager.spending.get(category['categoryID'], 0.0)
+            category['spent'] = spending.get(category['categoryID'], 0.0)
         
-        return jsonify(budgetData)
+        return json_response(budgetData)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/spending-chart', methods=['GET'])
+@conditional
 def get_spending_chart():
     try:
-        chart_data = budgetManager.get_chart_data()
-        return jsonify(chart_data)
+        chart_data = get_user_state().budgetManager.get_chart_data()
+        return json_response(chart_data)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+# ?mode=data returns only labels and numbers plus the URL of the static config; the default full
+# mode returns everything in one payload, as Dashboard.get_financial_charts builds it.
+@app.route('/api/charts', methods=['GET'])
+@conditional
+def get_charts():
+    try:
+        state = get_user_state()
+        if request.args.get('mode', 'full') == 'data':
+            return json_response({
+                'charts': state.chartManager.get_chart_data_only(state.budget),
+                'config_url': get_chart_config_url(state.chartManager)
+            })
+        return json_response(state.dashboard.get_financial_charts(state.budget))
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+# ?months=36&resolution=month|week|day&max_points=60&downsample=sum|minmax|lttb: the spending trend
+# for any window, sliced from the running per-user series rather than computed from the
+# transactions. With max_points the payload stays the same size however long the history is.
+@app.route('/api/spending-trend', methods=['GET'])
+@conditional
+def get_spending_trend():
+    try:
+        state = get_user_state()
+        months = max(1, min(int(request.args.get('months', 6)), 120))
+        maxPoints = request.args.get('max_points')
+        endDate = date.today()
+        series = state.transactionManager.get_spending_series(
+            endDate - timedelta(days=30*months), endDate, request.args.get('resolution', 'month'), state.userID,
+            int(maxPoints) if maxPoints else None, request.args.get('downsample', 'sum'))
+        return json_response(series)
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400)
+    except Exception as e:
+        return json_response({'error': str(e)}, 500)
+
+@app.route('/api/chart-config/<version>', methods=['GET'])
+def get_chart_config(version):
+    body = chartConfigs.get(version)
+    if body is None:
+        return json_response({'error': 'Unknown chart config version'}, 404)
+    response = app.response_class(body, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 @app.route('/api/expense-stats', methods=['GET'])
+@conditional
 def get_expense_stats():
     try:
-        stats = transactionManager.get_expense_type_stats()
-        return jsonify(stats)
+        stats = get_user_state().transactionManager.get_expense_type_stats()
+        return json_response(stats)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+# Process-wide numbers covering every user, so only the user IDs listed in ADMIN_USER_IDS may read them
+adminUserIDs = {userID.strip() for userID in os.environ.get('ADMIN_USER_IDS', '').split(',') if userID.strip()}
+
+@app.route('/api/cache-stats', methods=['GET'])
+def get_cache_stats():
+    if get_user_state().userID not in adminUserIDs:
+        return json_response({'error': 'Admins only'}, 403)
+    return json_response({'responses': responseCache.get_stats(), 'users': userStates.get_stats()})
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import List, Optional
 from Money import *
+from concurrency import ReadWriteLock, reads, writes
 
 class Budget:
     def __init__(self, budgetID: int, userID: str, name: str, totalPlannedAmnt: float, month: str, income: float):
@@ -10,6 +11,8 @@ class Budget:
         self.month = month
         self.income = income
         self.categories = []
+        #bumped on every change so API responses can be revalidated with an ETag
+        self.version = 0
 
     def createBudget(self):
         print(f"Budget '{self.name}' created with id {self.budgetID}")
@@ -18,6 +21,7 @@ class Budget:
         if name: self.name = name
         if totalPlannedAmnt: self.totalPlannedAmnt = totalPlannedAmnt
         if month: self.month = month
+        self.version += 1
         print(f"Budget {self.name} updated.")
 
     def deleteBudget(self):
@@ -25,15 +29,27 @@ class Budget:
         print(f"Budget {self.name} deleted.")
         self.remove(self.budgetID)
 
+    #every change made through the budget (categories added, removed or edited, income) ends here,
+    #so this is where the version moves
     def calculateTotalPlannedAmnt(self):
         self.totalPlannedAmnt = sum(cat.plannedAmnt for cat in self.categories)
+        self.version += 1
         return self.totalPlannedAmnt
 
+    #Covers edits made on a Category directly as well: they bump the version of the budget the
+    #category was attached to, so reading it stays O(1)
+    def get_version(self) -> int:
+        return self.version
+
     def budgetTracking(self):
         print(f"{self.name} total planned = {self.totalPlannedAmnt}")
 
-    def addCategory(self, category: 'Category'):
+    def attach_category(self, category: 'Category'):
+        category.budget = self
         self.categories.append(category)
+
+    def addCategory(self, category: 'Category'):
+        self.attach_category(category)
         self.calculateTotalPlannedAmnt()
         print(f"Category '{category.name}' added to budget '{self.name}'")
 
@@ -72,7 +88,7 @@ class Budget:
         for category in self.categories:
             if category.plannedPercentage is not None:
                 category.plannedAmnt = (category.plannedPercentage / 100) * income
-            self.calculateTotalPlannedAmnt()
+        self.calculateTotalPlannedAmnt()
     
     def get_budget_data(self) -> dict:
         return {
@@ -133,6 +149,7 @@ class Budget:
             if category:
                 category.plannedAmnt = cat_data['plannedAmnt']
                 category.plannedPercentage = cat_data['plannedPercentage']
+        self.version += 1
         print(f"Budget '{self.name}' changes discarded")
     #==========End of part of sprint 4 by Temka, for the Budget user story.============
 
@@ -218,6 +235,8 @@ class Category:
         self.categoryLimit = categoryLimit
         self.plannedAmnt = plannedAmnt
         self.plannedPercentage = plannedPercentage
+        #the budget whose version moves with this category's edits, see Budget.get_version
+        self.budget = None
 
     def addCategory(self):
         print(f"Category '{self.name}' added.")
@@ -230,23 +249,31 @@ class Category:
             self.plannedPercentage = None
         if plannedPercentage is not None:
             self.plannedPercentage = plannedPercentage
+        self._changed()
         print(f"Category {self.categoryID} updated.")
 
     def deleteCategory(self):
         print(f"Category {self.categoryID} deleted.")
 
+    def _changed(self):
+        if self.budget is not None:
+            self.budget.version += 1
+
     def editLimit(self, newLimit: float):
         self.categoryLimit = newLimit
+        self._changed()
         print(f"Category {self.categoryID} limit updated to {newLimit}")
 
     def setPlannedAmnt(self, amount: float):
         self.plannedAmnt = amount
         self.plannedPercentage = None
+        self._changed()
         print(f"Category {self.categoryID} planned amount set to {amount}")
 
     def setPlannedPercentage(self, percentage: float, budgetIncome: float):
         self.plannedPercentage = percentage
         self.plannedAmnt = (percentage / 100) * budgetIncome
+        self._changed()
         print(f"Category {self.categoryID} planned percentage set to {percentage}% (${self.plannedAmnt:.2f})")
 
 #Part of sprint 1 by Temka
@@ -301,7 +328,7 @@ class BudgetTemplate:
                 plannedAmnt=cat.plannedAmnt,
                 plannedPercentage=cat.plannedPercentage
             )
-            new_budget.categories.append(new_category)
+            new_budget.attach_category(new_category)
         
         new_budget.calculateTotalPlannedAmnt()
         return new_budget
@@ -312,15 +339,21 @@ class BudgetManager:
     def __init__(self):
         self.categories: dict[int, Category] = {}      
         self.spending: dict[int, float] = {}           
+        self.lock = ReadWriteLock()
+        #bumped by every write so API responses can be revalidated with an ETag
+        self.version = 0
 
+    @writes
     def add_category(self, category: Category):
         if category.categoryID not in self.categories:
             self.categories[category.categoryID] = category
             self.spending[category.categoryID] = 0.0
+            self.version += 1
             print(f"Category '{category.name}' added with limit ${category.categoryLimit:.2f}")
         else:
             print(f"Category '{category.name}' already exists.")
 
+    @writes
     def record_transaction(self, transaction: Transaction):
         cat_id = transaction.categoryID
 
@@ -330,6 +363,7 @@ class BudgetManager:
 
         amount = transaction.total
         self.spending[cat_id] += amount
+        self.version += 1
         category = self.categories[cat_id]
 
         print(f"Added ${amount:.2f} to '{category.name}'. "
@@ -338,6 +372,36 @@ class BudgetManager:
         if self.spending[cat_id] > category.categoryLimit:
             print(f"WARNING: You’ve exceeded your monthly limit for '{category.name}'!\n")
 
+    #Batch version of record_transaction: one spending update per category for the whole batch.
+    @writes
+    def record_transactions(self, transactions: List[Transaction]):
+        category_amounts = {}
+        unknown_count = 0
+
+        for transaction in transactions:
+            cat_id = transaction.categoryID
+            if cat_id not in self.categories:
+                unknown_count += 1
+                continue
+            category_amounts[cat_id] = category_amounts.get(cat_id, 0) + transaction.totalCents
+
+        if unknown_count:
+            print(f"{unknown_count} transaction(s) use an unknown category and were not recorded.")
+
+        if category_amounts:
+            self.version += 1
+
+        for cat_id, cents in category_amounts.items():
+            self.spending[cat_id] += cents / 100
+            category = self.categories[cat_id]
+
+            print(f"Added ${cents / 100:.2f} to '{category.name}'. "
+                  f"Total spent: ${self.spending[cat_id]:.2f} / ${category.categoryLimit:.2f}")
+
+            if self.spending[cat_id] > category.categoryLimit:
+                print(f"WARNING: You’ve exceeded your monthly limit for '{category.name}'!\n")
+
+    @reads
     def get_summary(self):
         print("\nBudget Summary:")
         for cat_id, category in self.categories.items():
@@ -346,6 +410,12 @@ class BudgetManager:
             print(f"  - {category.name}: ${spent:.2f} / ${category.categoryLimit:.2f} ({status})")
 
     #==Part of sprint 4 by Temka==
+    #Copy of the spending totals taken under the lock, for callers that look up several categories.
+    @reads
+    def get_spending_snapshot(self) -> dict:
+        return dict(self.spending)
+
+    @reads
     def get_spending_by_category(self) -> dict:
         category_totals = {}
         
@@ -359,6 +429,7 @@ class BudgetManager:
         
         return category_totals
 
+    @reads
     def get_chart_data(self, period: str = 'current_month') -> dict:
         spending_data = self.get_spending_by_category()
         
@@ -45,8 +45,8 @@ class BudgetDB:
             )
 
             # Load categories for this budget
-            categories = self.load_categories_for_budget(budget.budgetID)
-            budget.categories.extend(categories)
+            for category in self.load_categories_for_budget(budget.budgetID):
+                budget.attach_category(category)
 
             budgets.append(budget)
 
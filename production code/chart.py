@@ -1,6 +1,8 @@
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, NamedTuple, Optional, Tuple, Any
 from datetime import date, datetime, timedelta
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
 from budget import *
 from Money import *
 import json
@@ -16,10 +18,200 @@ class ChartTheme(Enum):
     DARK = "dark"
     COLORFUL = "colorful"
 
+#Dataset styles of the fixed-layout charts. They never depend on user data, so data-only responses
+#leave them out and clients read them once from BudgetChartManager.get_static_chart_config().
+INCOME_VS_EXPENSES_STYLE = {
+    'backgroundColor': ['#4CAF50', '#F44336', '#2196F3'],
+    'borderColor': ['#45a049', '#d32f2f', '#1976d2'],
+    'borderWidth': 2,
+    'hoverBackgroundColor': ['#66BB6A', '#EF5350', '#42A5F5'],
+    'hoverBorderColor': ['#4CAF50', '#F44336', '#2196F3'],
+    'hoverBorderWidth': 3
+}
+
+SPENDING_TREND_STYLE = {
+    'label': 'Expenses',
+    'borderColor': '#F44336',
+    'backgroundColor': 'rgba(244, 67, 54, 0.1)',
+    'tension': 0.4,
+    'fill': True,
+    'pointBackgroundColor': '#F44336',
+    'pointBorderColor': '#ffffff',
+    'pointHoverBackgroundColor': '#EF5350',
+    'pointHoverBorderColor': '#ffffff',
+    'pointHoverRadius': 6,
+    'pointHitRadius': 10
+}
+
+ACTUAL_VS_PLANNED_STYLES = [
+    {
+        'label': 'Planned',
+        'backgroundColor': 'rgba(54, 162, 235, 0.7)',
+        'borderColor': 'rgba(54, 162, 235, 1)',
+        'borderWidth': 1,
+        'hoverBackgroundColor': 'rgba(54, 162, 235, 0.9)',
+        'hoverBorderColor': 'rgba(54, 162, 235, 1)'
+    },
+    {
+        'label': 'Actual',
+        'backgroundColor': 'rgba(255, 99, 132, 0.7)',
+        'borderColor': 'rgba(255, 99, 132, 1)',
+        'borderWidth': 1,
+        'hoverBackgroundColor': 'rgba(255, 99, 132, 0.9)',
+        'hoverBorderColor': 'rgba(255, 99, 132, 1)'
+    }
+]
+
+EXPENSE_TYPE_STYLE = {
+    'backgroundColor': ['#FF9800', '#9C27B0'],
+    'borderColor': ['#F57C00', '#7B1FA2'],
+    'borderWidth': 2,
+    'hoverBackgroundColor': ['#FFB74D', '#BA68C8'],
+    'hoverBorderColor': ['#FF9800', '#9C27B0']
+}
+
+#every theme palette has this many colors; category colors repeat after it
+PALETTE_SIZE = 10
+
+#Palettes per theme. Every chart asks for the same few colors, so each theme's palette and its
+#darker and lighter variants are computed once and shared as tuples.
+COLOR_PALETTES = {
+    ChartTheme.COLORFUL: (
+        '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF',
+        '#FF9F40', '#FF6384', '#C9CBCF', '#4BC0C0', '#FF6384'
+    ),
+    ChartTheme.LIGHT: (
+        '#E8F4FD', '#FDECEF', '#FEF7E0', '#E8F7F7', '#F2EFFD',
+        '#FFF0E6', '#E6F4EA', '#FCE8F3', '#E8F4FD', '#F0F4FF'
+    ),
+    ChartTheme.DARK: (
+        '#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#3B1C32',
+        '#6B8F71', '#9C7CA5', '#2A4D14', '#5D5D81', '#8F754F'
+    )
+}
+
+class ThemePalette(NamedTuple):
+    colors: Tuple[str, ...]
+    darker: Tuple[str, ...]
+    lighter: Tuple[str, ...]
+
+@lru_cache(maxsize=None)
+def shift_color(color: str, amount: int) -> str:
+    if color.startswith('#'):
+        r = min(255, max(0, int(color[1:3], 16) + amount))
+        g = min(255, max(0, int(color[3:5], 16) + amount))
+        b = min(255, max(0, int(color[5:7], 16) + amount))
+        return f'#{r:02x}{g:02x}{b:02x}'
+    return color
+
+@lru_cache(maxsize=None)
+def get_theme_palette(theme: ChartTheme) -> ThemePalette:
+    colors = COLOR_PALETTES[theme]
+    return ThemePalette(colors, tuple(shift_color(color, -30) for color in colors),
+                        tuple(shift_color(color, 30) for color in colors))
+
+def _cycle(values: Tuple[str, ...], count: int) -> List[str]:
+    return [values[i % len(values)] for i in range(count)]
+
+#Cached values are shared between requests, so they are frozen: dicts become read-only mappings
+#and lists become tuples. The serializer writes both as plain JSON.
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+@lru_cache(maxsize=None)
+def build_chart_config(chartType: ChartType) -> MappingProxyType:
+    #Chart.js options do not depend on the theme or on user data, so each type is built once
+    baseConfig = {
+        'responsive': True,
+        'maintainAspectRatio': False,
+        'interaction': {
+            'intersect': False,
+            'mode': 'nearest'
+        },
+        'plugins': {
+            'legend': {
+                'position': 'top',
+                'labels': {
+                    'usePointStyle': True,
+                    'padding': 20,
+                    'font': {
+                        'size': 12
+                    }
+                }
+            },
+            'tooltip': {
+                'enabled': True,
+                'backgroundColor': 'rgba(0, 0, 0, 0.8)',
+                'titleColor': '#ffffff',
+                'bodyColor': '#ffffff',
+                'borderColor': 'rgba(255, 255, 255, 0.2)',
+                'borderWidth': 1,
+                'cornerRadius': 8,
+                'padding': 12,
+                'displayColors': True,
+                'usePointStyle': True,
+                'callbacks': {
+                    'label': 'function(context) { return self.getTooltipLabel(context); }'
+                }
+            }
+        },
+        'hover': {
+            'animationDuration': 300,
+            'onHover': 'function(event, elements) { self.handleChartHover(event, elements); }'
+        }
+    }
+
+    if chartType in [ChartType.PIE, ChartType.DONUT]:
+        baseConfig['plugins']['tooltip']['callbacks']['label'] = (
+            'function(context) { '
+            'const label = context.label || ""; '
+            'const value = context.parsed || context.raw; '
+            'const total = context.dataset.data.reduce((a, b) => a + b, 0); '
+            'const percentage = Math.round((value / total) * 100); '
+            'return `${label}: $${value.toFixed(2)} (${percentage}%)`; '
+            '}'
+        )
+    elif chartType == ChartType.BAR:
+        baseConfig['plugins']['tooltip']['callbacks']['label'] = (
+            'function(context) { '
+            'const datasetLabel = context.dataset.label || ""; '
+            'const value = context.parsed.y || context.raw; '
+            'return `${datasetLabel}: $${value.toFixed(2)}`; '
+            '}'
+        )
+    elif chartType == ChartType.LINE:
+        baseConfig['plugins']['tooltip']['callbacks']['label'] = (
+            'function(context) { '
+            'const datasetLabel = context.dataset.label || ""; '
+            'const value = context.parsed.y || context.raw; '
+            'return `${datasetLabel}: $${value.toFixed(2)}`; '
+            '}'
+        )
+
+    return _freeze(baseConfig)
+
+#One consistent read of everything the dashboard charts show. categories is a copy of the budget's
+#list, spending the BudgetManager's recorded totals per categoryID, trend the spending series from
+#TransactionManager.get_spending_series, expenseTypeTotals {expenseType or None: (total, count)}.
+#version is BudgetChartManager.get_data_version as it was when the snapshot was taken.
+class ChartSnapshot(NamedTuple):
+    income: float
+    categories: Tuple['Category', ...]
+    spending: Dict[int, float]
+    trend: dict
+    expenseTypeTotals: Dict[Optional[ExpenseType], Tuple[float, int]]
+    version: tuple
+
 class TooltipManager:
     def __init__(self):
         self.activeTooltip = None
         self.tooltipTimeout = None
+        #budgetID: (data version, {chart name: [tooltip per element]}), see BudgetChartManager.get_chart_tooltips
+        self.precomputed: Dict[int, Tuple[tuple, Dict[str, List[dict]]]] = {}
     
     def create_tooltip_data(self, chartType: str, elementIndex: int, elementData: Dict, budget: Budget) -> Dict[str, Any]:
         tooltip_data = {
@@ -43,28 +235,46 @@ class TooltipManager:
         
         return tooltip_data
     
+    #Tooltips for every element of every chart, built once from the snapshot the charts came from, so
+    #totals are summed once per chart instead of once per hovered element. The list positions are the
+    #element indexes create_tooltip_data takes.
+    def build_all_tooltips(self, snapshot: 'ChartSnapshot', charts: dict) -> Dict[str, List[dict]]:
+        colors = charts['category_breakdown']['datasets'][0]['backgroundColor']
+        totalBudget = sum(cat.plannedAmnt for cat in snapshot.categories)
+        fixedAmount, variableAmount = charts['expense_type_breakdown']['datasets'][0]['data']
+        trend = charts['spending_trend']
+        return {
+            'category_breakdown': [self.category_tooltip(category, totalBudget, colors[i])
+                                   for i, category in enumerate(snapshot.categories)],
+            'income_vs_expenses': self.income_expenses_tooltips(snapshot.income, totalBudget),
+            'actual_vs_planned': [self.budget_comparison_tooltip(category, snapshot.spending.get(category.categoryID, 0.0),
+                                                                 ACTUAL_VS_PLANNED_STYLES[1]['borderColor'])
+                                  for category in snapshot.categories],
+            'expense_type_breakdown': self.expense_type_tooltips(fixedAmount, variableAmount),
+            'spending_trend': [self.trend_tooltip(label, amount)
+                               for label, amount in zip(trend['labels'], trend['datasets'][0]['data'])]
+        }
+    
+    def category_tooltip(self, category: 'Category', totalBudget: float, color: str) -> Dict[str, Any]:
+        percentage = (category.plannedAmnt / totalBudget * 100) if totalBudget > 0 else 0
+        return {
+            'title': category.name,
+            'amount': f"${category.plannedAmnt:.2f}",
+            'percentage': f"{percentage:.1f}%",
+            'type': category.type,
+            'details': f"Planned amount: ${category.plannedAmnt:.2f}",
+            'color': color
+        }
+    
     def get_category_tooltip(self, elementIndex: int, elementData: Dict, budget: Budget) -> Dict[str, Any]:
         if elementIndex < len(budget.categories):
-            category = budget.categories[elementIndex]
             totalBudget = sum(cat.plannedAmnt for cat in budget.categories)
-            percentage = (category.plannedAmnt / totalBudget * 100) if totalBudget > 0 else 0
-            
-            return {
-                'title': category.name,
-                'amount': f"${category.plannedAmnt:.2f}",
-                'percentage': f"{percentage:.1f}%",
-                'type': category.type,
-                'details': f"Planned amount: ${category.plannedAmnt:.2f}",
-                'color': elementData.get('color', '#cccccc')
-            }
+            return self.category_tooltip(budget.categories[elementIndex], totalBudget, elementData.get('color', '#cccccc'))
         return {'error': 'Category not found'}
     
-    def get_income_expenses_tooltip(self, elementIndex: int, elementData: Dict, budget: Budget) -> Dict[str, Any]:
-        totalIncome = budget.income
-        totalExpenses = sum(cat.plannedAmnt for cat in budget.categories)
+    def income_expenses_tooltips(self, totalIncome: float, totalExpenses: float) -> List[Dict[str, Any]]:
         remaining = max(0, totalIncome - totalExpenses)
-        
-        elements = [
+        return [
             {
                 'title': 'Total Income',
                 'amount': f"${totalIncome:.2f}",
@@ -84,56 +294,66 @@ class TooltipManager:
                 'color': '#2196F3'
             }
         ]
+    
+    def get_income_expenses_tooltip(self, elementIndex: int, elementData: Dict, budget: Budget) -> Dict[str, Any]:
+        elements = self.income_expenses_tooltips(budget.income, sum(cat.plannedAmnt for cat in budget.categories))
         
         if elementIndex < len(elements):
             return elements[elementIndex]
         return {'error': 'Element not found'}
     
+    def budget_comparison_tooltip(self, category: 'Category', actual: float, color: str) -> Dict[str, Any]:
+        return {
+            'title': category.name,
+            'planned': f"${category.plannedAmnt:.2f}",
+            'actual': f"${actual:.2f}",
+            'variance': f"${category.plannedAmnt - actual:.2f}",
+            'details': f"Planned: ${category.plannedAmnt:.2f} | Used: ${actual:.2f}",
+            'color': color
+        }
+    
+    #Without the recorded spending the actual amount is a placeholder; precomputed tooltips use real spending
     def get_budget_comparison_tooltip(self, elementIndex: int, elementData: Dict, budget: Budget) -> Dict[str, Any]:
         if elementIndex < len(budget.categories):
             category = budget.categories[elementIndex]
-            
-            return {
-                'title': category.name,
-                'planned': f"${category.plannedAmnt:.2f}",
-                'actual': f"${category.plannedAmnt * 0.8:.2f}",  # Placeholder
-                'variance': f"${category.plannedAmnt * 0.2:.2f}",
-                'details': f"Planned: ${category.plannedAmnt:.2f} | Used: ${category.plannedAmnt * 0.8:.2f}",
-                'color': elementData.get('color', '#cccccc')
-            }
+            return self.budget_comparison_tooltip(category, category.plannedAmnt * 0.8, elementData.get('color', '#cccccc'))
         return {'error': 'Category not found'}
     
-    def get_expense_type_tooltip(self, elementIndex: int, elementData: Dict) -> Dict[str, Any]:
-        expense_types = [
+    def expense_type_tooltips(self, fixedAmount: float, variableAmount: float) -> List[Dict[str, Any]]:
+        return [
             {
                 'title': 'Fixed Expenses',
-                'amount': elementData.get('fixed_amount', 0),
+                'amount': f"${fixedAmount:.2f}",
                 'details': 'Regular, predictable expenses',
                 'color': '#FF9800'
             },
             {
                 'title': 'Variable Expenses',
-                'amount': elementData.get('variable_amount', 0),
+                'amount': f"${variableAmount:.2f}",
                 'details': 'Changing, discretionary expenses',
                 'color': '#9C27B0'
             }
         ]
+    
+    def get_expense_type_tooltip(self, elementIndex: int, elementData: Dict) -> Dict[str, Any]:
+        expense_types = self.expense_type_tooltips(elementData.get('fixed_amount', 0), elementData.get('variable_amount', 0))
         
         if elementIndex < len(expense_types):
-            tooltip = expense_types[elementIndex]
-            tooltip['amount'] = f"${tooltip['amount']:.2f}"
-            return tooltip
+            return expense_types[elementIndex]
         return {'error': 'Expense type not found'}
     
+    def trend_tooltip(self, label: str, amount: float) -> Dict[str, Any]:
+        return {
+            'title': label,
+            'amount': f"${amount:.2f}",
+            'details': f"Total spending in {label}",
+            'color': '#F44336'
+        }
+    
     def get_trend_tooltip(self, elementIndex: int, elementData: Dict) -> Dict[str, Any]:
         months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
         if elementIndex < len(months):
-            return {
-                'title': months[elementIndex],
-                'amount': f"${elementData.get('amount', 0):.2f}",
-                'details': f"Total spending in {months[elementIndex]}",
-                'color': '#F44336'
-            }
+            return self.trend_tooltip(months[elementIndex], elementData.get('amount', 0))
         return {'error': 'Month not found'}
     
     def hide_tooltip(self) -> Dict[str, Any]:
@@ -155,107 +375,120 @@ class BudgetChartManager:
             'tooltip_delay': 300  # ms delay before showing tooltip
         }
     
+    #Reads the budget once and the transaction and spending data under both managers' read locks,
+    #taken in the same order as TransactionImporter takes its write locks.
+    #Versions are read before the data, so a change made meanwhile can only make the snapshot look
+    #older than it is, never newer.
+    def take_chart_snapshot(self, budget: 'Budget', months: int = 6) -> ChartSnapshot:
+        endDate = date.today()
+        startDate = endDate - timedelta(days=30*months)
+        budgetVersion = budget.get_version()
+        categories = tuple(budget.categories)
+        with self.transactionManager.lock.read_locked(), self.budgetManager.lock.read_locked():
+            version = (budgetVersion, self.budgetManager.version, self.transactionManager.get_version(), endDate.toordinal())
+            transactions = self.transactionManager.get_chart_snapshot(startDate, endDate)
+            spending = self.budgetManager.get_spending_snapshot()
+        return ChartSnapshot(budget.income, categories, spending, transactions['trend'],
+                             transactions['expense_type_totals'], version)
+    
+    #Changes with the budget, the recorded spending and the transactions; today is part of it
+    #because the trend window ends today
+    def get_data_version(self, budget: 'Budget') -> tuple:
+        return (budget.get_version(), self.budgetManager.version, self.transactionManager.get_version(), date.today().toordinal())
+    
+    def get_chart_bundle(self, budget: 'Budget') -> dict:
+        return self.build_chart_bundle(self.take_chart_snapshot(budget))
+    
+    #The five dashboard charts derived from a single snapshot, so they all describe the same data
+    def build_chart_bundle(self, snapshot: ChartSnapshot) -> dict:
+        return {
+            'income_vs_expenses': self.build_income_vs_expenses(snapshot.income, snapshot.categories),
+            'category_breakdown': self.build_category_breakdown(snapshot.categories),
+            'spending_trend': self.build_spending_trend(snapshot.trend),
+            'actual_vs_planned': self.build_actual_vs_planned(snapshot.categories, snapshot.spending),
+            'expense_type_breakdown': self.build_expense_type_breakdown(snapshot.expenseTypeTotals)
+        }
+    
+    #Tooltips for every chart element, kept per budget until get_data_version changes, so hovers and
+    #repeated chart loads do not rebuild them. Pass the snapshot and charts when they were just built.
+    def get_chart_tooltips(self, budget: 'Budget', snapshot: ChartSnapshot = None, charts: dict = None) -> Dict[str, List[dict]]:
+        version = snapshot.version if snapshot is not None else self.get_data_version(budget)
+        cached = self.tooltipManager.precomputed.get(budget.budgetID)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        if snapshot is None or charts is None:
+            snapshot = self.take_chart_snapshot(budget)
+            charts = self.build_chart_bundle(snapshot)
+        tooltips = self.tooltipManager.build_all_tooltips(snapshot, charts)
+        self.tooltipManager.precomputed[budget.budgetID] = (snapshot.version, tooltips)
+        return tooltips
+    
     def get_income_vs_expenses_data(self, budget: 'Budget') -> dict:
-        totalIncome = budget.income
-        totalExpenses = sum(cat.plannedAmnt for cat in budget.categories)
+        return self.build_income_vs_expenses(budget.income, budget.categories)
+    
+    def build_income_vs_expenses(self, totalIncome: float, categories) -> dict:
+        totalExpenses = sum(cat.plannedAmnt for cat in categories)
         
         return {
             'labels': ['Income', 'Expenses', 'Remaining'],
-            'datasets': [{
-                'data': [totalIncome, totalExpenses, max(0, totalIncome - totalExpenses)],
-                'backgroundColor': ['#4CAF50', '#F44336', '#2196F3'],
-                'borderColor': ['#45a049', '#d32f2f', '#1976d2'],
-                'borderWidth': 2,
-                'hoverBackgroundColor': ['#66BB6A', '#EF5350', '#42A5F5'],
-                'hoverBorderColor': ['#4CAF50', '#F44336', '#2196F3'],
-                'hoverBorderWidth': 3
-            }]
+            'datasets': [dict(INCOME_VS_EXPENSES_STYLE, data=[totalIncome, totalExpenses, max(0, totalIncome - totalExpenses)])]
+        }
+    
+    def get_category_breakdown_style(self, count: int) -> dict:
+        palette = get_theme_palette(self.chartPreferences['theme'])
+        darker = _cycle(palette.darker, count)
+        return {
+            'backgroundColor': _cycle(palette.colors, count),
+            'borderColor': darker,
+            'borderWidth': 2,
+            'hoverOffset': 15,
+            'hoverBackgroundColor': _cycle(palette.lighter, count),
+            'hoverBorderColor': darker,
+            'hoverBorderWidth': 3
         }
     
     def get_category_breakdown_data(self, budget: 'Budget') -> dict:
+        return self.build_category_breakdown(budget.categories)
+    
+    def build_category_breakdown(self, budgetCategories) -> dict:
         categories = []
         amounts = []
-        colors = self.generate_colors(len(budget.categories))
-        hoverColors = [self._lighten_color(color) for color in colors]
         
-        for i, category in enumerate(budget.categories):
+        for category in budgetCategories:
             if category.plannedAmnt > 0:
                 categories.append(category.name)
                 amounts.append(category.plannedAmnt)
         
         return {
             'labels': categories,
-            'datasets': [{
-                'data': amounts,
-                'backgroundColor': colors,
-                'borderColor': [self.darken_color(color) for color in colors],
-                'borderWidth': 2,
-                'hoverOffset': 15,
-                'hoverBackgroundColor': hoverColors,
-                'hoverBorderColor': [self.darken_color(color) for color in colors],
-                'hoverBorderWidth': 3
-            }]
+            'datasets': [dict(self.get_category_breakdown_style(len(budgetCategories)), data=amounts)]
         }
     
-    def get_spending_trend_data(self, months: int = 6) -> dict:
+    #The months (or weeks or days) from 30*months days ago up to today. Longer windows can be capped
+    #at maxPoints points with a downsampling mode; see TransactionManager.get_spending_series.
+    def get_spending_trend_data(self, months: int = 6, resolution: str = 'month', maxPoints: int = None,
+                                mode: str = 'sum') -> dict:
         endDate = date.today()
         startDate = endDate - timedelta(days=30*months)
-        
-        monthlyData = {}
-        current = startDate
-        
-        while current <= endDate:
-            monthKey = current.strftime("%Y-%m")
-            monthlyData[monthKey] = {
-                'income': 0.0,
-                'expenses': 0.0,
-                'date': current
-            }
-
-            if current.month == 12:
-                current = current.replace(year=current.year + 1, month=1)
-            else:
-                current = current.replace(month=current.month + 1)
-        
-        transactions = self.transactionManager.get_transactions_by_date_range(
-            startDate, endDate
-        )
-        
-        for transaction in transactions:
-            monthKey = transaction.date.strftime("%Y-%m")
-            if monthKey in monthlyData:
-                monthlyData[monthKey]['expenses'] += transaction.total
-        
-        sorted_months = sorted(monthlyData.keys())
-        
+        return self.build_spending_trend(
+            self.transactionManager.get_spending_series(startDate, endDate, resolution, maxPoints=maxPoints, mode=mode))
+    
+    def build_spending_trend(self, series: dict) -> dict:
+        labelFormat = '%Y/%m' if series['resolution'] == 'month' else '%Y/%m/%d'
         return {
-            'labels': [month.replace('-', '/') for month in sorted_months],
-            'datasets': [
-                {
-                    'label': 'Expenses',
-                    'data': [monthlyData[month]['expenses'] for month in sorted_months],
-                    'borderColor': '#F44336',
-                    'backgroundColor': 'rgba(244, 67, 54, 0.1)',
-                    'tension': 0.4,
-                    'fill': True,
-                    'pointBackgroundColor': '#F44336',
-                    'pointBorderColor': '#ffffff',
-                    'pointHoverBackgroundColor': '#EF5350',
-                    'pointHoverBorderColor': '#ffffff',
-                    'pointHoverRadius': 6,
-                    'pointHitRadius': 10
-                }
-            ]
+            'labels': [day.strftime(labelFormat) for day in series['labels']],
+            'datasets': [dict(SPENDING_TREND_STYLE, data=series['totals'])]
         }
     
     def get_actual_vs_planned_data(self, budget: 'Budget') -> dict:
-        actualSpending = self.budget_manager.get_spending_by_category()
-        
+        return self.build_actual_vs_planned(budget.categories, self.budgetManager.get_spending_snapshot())
+    
+    def build_actual_vs_planned(self, budgetCategories, actualSpending: Dict[int, float]) -> dict:
         categories = []
         planned = []
         actual = []
         
-        for category in budget.categories:
+        for category in budgetCategories:
             if category.plannedAmnt > 0:
                 categories.append(category.name)
                 planned.append(category.plannedAmnt)
@@ -264,24 +497,8 @@ class BudgetChartManager:
         return {
             'labels': categories,
             'datasets': [
-                {
-                    'label': 'Planned',
-                    'data': planned,
-                    'backgroundColor': 'rgba(54, 162, 235, 0.7)',
-                    'borderColor': 'rgba(54, 162, 235, 1)',
-                    'borderWidth': 1,
-                    'hoverBackgroundColor': 'rgba(54, 162, 235, 0.9)',
-                    'hoverBorderColor': 'rgba(54, 162, 235, 1)'
-                },
-                {
-                    'label': 'Actual',
-                    'data': actual,
-                    'backgroundColor': 'rgba(255, 99, 132, 0.7)',
-                    'borderColor': 'rgba(255, 99, 132, 1)',
-                    'borderWidth': 1,
-                    'hoverBackgroundColor': 'rgba(255, 99, 132, 0.9)',
-                    'hoverBorderColor': 'rgba(255, 99, 132, 1)'
-                }
+                dict(ACTUAL_VS_PLANNED_STYLES[0], data=planned),
+                dict(ACTUAL_VS_PLANNED_STYLES[1], data=actual)
             ]
         }
     
@@ -290,94 +507,28 @@ class BudgetChartManager:
         
         return {
             'labels': ['Fixed Expenses', 'Variable Expenses'],
-            'datasets': [{
-                'data': [
-                    stats['fixed_amount'],
-                    stats['variable_amount']
-                ],
-                'backgroundColor': ['#FF9800', '#9C27B0'],
-                'borderColor': ['#F57C00', '#7B1FA2'],
-                'borderWidth': 2,
-                'hoverBackgroundColor': ['#FFB74D', '#BA68C8'],
-                'hoverBorderColor': ['#FF9800', '#9C27B0']
-            }]
+            'datasets': [dict(EXPENSE_TYPE_STYLE, data=[stats['fixed_amount'], stats['variable_amount']])]
         }
     
-    def get_interactive_chart_config(self, chartType: ChartType) -> dict:
-        baseConfig = {
-            'responsive': True,
-            'maintainAspectRatio': False,
-            'interaction': {
-                'intersect': False,
-                'mode': 'nearest'
-            },
-            'plugins': {
-                'legend': {
-                    'position': 'top',
-                    'labels': {
-                        'usePointStyle': True,
-                        'padding': 20,
-                        'font': {
-                            'size': 12
-                        }
-                    }
-                },
-                'tooltip': {
-                    'enabled': True,
-                    'backgroundColor': 'rgba(0, 0, 0, 0.8)',
-                    'titleColor': '#ffffff',
-                    'bodyColor': '#ffffff',
-                    'borderColor': 'rgba(255, 255, 255, 0.2)',
-                    'borderWidth': 1,
-                    'cornerRadius': 8,
-                    'padding': 12,
-                    'displayColors': True,
-                    'usePointStyle': True,
-                    'callbacks': {
-                        'label': 'function(context) { return self.getTooltipLabel(context); }'
-                    }
-                }
-            },
-            'hover': {
-                'animationDuration': 300,
-                'onHover': 'function(event, elements) { self.handleChartHover(event, elements); }'
-            }
+    def build_expense_type_breakdown(self, expenseTypeTotals: Dict[Optional[ExpenseType], Tuple[float, int]]) -> dict:
+        return {
+            'labels': ['Fixed Expenses', 'Variable Expenses'],
+            'datasets': [dict(EXPENSE_TYPE_STYLE, data=[expenseTypeTotals[ExpenseType.FIXED][0],
+                                                         expenseTypeTotals[ExpenseType.VARIABLE][0]])]
         }
-        
-        if chartType in [ChartType.PIE, ChartType.DONUT]:
-            baseConfig['plugins']['tooltip']['callbacks']['label'] = (
-                'function(context) { '
-                'const label = context.label || ""; '
-                'const value = context.parsed || context.raw; '
-                'const total = context.dataset.data.reduce((a, b) => a + b, 0); '
-                'const percentage = Math.round((value / total) * 100); '
-                'return `${label}: $${value.toFixed(2)} (${percentage}%)`; '
-                '}'
-            )
-        elif chartType == ChartType.BAR:
-            baseConfig['plugins']['tooltip']['callbacks']['label'] = (
-                'function(context) { '
-                'const datasetLabel = context.dataset.label || ""; '
-                'const value = context.parsed.y || context.raw; '
-                'return `${datasetLabel}: $${value.toFixed(2)}`; '
-                '}'
-            )
-        elif chartType == ChartType.LINE:
-            baseConfig['plugins']['tooltip']['callbacks']['label'] = (
-                'function(context) { '
-                'const datasetLabel = context.dataset.label || ""; '
-                'const value = context.parsed.y || context.raw; '
-                'return `${datasetLabel}: $${value.toFixed(2)}`; '
-                '}'
-            )
-        
-        return baseConfig
+    
+    def get_interactive_chart_config(self, chartType: ChartType) -> MappingProxyType:
+        return build_chart_config(chartType)
     
     def handle_chart_hover(self, chartType: str, elementIndex: int, elementData: Dict, budget: Budget, position: Dict) -> Dict[str, Any]:
         if elementIndex >= 0:  # Valid element hovered
-            tooltipData = self.tooltipManager.create_tooltip_data(
-                chartType, elementIndex, elementData, budget
-            )
+            tooltips = self.get_chart_tooltips(budget).get(chartType)
+            if tooltips is not None and elementIndex < len(tooltips):
+                tooltipData = dict(tooltips[elementIndex])
+            else:
+                tooltipData = self.tooltipManager.create_tooltip_data(
+                    chartType, elementIndex, elementData, budget
+                )
             tooltipData['position'] = position
             return {
                 'action': 'show_tooltip',
@@ -463,45 +614,13 @@ class BudgetChartManager:
             }
     
     def generate_colors(self, count: int) -> List[str]:
-        colorPalettes = {
-            ChartTheme.COLORFUL: [
-                '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF',
-                '#FF9F40', '#FF6384', '#C9CBCF', '#4BC0C0', '#FF6384'
-            ],
-            ChartTheme.LIGHT: [
-                '#E8F4FD', '#FDECEF', '#FEF7E0', '#E8F7F7', '#F2EFFD',
-                '#FFF0E6', '#E6F4EA', '#FCE8F3', '#E8F4FD', '#F0F4FF'
-            ],
-            ChartTheme.DARK: [
-                '#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#3B1C32',
-                '#6B8F71', '#9C7CA5', '#2A4D14', '#5D5D81', '#8F754F'
-            ]
-        }
-        
-        palette = colorPalettes[self.chart_preferences['theme']]
-        return [palette[i % len(palette)] for i in range(count)]
+        return _cycle(get_theme_palette(self.chartPreferences['theme']).colors, count)
     
     def darken_color(self, color: str) -> str:
-        if color.startswith('#'):
-            r = int(color[1:3], 16)
-            g = int(color[3:5], 16)
-            b = int(color[5:7], 16)
-            r = max(0, r - 30)
-            g = max(0, g - 30)
-            b = max(0, b - 30)
-            return f'#{r:02x}{g:02x}{b:02x}'
-        return color
+        return shift_color(color, -30)
     
     def lighten_color(self, color: str) -> str:
-        if color.startswith('#'):
-            r = int(color[1:3], 16)
-            g = int(color[3:5], 16)
-            b = int(color[5:7], 16)
-            r = min(255, r + 30)
-            g = min(255, g + 30)
-            b = min(255, b + 30)
-            return f'#{r:02x}{g:02x}{b:02x}'
-        return color
+        return shift_color(color, 30)
     
     def update_chart_preferences(self, preferences: dict):
         if 'default_type' in preferences:
@@ -514,26 +633,58 @@ class BudgetChartManager:
             self.chartPreferences['interactive'] = bool(preferences['interactive'])
         if 'tooltip_delay' in preferences:
             self.chartPreferences['tooltip_delay'] = int(preferences['tooltip_delay'])
+        #precomputed tooltips carry the theme's colors
+        self.tooltipManager.precomputed.clear()
+    
+    #Everything in a chart response that does not depend on the user's data: Chart.js options per
+    #chart type, dataset styles per chart and the preferences. Category colors are given for a full
+    #palette; the client repeats them for more categories.
+    def get_static_chart_config(self) -> dict:
+        return {
+            'chart_configs': {chartType.value: self.get_interactive_chart_config(chartType) for chartType in ChartType},
+            'dataset_styles': {
+                'income_vs_expenses': [INCOME_VS_EXPENSES_STYLE],
+                'category_breakdown': [self.get_category_breakdown_style(PALETTE_SIZE)],
+                'spending_trend': [SPENDING_TREND_STYLE],
+                'actual_vs_planned': ACTUAL_VS_PLANNED_STYLES,
+                'expense_type_breakdown': [EXPENSE_TYPE_STYLE]
+            },
+            'preferences': self.get_preferences_data(),
+            'tooltip_support': True
+        }
+    
+    def get_preferences_data(self) -> dict:
+        return {
+            'default_type': self.chartPreferences['default_type'].value,
+            'theme': self.chartPreferences['theme'].value,
+            'animate': self.chartPreferences['animate'],
+            'interactive': self.chartPreferences['interactive'],
+            'tooltip_delay': self.chartPreferences['tooltip_delay']
+        }
+    
+    #Slim version of get_all_chart_data: only labels and numbers, to be combined with
+    #get_static_chart_config() on the client.
+    def get_chart_data_only(self, budget: 'Budget') -> dict:
+        charts = self.get_chart_bundle(budget)
+        return {
+            name: {
+                'labels': chart['labels'],
+                'data': [dataset['data'] for dataset in chart['datasets']]
+            } for name, chart in charts.items()
+        }
     
     def get_all_chart_data(self, budget: 'Budget') -> dict:
+        snapshot = self.take_chart_snapshot(budget)
+        charts = self.build_chart_bundle(snapshot)
         return {
-            'income_vs_expenses': self.get_income_vs_expenses_data(budget),
-            'category_breakdown': self.get_category_breakdown_data(budget),
-            'spending_trend': self.get_spending_trend_data(),
-            'actual_vs_planned': self.get_actual_vs_planned_data(budget),
-            'expense_type_breakdown': self.get_expense_type_breakdown(),
+            **charts,
             'chart_configs': {
                 'pie': self.get_interactive_chart_config(ChartType.PIE),
                 'bar': self.get_interactive_chart_config(ChartType.BAR),
                 'line': self.get_interactive_chart_config(ChartType.LINE),
                 'donut': self.get_interactive_chart_config(ChartType.DONUT)
             },
-            'preferences': {
-                'default_type': self.chartPreferences['default_type'].value,
-                'theme': self.chartPreferences['theme'].value,
-                'animate': self.chartPreferences['animate'],
-                'interactive': self.chartPreferences['interactive'],
-                'tooltip_delay': self.chartPreferences['tooltip_delay']
-            },
-            'tooltip_support': True
+            'preferences': self.get_preferences_data(),
+            'tooltip_support': True,
+            'tooltips': self.get_chart_tooltips(budget, snapshot, charts)
         }
\ No newline at end of file
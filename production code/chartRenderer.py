@@ -0,0 +1,243 @@
+import hashlib
+import io
+import math
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+from xml.sax.saxutils import escape
+from chart import ChartTheme, ChartType, get_theme_palette
+from serializer import dumps
+
+try:
+    from matplotlib.figure import Figure
+except ImportError:
+    Figure = None
+
+#Static images of the dashboard charts for places that cannot run Chart.js, such as statement and
+#alert emails. SVG is written directly; PNG needs matplotlib and is only offered when it is
+#installed. Images depend only on the chart's labels and numbers, the theme, the format and the
+#size, so ChartImageCache stores each one once under the hash of those.
+
+#how each dashboard chart is drawn, as on the dashboard page
+CHART_TYPES = {
+    'income_vs_expenses': ChartType.PIE,
+    'category_breakdown': ChartType.DONUT,
+    'spending_trend': ChartType.LINE,
+    'actual_vs_planned': ChartType.BAR,
+    'expense_type_breakdown': ChartType.PIE,
+}
+
+#bump when the drawing changes so cached images are not reused
+RENDERER_VERSION = 1
+
+DEFAULT_SIZE = (480, 280)
+
+def _theme_colors(theme: ChartTheme) -> Tuple[str, str]:
+    #background, text
+    return ('#1e1e1e', '#eeeeee') if theme == ChartTheme.DARK else ('#ffffff', '#333333')
+
+def _title(name: str) -> str:
+    return name.replace('_', ' ').title()
+
+def _svg_legend(labels: Sequence[str], colors: Sequence[str], x: float, y: float, textColor: str) -> List[str]:
+    parts = []
+    for i, label in enumerate(labels):
+        top = y + i * 18
+        parts.append(f'<rect x="{x}" y="{top}" width="12" height="12" fill="{colors[i % len(colors)]}"/>')
+        parts.append(f'<text x="{x + 18}" y="{top + 10}" font-size="11" fill="{textColor}">{escape(str(label))}</text>')
+    return parts
+
+def _svg_pie(labels, series, colors, width, height, textColor, background, donut) -> List[str]:
+    values = [max(0.0, value) for value in series[0]]
+    total = sum(values)
+    radius = min(width * 0.6, height - 50) / 2
+    cx, cy = 20 + radius, 35 + radius
+    parts = []
+    angle = -math.pi / 2
+    for i, value in enumerate(values):
+        if not value:
+            continue
+        color = colors[i % len(colors)]
+        if value == total:
+            parts.append(f'<circle cx="{cx}" cy="{cy}" r="{radius:.1f}" fill="{color}"/>')
+            break
+        sweep = 2 * math.pi * value / total
+        x1, y1 = cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+        angle += sweep
+        x2, y2 = cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+        parts.append(f'<path d="M{cx:.1f},{cy:.1f} L{x1:.1f},{y1:.1f} A{radius:.1f},{radius:.1f} 0 '
+                     f'{int(sweep > math.pi)},1 {x2:.1f},{y2:.1f} Z" fill="{color}"/>')
+    if donut:
+        parts.append(f'<circle cx="{cx}" cy="{cy}" r="{radius * 0.55:.1f}" fill="{background}"/>')
+    return parts + _svg_legend(labels, colors, cx + radius + 30, 40, textColor)
+
+def _svg_bar(labels, series, colors, width, height, textColor) -> List[str]:
+    top, bottom, left, right = 35, height - 30, 40, width - 15
+    peak = max([value for data in series for value in data] + [0]) or 1
+    slot = (right - left) / max(1, len(labels))
+    barWidth = slot * 0.8 / len(series)
+    parts = [f'<line x1="{left}" y1="{bottom}" x2="{right}" y2="{bottom}" stroke="{textColor}"/>']
+    for i, label in enumerate(labels):
+        for j, data in enumerate(series):
+            barHeight = (bottom - top) * max(0.0, data[i]) / peak
+            color = colors[(j if len(series) > 1 else i) % len(colors)]
+            x = left + i * slot + slot * 0.1 + j * barWidth
+            parts.append(f'<rect x="{x:.1f}" y="{bottom - barHeight:.1f}" width="{barWidth:.1f}" '
+                         f'height="{barHeight:.1f}" fill="{color}"/>')
+        parts.append(f'<text x="{left + (i + 0.5) * slot:.1f}" y="{bottom + 15}" font-size="10" '
+                     f'text-anchor="middle" fill="{textColor}">{escape(str(label))}</text>')
+    parts.append(f'<text x="{left - 4}" y="{top + 4}" font-size="10" text-anchor="end" fill="{textColor}">{peak:.0f}</text>')
+    return parts
+
+def _svg_line(labels, series, colors, width, height, textColor) -> List[str]:
+    top, bottom, left, right = 35, height - 30, 40, width - 15
+    peak = max([value for data in series for value in data] + [0]) or 1
+    step = (right - left) / max(1, len(labels) - 1)
+    parts = [f'<line x1="{left}" y1="{bottom}" x2="{right}" y2="{bottom}" stroke="{textColor}"/>']
+    for j, data in enumerate(series):
+        points = ' '.join(f'{left + i * step:.1f},{bottom - (bottom - top) * max(0.0, value) / peak:.1f}'
+                          for i, value in enumerate(data))
+        parts.append(f'<polyline points="{points}" fill="none" stroke="{colors[j % len(colors)]}" stroke-width="2"/>')
+    #at most about eight x labels whatever the number of points
+    every = max(1, math.ceil(len(labels) / 8))
+    for i in range(0, len(labels), every):
+        parts.append(f'<text x="{left + i * step:.1f}" y="{bottom + 15}" font-size="10" text-anchor="middle" '
+                     f'fill="{textColor}">{escape(str(labels[i]))}</text>')
+    parts.append(f'<text x="{left - 4}" y="{top + 4}" font-size="10" text-anchor="end" fill="{textColor}">{peak:.0f}</text>')
+    return parts
+
+def render_svg(name: str, labels: Sequence[str], series: Sequence[Sequence[float]], theme: ChartTheme = ChartTheme.COLORFUL,
+               size: Tuple[int, int] = DEFAULT_SIZE) -> bytes:
+    width, height = size
+    background, textColor = _theme_colors(theme)
+    colors = get_theme_palette(theme).colors
+    chartType = CHART_TYPES.get(name, ChartType.BAR)
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" font-family="sans-serif">',
+             f'<rect width="{width}" height="{height}" fill="{background}"/>',
+             f'<text x="{width / 2}" y="20" font-size="14" text-anchor="middle" '
+             f'fill="{textColor}">{escape(_title(name))}</text>']
+    if chartType in (ChartType.PIE, ChartType.DONUT):
+        parts += _svg_pie(labels, series, colors, width, height, textColor, background, chartType == ChartType.DONUT)
+    elif chartType == ChartType.LINE:
+        parts += _svg_line(labels, series, colors, width, height, textColor)
+    else:
+        parts += _svg_bar(labels, series, colors, width, height, textColor)
+    parts.append('</svg>')
+    return '\n'.join(parts).encode('utf-8')
+
+#Same layout drawn by matplotlib, for mail clients that do not show SVG
+def render_png(name: str, labels: Sequence[str], series: Sequence[Sequence[float]], theme: ChartTheme = ChartTheme.COLORFUL,
+               size: Tuple[int, int] = DEFAULT_SIZE) -> bytes:
+    background, textColor = _theme_colors(theme)
+    colors = list(get_theme_palette(theme).colors)
+    chartType = CHART_TYPES.get(name, ChartType.BAR)
+    figure = Figure(figsize=(size[0] / 100, size[1] / 100), dpi=100, facecolor=background)
+    axes = figure.add_subplot()
+    axes.set_facecolor(background)
+    axes.set_title(_title(name), color=textColor, fontsize=12)
+    axes.tick_params(colors=textColor, labelsize=8)
+    if chartType in (ChartType.PIE, ChartType.DONUT):
+        values = [max(0.0, value) for value in series[0]]
+        if sum(values):
+            axes.pie(values, colors=[colors[i % len(colors)] for i in range(len(values))],
+                     wedgeprops={'width': 0.45} if chartType == ChartType.DONUT else None)
+            axes.legend([str(label) for label in labels], loc='center left', bbox_to_anchor=(1, 0.5), fontsize=8,
+                        labelcolor=textColor, frameon=False)
+    elif chartType == ChartType.LINE:
+        for j, data in enumerate(series):
+            axes.plot(range(len(data)), data, color=colors[j % len(colors)], linewidth=2)
+        every = max(1, math.ceil(len(labels) / 8))
+        axes.set_xticks(range(0, len(labels), every), [str(label) for label in labels[::every]])
+    else:
+        barWidth = 0.8 / len(series)
+        for j, data in enumerate(series):
+            barColors = colors[j % len(colors)] if len(series) > 1 else [colors[i % len(colors)] for i in range(len(data))]
+            axes.bar([i + j * barWidth for i in range(len(data))], data, width=barWidth, color=barColors)
+        axes.set_xticks([i + barWidth * (len(series) - 1) / 2 for i in range(len(labels))], [str(label) for label in labels])
+    figure.tight_layout()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', facecolor=background)
+    return buffer.getvalue()
+
+#format: (renderer, mimetype, file extension)
+RENDERERS: Dict[str, Tuple[Callable[..., bytes], str, str]] = {
+    'svg': (render_svg, 'image/svg+xml', 'svg'),
+}
+
+if Figure is not None:
+    RENDERERS['png'] = (render_png, 'image/png', 'png')
+
+#PNG when matplotlib is installed, since not every mail client shows SVG
+def default_image_format() -> str:
+    return 'png' if 'png' in RENDERERS else 'svg'
+
+#Content-addressed store of rendered charts: the file name is the SHA-256 of everything the image
+#depends on, so identical charts (the same statement sent again, users with the same numbers, every
+#empty chart) are rendered once, and a changed chart can never be served from a stale file. Files
+#are written to a temporary name and renamed, so concurrent renders of the same chart are harmless.
+class ChartImageCache:
+    def __init__(self, directory: str = None):
+        self.directory = directory if directory is not None else os.path.join(tempfile.gettempdir(), 'budget-chart-images')
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def image_key(name: str, labels: Sequence[str], series: Sequence[Sequence[float]], theme: ChartTheme,
+                  fileFormat: str, size: Tuple[int, int]) -> str:
+        content = dumps([RENDERER_VERSION, name, [str(label) for label in labels], [list(data) for data in series],
+                         theme.value, fileFormat, list(size)])
+        return hashlib.sha256(content).hexdigest()
+
+    def get_path(self, key: str, fileFormat: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{RENDERERS[fileFormat][2]}")
+
+    #Renders (or reads back) a chart given as {'labels', 'datasets'} or {'labels', 'data'}, as
+    #BudgetChartManager returns them. Returns the image bytes and their mimetype.
+    def get_or_render(self, name: str, chart: dict, theme: ChartTheme = ChartTheme.COLORFUL, fileFormat: str = 'svg',
+                      size: Tuple[int, int] = DEFAULT_SIZE) -> Tuple[bytes, str]:
+        if fileFormat not in RENDERERS:
+            raise ValueError(f"Unsupported image format: {fileFormat}")
+        renderer, mimetype, extension = RENDERERS[fileFormat]
+        labels = chart['labels']
+        series = chart['data'] if 'data' in chart else [dataset['data'] for dataset in chart['datasets']]
+        path = self.get_path(self.image_key(name, labels, series, theme, fileFormat, size), fileFormat)
+        try:
+            with open(path, 'rb') as file:
+                image = file.read()
+            with self.lock:
+                self.hits += 1
+            return image, mimetype
+        except FileNotFoundError:
+            pass
+
+        image = renderer(name, labels, series, theme, size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(handle, 'wb') as file:
+            file.write(image)
+        os.replace(temporary, path)
+        with self.lock:
+            self.misses += 1
+        return image, mimetype
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+#charts shown in monthly statement emails
+STATEMENT_CHARTS = ('category_breakdown', 'actual_vs_planned', 'spending_trend')
+
+#{chart name: (image, mimetype)} for a user's statement, ready for BankEmail.send_statement_email
+def render_statement_charts(chartManager, budget, cache: ChartImageCache, fileFormat: str = None) -> Dict[str, Tuple[bytes, str]]:
+    fileFormat = fileFormat or default_image_format()
+    charts = chartManager.get_chart_bundle(budget)
+    theme = chartManager.chartPreferences['theme']
+    return {name: cache.get_or_render(name, charts[name], theme, fileFormat) for name in STATEMENT_CHARTS}
@@ -0,0 +1,112 @@
+import numpy as np
+from datetime import date
+from typing import Dict, List
+from Money import ExpenseType, Transaction, TransactionStore
+
+EXPENSE_TYPE_CODES = {None: 0, ExpenseType.FIXED: 1, ExpenseType.VARIABLE: 2}
+EXPENSE_TYPES_BY_CODE = [None, ExpenseType.FIXED, ExpenseType.VARIABLE]
+
+#TransactionStore that mirrors every row into NumPy columns so the aggregation kernels run as
+#vectorized masks and bincounts. The object indexes from TransactionStore are kept, so the rest
+#of the TransactionManager API works unchanged on top of it.
+#Usage: TransactionManager(store=ColumnarTransactionStore())
+class ColumnarTransactionStore(TransactionStore):
+    def __init__(self, capacity: int = 1024):
+        super().__init__()
+        self.size = 0
+        self.deadRows = 0
+        self.amountCents = np.zeros(capacity, dtype=np.int64)
+        self.dates = np.zeros(capacity, dtype='datetime64[D]')
+        self.categoryCodes = np.zeros(capacity, dtype=np.int32)
+        self.expenseTypeCodes = np.zeros(capacity, dtype=np.int8)
+        self.taxFlags = np.zeros(capacity, dtype=bool)
+        self.travelFlags = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.rows: Dict[int, int] = {}
+        #categoryIDs are mapped to dense codes so they can be used directly as bincount bins
+        self.categoryIDs: List[int] = []
+        self.categoryCodeOf: Dict[int, int] = {}
+
+    def _columns(self) -> List[str]:
+        return ['amountCents', 'dates', 'categoryCodes', 'expenseTypeCodes', 'taxFlags', 'travelFlags', 'alive']
+
+    def _grow(self):
+        capacity = max(1024, len(self.alive) * 2)
+        for name in self._columns():
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    #drops deleted rows once they make up half of the table
+    def _compact(self):
+        keep = np.flatnonzero(self.alive[:self.size])
+        for name in self._columns():
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+        rowTransactionIDs = {row: transactionID for transactionID, row in self.rows.items()}
+        self.rows = {rowTransactionIDs[oldRow]: newRow for newRow, oldRow in enumerate(keep)}
+        self.size = len(keep)
+        self.deadRows = 0
+
+    def _category_code(self, categoryID: int) -> int:
+        code = self.categoryCodeOf.get(categoryID)
+        if code is None:
+            code = self.categoryCodeOf[categoryID] = len(self.categoryIDs)
+            self.categoryIDs.append(categoryID)
+        return code
+
+    def _link(self, transaction: Transaction, keys: tuple):
+        super()._link(transaction, keys)
+        if self.size == len(self.alive):
+            self._grow()
+        row = self.size
+        self.size += 1
+        self.amountCents[row] = transaction.totalCents
+        self.dates[row] = np.datetime64(transaction.date, 'D')
+        self.categoryCodes[row] = self._category_code(transaction.categoryID)
+        self.expenseTypeCodes[row] = EXPENSE_TYPE_CODES[transaction.expenseType]
+        self.taxFlags[row] = transaction.isTaxRelated
+        self.travelFlags[row] = transaction.isTravelRelated
+        self.alive[row] = True
+        self.rows[transaction.transactionID] = row
+
+    def _unlink(self, transaction: Transaction, keys: tuple):
+        super()._unlink(transaction, keys)
+        row = self.rows.pop(transaction.transactionID, None)
+        if row is not None:
+            self.alive[row] = False
+            self.deadRows += 1
+            if self.deadRows * 2 > self.size:
+                self._compact()
+
+    def _date_mask(self, start_date: date = None, end_date: date = None) -> np.ndarray:
+        mask = self.alive[:self.size].copy()
+        if start_date and end_date:
+            dates = self.dates[:self.size]
+            mask &= (dates >= np.datetime64(start_date, 'D')) & (dates <= np.datetime64(end_date, 'D'))
+        return mask
+
+    def _totals_by_category(self, mask: np.ndarray) -> dict:
+        codes = self.categoryCodes[:self.size][mask]
+        bins = len(self.categoryIDs)
+        cents = np.bincount(codes, weights=self.amountCents[:self.size][mask], minlength=bins)
+        counts = np.bincount(codes, minlength=bins)
+        return {self.categoryIDs[code]: (float(cents[code]) / 100, int(counts[code]))
+                for code in np.flatnonzero(counts)}
+
+    def get_spending_by_category(self, start_date: date, end_date: date) -> dict:
+        return {categoryID: total
+                for categoryID, (total, count) in self._totals_by_category(self._date_mask(start_date, end_date)).items()}
+
+    def get_expense_type_totals(self) -> dict:
+        mask = self.alive[:self.size]
+        codes = self.expenseTypeCodes[:self.size][mask]
+        cents = np.bincount(codes, weights=self.amountCents[:self.size][mask], minlength=len(EXPENSE_TYPES_BY_CODE))
+        counts = np.bincount(codes, minlength=len(EXPENSE_TYPES_BY_CODE))
+        return {expenseType: (float(cents[code]) / 100, int(counts[code]))
+                for code, expenseType in enumerate(EXPENSE_TYPES_BY_CODE)}
+
+    def get_flagged_totals_by_category(self, flag: str, start_date: date = None, end_date: date = None) -> dict:
+        flags = self.taxFlags if flag == 'tax' else self.travelFlags
+        return self._totals_by_category(self._date_mask(start_date, end_date) & flags[:self.size])
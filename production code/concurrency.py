@@ -0,0 +1,94 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+#Many readers or one writer. Writers are preferred: once a writer is waiting, new readers queue
+#behind it, so a steady stream of dashboard reads cannot starve an import.
+#The lock is reentrant per thread: a writer may take the write or read lock again (write methods
+#call read methods), and a reader may nest reads. Upgrading a read lock to a write lock is refused
+#because two upgrading readers would wait on each other forever.
+class ReadWriteLock:
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = {}
+        self._writer = None
+        self._writerDepth = 0
+        self._waitingWriters = 0
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer != me and me not in self._readers:
+                while self._writer is not None or self._waitingWriters:
+                    self._condition.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+    def release_read(self):
+        me = threading.get_ident()
+        with self._condition:
+            depth = self._readers[me] - 1
+            if depth:
+                self._readers[me] = depth
+            else:
+                del self._readers[me]
+                if not self._readers:
+                    self._condition.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._writerDepth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+            self._waitingWriters += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waitingWriters -= 1
+            self._writer = me
+            self._writerDepth = 1
+
+    def release_write(self):
+        with self._condition:
+            self._writerDepth -= 1
+            if not self._writerDepth:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+#Method decorators for classes that keep their ReadWriteLock in self.lock
+def reads(method):
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        self.lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.lock.release_read()
+    return locked
+
+def writes(method):
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        self.lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.lock.release_write()
+    return locked
@@ -0,0 +1,70 @@
+from typing import Callable, Dict, List, Sequence, Tuple
+
+#Reduce an evenly spaced series (one value per day, week or month) to at most maxPoints points so
+#long histories stay cheap to send and draw. Every downsampler returns the positions of the points
+#it keeps (used to pick their labels) and their values, in order.
+
+#Adds up runs of adjacent buckets: totals are preserved, each point covers a longer period.
+def downsample_sum(values: Sequence, maxPoints: int) -> Tuple[List[int], List]:
+    step = -(-len(values) // maxPoints)
+    positions = list(range(0, len(values), step))
+    return positions, [sum(values[position:position + step]) for position in positions]
+
+#Keeps the lowest and the highest bucket of each run, so spikes and dips survive.
+def downsample_minmax(values: Sequence, maxPoints: int) -> Tuple[List[int], List]:
+    runs = max(1, maxPoints // 2)
+    step = -(-len(values) // runs)
+    positions = []
+    for start in range(0, len(values), step):
+        run = range(start, min(start + step, len(values)))
+        low = min(run, key=values.__getitem__)
+        high = max(run, key=values.__getitem__)
+        positions.extend(sorted({low, high}) if maxPoints > 1 else [high])
+    return positions, [values[position] for position in positions]
+
+#Largest-Triangle-Three-Buckets: keeps the first and last bucket and, from each run in between, the
+#bucket that spans the largest triangle with the previous kept point and the next run's average,
+#which keeps the visual shape of the line.
+def downsample_lttb(values: Sequence, maxPoints: int) -> Tuple[List[int], List]:
+    count = len(values)
+    if maxPoints < 3:
+        positions = [0, count - 1][:maxPoints]
+        return positions, [values[position] for position in positions]
+
+    runSize = (count - 2) / (maxPoints - 2)
+    positions = [0]
+    previous = 0
+    for run in range(maxPoints - 2):
+        start = int(run * runSize) + 1
+        end = int((run + 1) * runSize) + 1
+        nextEnd = min(int((run + 2) * runSize) + 1, count)
+        averageX = (end + nextEnd - 1) / 2
+        averageY = sum(values[end:nextEnd]) / (nextEnd - end)
+        previousY = values[previous]
+
+        best = start
+        bestArea = -1.0
+        for position in range(start, end):
+            area = abs((previous - averageX) * (values[position] - previousY) - (previous - position) * (averageY - previousY))
+            if area > bestArea:
+                best = position
+                bestArea = area
+        positions.append(best)
+        previous = best
+    positions.append(count - 1)
+    return positions, [values[position] for position in positions]
+
+DOWNSAMPLERS: Dict[str, Callable[[Sequence, int], Tuple[List[int], List]]] = {
+    'sum': downsample_sum,
+    'minmax': downsample_minmax,
+    'lttb': downsample_lttb,
+}
+
+def downsample(values: Sequence, maxPoints: int, mode: str = 'sum') -> Tuple[List[int], List]:
+    if mode not in DOWNSAMPLERS:
+        raise ValueError(f"Unknown downsampling mode {mode}; use one of {', '.join(DOWNSAMPLERS)}")
+    if maxPoints < 1:
+        raise ValueError("maxPoints must be at least 1")
+    if len(values) <= maxPoints:
+        return list(range(len(values))), list(values)
+    return DOWNSAMPLERS[mode](values, maxPoints)
@@ -331,7 +331,7 @@ class BudgetAssistantManager:
         from Money import Transaction, ExpenseType
         
         transaction = Transaction(
-            transactionID=len(transaction_manager.transactions) + 1,
+            transactionID=transaction_manager.next_transaction_id(),
             userID=user_id,
             total=receipt_data['total_amount'],
             date=receipt_data['date'],
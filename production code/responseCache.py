@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+#LRU cache of serialized API responses keyed by (userID, endpoint, query args). Every entry
+#remembers the data version it was built from and a lookup with any other version is a miss, so a
+#write invalidates exactly the entries of the user whose data changed without the writer having to
+#know the cache exists. Bounded both by entry count and by total body size.
+class ResponseCache:
+    def __init__(self, maxEntries: int = 1024, maxBytes: int = 32 * 1024 * 1024):
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.entries: OrderedDict = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, version: str) -> Optional[Tuple[bytes, str]]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != version:
+                self.stale += 1
+                self.misses += 1
+                self._drop(key)
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: Hashable, version: str, body: bytes, mimetype: str):
+        if len(body) > self.maxBytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (version, body, mimetype)
+            self.size += len(body)
+            while len(self.entries) > self.maxEntries or self.size > self.maxBytes:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _drop(self, key: Hashable):
+        version, body, mimetype = self.entries.pop(key)
+        self.size -= len(body)
+
+    #Drops every entry for a user, e.g. when their state is evicted from memory
+    def invalidate_user(self, userID: str) -> int:
+        with self.lock:
+            keys = [key for key in self.entries if key[0] == userID]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
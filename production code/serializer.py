@@ -0,0 +1,74 @@
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+#JSON encoders for API responses. Payloads can hold dates, enums (ExpenseType, PayFrequency) and
+#Decimals as they are; each encoder turns them into ISO dates, enum values and numbers, returns
+#bytes, and accepts non-string dict keys such as categoryIDs, dates and enums. NaN and infinity
+#become null, as JSON has no way to write them.
+
+def _default(value: Any):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+#The stdlib encoder only takes str, int, float, bool and None keys and writes NaN as NaN, so the
+#fallback converts keys and non-finite floats the way orjson does before encoding
+def _normalize_key(key: Any):
+    if isinstance(key, Enum):
+        key = key.value
+    if isinstance(key, (date, datetime)):
+        return key.isoformat()
+    return key
+
+def _normalize(value: Any):
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {_normalize_key(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+def _dumps_json(value: Any) -> bytes:
+    return json.dumps(_normalize(value), default=lambda item: _normalize(_default(item)), separators=(',', ':'),
+                      ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    'json': _dumps_json,
+}
+
+if orjson is not None:
+    #orjson handles dates and enums natively; _default only sees Decimals and containers
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def _dumps_orjson(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+
+    ENCODERS['orjson'] = _dumps_orjson
+
+#Fastest available encoder unless a specific one is asked for
+def get_encoder(name: str = None) -> Callable[[Any], bytes]:
+    if name is None:
+        name = 'orjson' if 'orjson' in ENCODERS else 'json'
+    if name not in ENCODERS:
+        raise ValueError(f"Unknown JSON encoder: {name}")
+    return ENCODERS[name]
+
+dumps = get_encoder()
@@ -0,0 +1,71 @@
+import threading
+import mysql.connector
+from Money import *
+
+#entire class for transaction database.
+class TransactionDB:
+    def __init__(self, db):
+        self.db = db
+        self.cursor = db.cursor()
+        #the API writes from several request threads and a cursor must not be shared between them
+        self.lock = threading.Lock()
+
+    # Function used to insert a batch of transactions in one round trip.
+    def insert_transactions(self, transactions: List[Transaction]) -> int:
+        sql = """
+        INSERT INTO bankTransaction (idbankTransaction, userID, total, date, payee, categoryID,
+                                     notes, isRecurring, expenseType, isTaxRelated, isTravelRelated)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        values = [
+            (t.transactionID, t.userID, t.total, t.date, t.payee, t.categoryID, t.notes, t.isRecurring,
+             t.expenseType.value if t.expenseType else None, t.isTaxRelated, t.isTravelRelated)
+            for t in transactions
+        ]
+        with self.lock:
+            self.cursor.executemany(sql, values)
+            self.db.commit()
+        return len(values)
+
+    # Function used to load transactions for a specific user.
+    def load_transactions_for_user(self, userID: str) -> List[Transaction]:
+        sql = """
+        SELECT idbankTransaction, total, date, payee, categoryID, notes, isRecurring,
+               expenseType, isTaxRelated, isTravelRelated
+        FROM bankTransaction
+        WHERE userID = %s
+        """
+        with self.lock:
+            self.cursor.execute(sql, (userID,))
+            results = self.cursor.fetchall()
+
+        transactions = []
+        for row in results:
+            transactions.append(Transaction(
+                transactionID=row[0],
+                userID=userID,
+                total=float(row[1]),
+                date=row[2],
+                payee=row[3],
+                categoryID=row[4],
+                notes=row[5] or "",
+                isRecurring=bool(row[6]),
+                expenseType=ExpenseType(row[7]) if row[7] else None,
+                isTaxRelated=bool(row[8]),
+                isTravelRelated=bool(row[9])
+            ))
+        return transactions
+
+    # Function used to find the highest transaction ID so new IDs continue after it.
+    def get_max_transaction_id(self) -> int:
+        with self.lock:
+            self.cursor.execute("SELECT MAX(idbankTransaction) FROM bankTransaction")
+            row = self.cursor.fetchone()
+        return row[0] if row and row[0] is not None else 0
+
+    # function used to delete a transaction.
+    def delete_transaction(self, transactionID: int):
+        sql = "DELETE FROM bankTransaction WHERE idbankTransaction = %s"
+        with self.lock:
+            self.cursor.execute(sql, (transactionID,))
+            self.db.commit()
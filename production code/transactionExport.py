@@ -0,0 +1,60 @@
+import csv
+import io
+from typing import Iterable, Iterator
+from Money import *
+from serializer import dumps
+
+#Exporters turn an iterable of transactions (usually TransactionManager.iter_transactions) into
+#byte chunks for a streaming response. Rows are grouped so each chunk holds chunkRows transactions,
+#and nothing but the current chunk is kept in memory. Fields match the importer's, so an export can
+#be imported again.
+EXPORT_FIELDS = ['id', 'date', 'amount', 'payee', 'categoryID', 'notes', 'expenseType', 'isTaxRelated', 'isTravelRelated']
+
+def export_row(transaction: Transaction) -> dict:
+    return {
+        'id': transaction.transactionID,
+        'date': transaction.date,
+        'amount': transaction.total,
+        'payee': transaction.payee,
+        'categoryID': transaction.categoryID,
+        'notes': transaction.notes,
+        'expenseType': transaction.expenseType,
+        'isTaxRelated': transaction.isTaxRelated,
+        'isTravelRelated': transaction.isTravelRelated
+    }
+
+def iter_ndjson(transactions: Iterable[Transaction], chunkRows: int = 500) -> Iterator[bytes]:
+    lines = []
+    for transaction in transactions:
+        lines.append(dumps(export_row(transaction)))
+        if len(lines) == chunkRows:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+def iter_csv(transactions: Iterable[Transaction], chunkRows: int = 500) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    rows = 0
+    for transaction in transactions:
+        writer.writerow([transaction.transactionID, transaction.date.isoformat(), f"{transaction.total:.2f}",
+                         transaction.payee, transaction.categoryID, transaction.notes,
+                         transaction.expenseType.value if transaction.expenseType else "",
+                         int(transaction.isTaxRelated), int(transaction.isTravelRelated)])
+        rows += 1
+        if rows == chunkRows:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    #the header alone is still sent for an empty export
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+#format: (exporter, mimetype, file extension)
+EXPORTERS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+    'csv': (iter_csv, 'text/csv', 'csv'),
+}
@@ -0,0 +1,199 @@
+import csv
+import json
+import math
+import os
+import re
+import time
+from contextlib import nullcontext
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+from Money import *
+
+#Row readers. Each one yields (lineNumber, row) one record at a time, so a file of any size is
+#streamed with constant memory. Rows use the same field names as POST /api/transactions:
+#amount, date (YYYY-MM-DD), payee, categoryID, notes, expenseType, isTaxRelated, isTravelRelated.
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    reader = csv.DictReader(lines)
+    for row in reader:
+        yield reader.line_num, row
+
+def iter_jsonl_rows(lines: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    for lineNumber, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield lineNumber, json.loads(line)
+        except json.JSONDecodeError:
+            yield lineNumber, None
+
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+#Reads <STMTTRN> blocks from an OFX statement (SGML or XML flavour). Debits are negative in OFX,
+#so the sign is flipped; credits (deposits) are not expenses and are skipped.
+def iter_ofx_rows(lines: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    row = None
+    startLine = 0
+    for lineNumber, line in enumerate(lines, 1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            value = value.strip()
+            if tag == 'STMTTRN':
+                if closing and row is not None:
+                    if not row.pop('_credit', False):
+                        yield startLine, row
+                    row = None
+                elif not closing:
+                    row = {}
+                    startLine = lineNumber
+            elif row is None or closing or not value:
+                continue
+            elif tag == 'DTPOSTED':
+                row['date'] = f"{value[0:4]}-{value[4:6]}-{value[6:8]}"
+            elif tag == 'TRNAMT':
+                row['amount'] = value[1:] if value.startswith('-') else value
+                row['_credit'] = not value.startswith('-')
+            elif tag in ('NAME', 'PAYEE'):
+                row.setdefault('payee', value)
+            elif tag == 'MEMO':
+                row['notes'] = value
+
+ROW_READERS = {
+    'csv': iter_csv_rows,
+    'jsonl': iter_jsonl_rows,
+    'ofx': iter_ofx_rows,
+}
+
+def parse_flag(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+#Streams rows into TransactionManager in chunks: each chunk is validated, given IDs, persisted
+#with one batched insert (when a TransactionDB is given), added to the indexes and recorded in
+#BudgetManager with one spending update per category.
+class TransactionImporter:
+    def __init__(self, transactionManager: TransactionManager, budgetManager=None, transactionDB=None,
+                 chunkSize: int = 1000, maxErrors: int = 100):
+        self.transactionManager = transactionManager
+        self.budgetManager = budgetManager
+        self.transactionDB = transactionDB
+        self.chunkSize = chunkSize
+        self.maxErrors = maxErrors
+
+    def parse_row(self, row: dict, userID: str, transactionID: int) -> Transaction:
+        if not isinstance(row, dict):
+            raise ValueError("Row is not an object")
+        for field in ('amount', 'date', 'payee'):
+            if row.get(field) in (None, ''):
+                raise ValueError(f"Missing {field}")
+
+        amount = float(row['amount'])
+        #"inf", "nan" and "1e400" parse as floats but cannot be stored as cents
+        if not math.isfinite(amount):
+            raise ValueError(f"Amount is not a finite number: {row['amount']}")
+
+        expenseType = row.get('expenseType')
+        return Transaction(
+            transactionID=transactionID,
+            userID=userID,
+            total=amount,
+            date=date.fromisoformat(str(row['date'])[:10]),
+            payee=str(row['payee']).strip(),
+            categoryID=int(row.get('categoryID') or 1),
+            notes=row.get('notes') or "",
+            isRecurring=False,
+            expenseType=ExpenseType(str(expenseType).lower()) if expenseType else None,
+            isTaxRelated=parse_flag(row.get('isTaxRelated', False)),
+            isTravelRelated=parse_flag(row.get('isTravelRelated', False))
+        )
+
+    def iter_batches(self, rows: Iterable[Tuple[int, dict]], userID: str) -> Iterator[Tuple[List[Transaction], List[Tuple[int, str]]]]:
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunkSize))
+            if not chunk:
+                return
+
+            batch = []
+            errors = []
+            transactionIDs = iter(self.transactionManager.reserve_transaction_ids(len(chunk)))
+            for lineNumber, row in chunk:
+                try:
+                    batch.append(self.parse_row(row, userID, next(transactionIDs)))
+                except (ValueError, TypeError, OverflowError) as e:
+                    errors.append((lineNumber, str(e)))
+            yield batch, errors
+
+    def import_rows(self, rows: Iterable[Tuple[int, dict]], userID: str) -> dict:
+        started = time.perf_counter()
+        imported = 0
+        failed = 0
+        errors = []
+
+        for batch, batchErrors in self.iter_batches(rows, userID):
+            if batch:
+                if self.transactionDB is not None:
+                    self.transactionDB.insert_transactions(batch)
+                self.transactionManager.add_transactions(batch)
+                if self.budgetManager is not None:
+                    self.budgetManager.record_transactions(batch)
+            imported += len(batch)
+            failed += len(batchErrors)
+            errors.extend(batchErrors[:self.maxErrors - len(errors)])
+
+        seconds = time.perf_counter() - started
+        return {
+            'imported': imported,
+            'failed': failed,
+            'errors': [{'line': line, 'error': message} for line, message in errors],
+            'seconds': round(seconds, 3),
+            'rows_per_sec': round((imported + failed) / seconds) if seconds > 0 else 0
+        }
+
+    #All-or-nothing version for API batches: every row is validated first and the batch is applied
+    #only if all of them pass, holding both managers' write locks so readers see all of it or none.
+    #Rows may carry a clientID, which is echoed back so offline clients can match their results.
+    def import_batch(self, rows: List[dict], userID: str) -> dict:
+        batch = []
+        results = []
+        failed = 0
+        for index, row in enumerate(rows):
+            result = {'index': index}
+            if isinstance(row, dict) and 'clientID' in row:
+                result['clientID'] = row['clientID']
+            try:
+                #IDs are handed out only once the whole batch is known to be valid
+                batch.append(self.parse_row(row, userID, 0))
+            except (ValueError, TypeError, OverflowError) as e:
+                result['error'] = str(e)
+                failed += 1
+            results.append(result)
+
+        if failed:
+            return {'applied': False, 'imported': 0, 'failed': failed, 'results': results}
+
+        for transaction, result, transactionID in zip(batch, results, self.transactionManager.reserve_transaction_ids(len(batch))):
+            transaction.transactionID = transactionID
+            result['id'] = transactionID
+
+        budgetLock = self.budgetManager.lock.write_locked() if self.budgetManager is not None else nullcontext()
+        with self.transactionManager.lock.write_locked(), budgetLock:
+            if self.transactionDB is not None:
+                self.transactionDB.insert_transactions(batch)
+            self.transactionManager.add_transactions(batch)
+            if self.budgetManager is not None:
+                self.budgetManager.record_transactions(batch)
+        return {'applied': True, 'imported': len(batch), 'failed': 0, 'results': results}
+
+    def import_file(self, path: str, userID: str, fileFormat: str = None) -> dict:
+        if fileFormat is None:
+            fileFormat = os.path.splitext(path)[1].lstrip('.').lower()
+            if fileFormat in ('json', 'ndjson'):
+                fileFormat = 'jsonl'
+        if fileFormat not in ROW_READERS:
+            raise ValueError(f"Unsupported import format: {fileFormat}")
+
+        with open(path, newline='', encoding='utf-8') as importFile:
+            return self.import_rows(ROW_READERS[fileFormat](importFile), userID)
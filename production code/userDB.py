@@ -0,0 +1,23 @@
+import threading
+import bcrypt
+import mysql.connector
+
+#Reads the bankUser accounts that BankUser.py registers, so the API logs in the same users.
+class UserDB:
+    def __init__(self, db):
+        self.db = db
+        self.cursor = db.cursor()
+        #the API serves requests on several threads and a cursor must not be shared between them
+        self.lock = threading.Lock()
+
+    # Function used to check a login. Returns the user's ID, or None for an unknown email or a wrong password.
+    def check_login(self, email: str, password: str):
+        with self.lock:
+            self.cursor.execute("SELECT idbankUser, password_hash FROM bankUser WHERE email=%s", (email,))
+            row = self.cursor.fetchone()
+        if not row:
+            return None
+        userID, password_hash = row
+        if bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
+            return userID
+        return None
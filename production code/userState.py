@@ -0,0 +1,157 @@
+import itertools
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, List
+from budget import *
+from Money import *
+from Pages import Dashboard
+from chart import BudgetChartManager
+
+_generations = itertools.count(1)
+
+#Everything the API needs to answer requests for one user. Each user gets their own managers, so
+#queries only ever touch that user's transactions.
+class UserState:
+    def __init__(self, userID: str, budget: Budget = None, transactions: List[Transaction] = None,
+                 idAllocator: TransactionIDAllocator = None):
+        self.userID = userID
+        #differs for every load, so version counters of a reloaded user never match the old ones
+        self.generation = next(_generations)
+        self.budget = budget if budget is not None else Budget(0, userID, "Monthly Budget", 0.0, date.today().strftime('%B'), 0.0)
+        self.transactionManager = TransactionManager(idAllocator=idAllocator)
+        self.budgetManager = BudgetManager()
+        for category in self.budget.categories:
+            self.budgetManager.add_category(category)
+        if transactions:
+            self.transactionManager.add_transactions(transactions)
+            self.budgetManager.record_transactions(transactions)
+        self.chartManager = BudgetChartManager(self.budgetManager, self.transactionManager)
+        self.dashboard = Dashboard(userID, self.transactionManager, self.chartManager)
+        #requests currently using this state, see UserStateRegistry.acquire
+        self.activeRequests = 0
+        #the data version that was last loaded from or written to the database
+        self.savedVersion = self.get_version()
+
+    def get_size(self) -> int:
+        return len(self.transactionManager.transactions)
+
+    def get_version(self) -> tuple:
+        return (self.transactionManager.get_version(self.userID), self.budgetManager.version, self.budget.get_version())
+
+    #True once the user has written anything that is not in the database yet
+    def has_unsaved_writes(self) -> bool:
+        return self.get_version() != self.savedVersion
+
+    #Call after the user's data has been written to the database
+    def mark_saved(self):
+        self.savedVersion = self.get_version()
+
+#Loader for UserStateRegistry that reads a user's first budget and their transactions from MySQL.
+#Pass the allocator shared by every user so IDs stay unique across the whole table.
+def database_loader(transactionDB, budgetDB, idAllocator: TransactionIDAllocator = None) -> Callable[[str], UserState]:
+    def load(userID: str) -> UserState:
+        budgets = budgetDB.load_budgets_for_user(userID)
+        return UserState(userID, budgets[0] if budgets else None,
+                         transactionDB.load_transactions_for_user(userID), idAllocator)
+    return load
+
+#Keeps the state of recently active users in memory. A user is loaded on first access and the least
+#recently used users are dropped once there are more than maxUsers of them or their transactions
+#together exceed maxTransactions (about 200 bytes each), so memory stays bounded however many users
+#the process serves. Evicted users are simply loaded again on their next request. Users with writes
+#that are not in the database yet (see UserState.mark_saved) and users with a request in flight are
+#never evicted, so nothing is lost and no request writes into a dropped state; they can keep the
+#registry over its caps until they are saved or finish. The API saves every write as it is made when
+#it runs against the database; without one (the demo user) nothing is ever saved.
+class UserStateRegistry:
+    def __init__(self, loader: Callable[[str], UserState], maxUsers: int = 1000, maxTransactions: int = 2_000_000,
+                 onEvict: Callable[[str], None] = None):
+        self.loader = loader
+        self.onEvict = onEvict
+        self.maxUsers = maxUsers
+        self.maxTransactions = maxTransactions
+        self.states: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        #loads are serialized: the database classes share one connection and cursor
+        self.loadLock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, userID: str):
+        with self.lock:
+            state = self.states.get(userID)
+            if state is not None:
+                self.states.move_to_end(userID)
+                self.hits += 1
+            return state
+
+    def get(self, userID: str) -> UserState:
+        state = self._lookup(userID)
+        if state is not None:
+            return state
+
+        with self.loadLock:
+            #another request may have loaded this user while we waited
+            state = self._lookup(userID)
+            if state is not None:
+                return state
+            state = self.loader(userID)
+            with self.lock:
+                self.misses += 1
+                self.states[userID] = state
+                evicted = self._evict()
+        if self.onEvict is not None:
+            for evictedID in evicted:
+                self.onEvict(evictedID)
+        return state
+
+    #Like get, but the state is kept in memory until release is called with it
+    def acquire(self, userID: str) -> UserState:
+        while True:
+            state = self.get(userID)
+            with self.lock:
+                #evicted between get and here: load it again
+                if self.states.get(userID) is state:
+                    state.activeRequests += 1
+                    return state
+
+    def release(self, state: UserState):
+        with self.lock:
+            state.activeRequests -= 1
+
+    def _evict(self) -> List[str]:
+        evicted = []
+        total = sum(state.get_size() for state in self.states.values())
+        #the user that was just loaded is never evicted, even if they alone exceed the cap
+        candidates = list(self.states.items())[:-1]
+        for userID, state in candidates:
+            if len(self.states) <= self.maxUsers and total <= self.maxTransactions:
+                break
+            if state.activeRequests or state.has_unsaved_writes():
+                continue
+            del self.states[userID]
+            total -= state.get_size()
+            self.evictions += 1
+            evicted.append(userID)
+        return evicted
+
+    #Drops the user even with unsaved writes, e.g. after their data changed in the database
+    def evict(self, userID: str) -> bool:
+        with self.lock:
+            evicted = self.states.pop(userID, None) is not None
+        if evicted and self.onEvict is not None:
+            self.onEvict(userID)
+        return evicted
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'users': len(self.states),
+                'transactions': sum(state.get_size() for state in self.states.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'unsaved': sum(1 for state in self.states.values() if state.has_unsaved_writes())
+            }
@@ -0,0 +1,472 @@
+import contextlib
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, timedelta
+from Money import *
+
+#Run from this folder with the production code on the path:
+#   PYTHONPATH="../production code" python benchmarks.py [name ...]
+
+def make_transactions(count: int, users: int = 1, seed: int = 451) -> List[Transaction]:
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    expenseTypes = [None, ExpenseType.FIXED, ExpenseType.VARIABLE]
+    payees = ["Amazon", "Walmart", "Target", "Starbucks", "Uber", "Netflix", "Shell", "Landlord"]
+    return [
+        Transaction(i, f"user{i % users + 1}", round(rng.uniform(1, 250), 2), start + timedelta(days=rng.randint(0, 5 * 365)),
+                    rng.choice(payees), rng.randint(1, 12), "", False, None, rng.choice(expenseTypes),
+                    rng.random() < 0.1, rng.random() < 0.05)
+        for i in range(1, count + 1)
+    ]
+
+def best_of(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def report(label: str, seconds: float, baseline: float = None):
+    speedup = f"  ({baseline / seconds:6.1f}x)" if baseline else ""
+    print(f"  {label:<38}{seconds * 1000:10.2f} ms{speedup}")
+
+#Full-scan versions of the queries, as they were before TransactionStore existed.
+def list_spending_by_category(transactions, start_date, end_date):
+    category_spending = {}
+    for t in transactions:
+        if start_date <= t.date <= end_date:
+            category_spending[t.categoryID] = category_spending.get(t.categoryID, 0.0) + t.total
+    return category_spending
+
+def list_expense_type_stats(transactions):
+    fixedTotal = sum(t.total for t in transactions if t.expenseType == ExpenseType.FIXED)
+    variableTotal = sum(t.total for t in transactions if t.expenseType == ExpenseType.VARIABLE)
+    untaggedTotal = sum(t.total for t in transactions if t.expenseType is None)
+    fixedCount = len([t for t in transactions if t.expenseType == ExpenseType.FIXED])
+    variableCount = len([t for t in transactions if t.expenseType == ExpenseType.VARIABLE])
+    return fixedTotal, variableTotal, untaggedTotal, fixedCount, variableCount
+
+def list_flagged_totals(transactions, start_date, end_date):
+    category_totals = {}
+    for t in transactions:
+        if t.isTaxRelated and start_date <= t.date <= end_date:
+            total, count = category_totals.get(t.categoryID, (0.0, 0))
+            category_totals[t.categoryID] = (total + t.total, count + 1)
+    return category_totals
+
+def bench_columnar(count: int = 200_000):
+    try:
+        from columnarStore import ColumnarTransactionStore
+    except ImportError:
+        print("columnar: numpy is not installed, skipping")
+        return
+
+    transactions = make_transactions(count)
+    indexed = TransactionManager()
+    columnar = TransactionManager(store=ColumnarTransactionStore())
+    for t in transactions:
+        indexed.add_transaction(t)
+        columnar.add_transaction(t)
+
+    start, end = date(2021, 3, 15), date(2023, 9, 20)
+    print(f"columnar vs list vs indexed store, {count} transactions")
+
+    baseline = best_of(lambda: list_spending_by_category(transactions, start, end))
+    report("spending by category (list scan)", baseline)
+    report("spending by category (rollup store)", best_of(lambda: indexed.store.get_spending_by_category(start, end)), baseline)
+    report("spending by category (columnar)", best_of(lambda: columnar.store.get_spending_by_category(start, end)), baseline)
+
+    baseline = best_of(lambda: list_expense_type_stats(transactions))
+    report("expense type stats (list scan)", baseline)
+    report("expense type stats (rollup store)", best_of(lambda: indexed.store.get_expense_type_totals()), baseline)
+    report("expense type stats (columnar)", best_of(lambda: columnar.store.get_expense_type_totals()), baseline)
+
+    baseline = best_of(lambda: list_flagged_totals(transactions, start, end))
+    report("tax totals by category (list scan)", baseline)
+    report("tax totals by category (indexed store)", best_of(lambda: indexed.store.get_flagged_totals_by_category('tax', start, end)), baseline)
+    report("tax totals by category (columnar)", best_of(lambda: columnar.store.get_flagged_totals_by_category('tax', start, end)), baseline)
+
+#Same fields as Transaction but stored the way it was before __slots__: a per-instance
+#__dict__, a float total and whatever payee string object the caller passed in.
+class DictTransaction:
+    def __init__(self, transactionID, userID, total, date, payee, categoryID, notes="", isRecurring=False,
+                 dateRecurr=None, expenseType=None, isTaxRelated=False, isTravelRelated=False):
+        self.transactionID = transactionID
+        self.userID = userID
+        self.total = total
+        self.date = date
+        self.payee = payee
+        self.categoryID = categoryID
+        self.notes = notes
+        self.isRecurring = isRecurring
+        self.dateRecurr = dateRecurr
+        self.expenseType = expenseType
+        self.isTaxRelated = isTaxRelated
+        self.isTravelRelated = isTravelRelated
+
+def bytes_per_row(cls, count: int) -> float:
+    rng = random.Random(451)
+    payees = ["Amazon", "Walmart", "Target", "Starbucks", "Uber", "Netflix", "Shell", "Landlord"]
+    day = date(2024, 1, 1)
+    tracemalloc.start()
+    #payees are rebuilt per row, like strings parsed out of an import file
+    rows = [cls(i, "user1", round(rng.uniform(1, 250), 2), day, "".join(rng.choice(payees)), 3, "", False, None,
+                ExpenseType.VARIABLE) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return used / count
+
+def bench_transaction_memory(count: int = 100_000):
+    print(f"memory per transaction, {count} rows (tracemalloc, includes the list slot)")
+    legacy = bytes_per_row(DictTransaction, count)
+    slotted = bytes_per_row(Transaction, count)
+    print(f"  {'__dict__ transaction':<38}{legacy:10.1f} B")
+    print(f"  {'slotted transaction':<38}{slotted:10.1f} B  ({(1 - slotted / legacy) * 100:.0f}% smaller)")
+
+def bench_bulk_import(count: int = 200_000):
+    from budget import BudgetManager, Category
+    from transactionImport import TransactionImporter
+
+    transactions = make_transactions(count)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "history.csv")
+        with open(path, "w", newline="", encoding="utf-8") as importFile:
+            writer = csv.writer(importFile)
+            writer.writerow(["date", "amount", "payee", "categoryID", "expenseType"])
+            for t in transactions:
+                writer.writerow([t.date.isoformat(), f"{t.total:.2f}", t.payee, t.categoryID,
+                                 t.expenseType.value if t.expenseType else ""])
+
+        budgetManager = BudgetManager()
+        for categoryID in range(1, 13):
+            budgetManager.add_category(Category(categoryID, f"Category {categoryID}", "variable", 1e12, 0.0, None))
+        importer = TransactionImporter(TransactionManager(), budgetManager, chunkSize=5000)
+        devnull = open(os.devnull, "w")
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            result = importer.import_file(path, "user1")
+        finally:
+            sys.stdout = stdout
+            devnull.close()
+
+    print(f"bulk CSV import, {count} rows")
+    print(f"  imported {result['imported']} rows in {result['seconds']:.2f} s  ({result['rows_per_sec']} rows/sec)")
+
+#Writer threads add and record transactions while reader threads take dashboard-style snapshots.
+#Checks afterwards that every write landed in both managers.
+def bench_concurrency(writers: int = 8, perWriter: int = 5000, readers: int = 4):
+    from budget import BudgetManager, Category
+
+    transactionManager = TransactionManager()
+    budgetManager = BudgetManager()
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        for categoryID in range(1, 13):
+            budgetManager.add_category(Category(categoryID, f"Category {categoryID}", "variable", 1e12, 0.0, None))
+
+        transactions = make_transactions(writers * perWriter)
+        stop = threading.Event()
+        snapshots = [0]
+
+        def write(chunk):
+            for t in chunk:
+                t.transactionID = transactionManager.next_transaction_id()
+                transactionManager.add_transaction(t)
+                budgetManager.record_transaction(t)
+
+        def read():
+            while not stop.is_set():
+                with transactionManager.lock.read_locked(), budgetManager.lock.read_locked():
+                    transactionManager.get_recent_transactions("user1", 10)
+                    transactionManager.get_expense_type_stats()
+                    budgetManager.get_spending_snapshot()
+                snapshots[0] += 1
+
+        readerThreads = [threading.Thread(target=read) for _ in range(readers)]
+        writerThreads = [threading.Thread(target=write, args=(transactions[i::writers],)) for i in range(writers)]
+        started = time.perf_counter()
+        for thread in readerThreads + writerThreads:
+            thread.start()
+        for thread in writerThreads:
+            thread.join()
+        seconds = time.perf_counter() - started
+        stop.set()
+        for thread in readerThreads:
+            thread.join()
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    expectedCents = sum(t.totalCents for t in transactions)
+    recordedCents = round(sum(budgetManager.spending.values()) * 100)
+    print(f"concurrent writes, {writers} writers x {perWriter} transactions, {readers} readers")
+    print(f"  {len(transactions) / seconds:,.0f} writes/sec, {snapshots[0]} consistent snapshots read")
+    print(f"  stored {len(transactionManager.transactions)} / {len(transactions)} transactions, "
+          f"spending {'matches' if recordedCents == expectedCents else 'LOST UPDATES'}")
+
+def list_recent_transactions(transactions, userID, limit):
+    userTransactions = [t for t in transactions if t.userID == userID]
+    userTransactions.sort(key=lambda t: t.date, reverse=True)
+    return userTransactions[:limit]
+
+def bench_recent(count: int = 1_000_000, users: int = 10, limit: int = 10):
+    import heapq
+
+    transactions = make_transactions(count, users)
+    manager = TransactionManager()
+    started = time.perf_counter()
+    manager.add_transactions(transactions)
+    loaded = time.perf_counter() - started
+    userBucket = manager.store.get_by_user("user1")
+
+    print(f"recent {limit} transactions for one of {users} users, {count} transactions (indexed in {loaded:.1f} s)")
+    baseline = best_of(lambda: list_recent_transactions(transactions, "user1", limit), 3)
+    report("filter + full sort (list scan)", baseline)
+    report("sort of user bucket", best_of(lambda: sorted(userBucket, key=lambda t: t.date, reverse=True)[:limit], 3), baseline)
+    report("heapq.nlargest of user bucket", best_of(lambda: heapq.nlargest(limit, userBucket, key=lambda t: t.date), 3), baseline)
+    report("per-user date index", best_of(lambda: manager.get_recent_transactions("user1", limit)), baseline)
+
+def bench_paging(count: int = 200_000, limit: int = 50):
+    manager = TransactionManager()
+    manager.add_transactions(make_transactions(count))
+    print(f"keyset pages of {limit}, {count} transactions for one user")
+    for sort_by in ('date', 'amount', 'payee'):
+        manager.get_transactions_page("user1", sort_by, True, limit)
+        index = manager.store.get_sort_index("user1", sort_by)
+        deepCursor = manager.encode_cursor(sort_by, True, index.keys[len(index) // 4])
+        first = best_of(lambda: manager.get_transactions_page("user1", sort_by, True, limit))
+        report(f"{sort_by}: first page", first)
+        report(f"{sort_by}: page {count * 3 // 4 // limit}", best_of(lambda: manager.get_transactions_page("user1", sort_by, True, limit, deepCursor)), first)
+
+def bench_serializer(count: int = 10_000):
+    from serializer import ENCODERS
+
+    transactions = make_transactions(count)
+
+    def build(isoDates):
+        return [{
+            'id': t.transactionID,
+            'payee': t.payee,
+            'amount': t.total,
+            'date': t.date.isoformat() if isoDates else t.date,
+            'categoryID': t.categoryID,
+            'expenseType': (t.expenseType.value if t.expenseType else None) if isoDates else t.expenseType,
+            'notes': t.notes
+        } for t in transactions]
+
+    print(f"serialize a {count}-transaction response (build payload + encode to bytes)")
+    baseline = None
+    try:
+        from flask import Flask, jsonify
+        flaskApp = Flask(__name__)
+        with flaskApp.app_context():
+            baseline = best_of(lambda: jsonify(build(True)).get_data())
+        report("flask jsonify", baseline)
+    except ImportError:
+        print("  flask is not installed, skipping jsonify")
+    for name, encode in ENCODERS.items():
+        seconds = best_of(lambda: encode(build(False)))
+        report(f"serializer.{name}", seconds, baseline)
+        if baseline is None:
+            baseline = seconds
+
+def bench_export(count: int = 500_000):
+    from serializer import dumps
+    from transactionExport import export_row, iter_ndjson
+
+    manager = TransactionManager()
+    manager.add_transactions(make_transactions(count))
+    print(f"NDJSON export of {count} transactions")
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    body = b"\n".join(dumps(export_row(t)) for t in sorted(manager.get_transactions_by_date_range(date(2000, 1, 1), date(2100, 1, 1)), key=lambda t: t.date))
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del body
+    print(f"  {'build whole body':<38}{seconds * 1000:10.0f} ms, first byte after {seconds * 1000:.0f} ms, peak {peak / 1e6:.1f} MB")
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    firstByte = None
+    size = 0
+    for chunk in iter_ndjson(manager.iter_transactions("user1")):
+        if firstByte is None:
+            firstByte = time.perf_counter() - started
+        size += len(chunk)
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {'streamed chunks':<38}{seconds * 1000:10.0f} ms, first byte after {firstByte * 1000:.1f} ms, peak {peak / 1e6:.1f} MB")
+
+def bench_charts(calls: int = 10_000):
+    from chart import ChartTheme, ChartType, build_chart_config, get_theme_palette, shift_color
+
+    print(f"{calls} chart config and palette lookups")
+    types = list(ChartType)
+    baseline = best_of(lambda: [build_chart_config.__wrapped__(types[i % len(types)]) for i in range(calls)])
+    report("build config every call", baseline)
+    report("memoized config", best_of(lambda: [build_chart_config(types[i % len(types)]) for i in range(calls)]), baseline)
+    themes = list(ChartTheme)
+    baseline = best_of(lambda: [[shift_color.__wrapped__(color, delta) for color in get_theme_palette(themes[i % len(themes)]).colors for delta in (-30, 30)] for i in range(calls)])
+    report("darken/lighten every color", baseline)
+    report("precomputed palette variants", best_of(lambda: [get_theme_palette(themes[i % len(themes)]) for i in range(calls)]), baseline)
+
+def bench_chart_bundle(count: int = 200_000):
+    from budget import Budget, BudgetManager, Category
+    from chart import BudgetChartManager
+
+    today = date.today()
+    transactions = make_transactions(count)
+    for t in transactions:
+        t.date = today - timedelta(days=t.transactionID % 365)
+    manager = TransactionManager()
+    manager.add_transactions(transactions)
+    budgetManager = BudgetManager()
+    budget = Budget(1, "user1", "Monthly Budget", 5000.0, today.strftime('%B'), 0.0)
+    for categoryID in range(1, 13):
+        category = Category(categoryID, f"Category {categoryID}", "Expense", 400, 400, None)
+        budget.categories.append(category)
+        with contextlib.redirect_stdout(io.StringIO()):
+            budgetManager.add_category(category)
+    charts = BudgetChartManager(budgetManager, manager)
+
+    def separately():
+        return {
+            'income_vs_expenses': charts.get_income_vs_expenses_data(budget),
+            'category_breakdown': charts.get_category_breakdown_data(budget),
+            'spending_trend': charts.get_spending_trend_data(),
+            'actual_vs_planned': charts.get_actual_vs_planned_data(budget),
+            'expense_type_breakdown': charts.get_expense_type_breakdown()
+        }
+
+    print(f"five dashboard charts over {count} transactions")
+    baseline = best_of(separately)
+    report("one builder per chart", baseline)
+    report("bundle from one snapshot", best_of(lambda: charts.get_chart_bundle(budget)), baseline)
+
+def scan_month_totals(manager, start_date, end_date):
+    totals = {}
+    for t in manager.get_transactions_by_date_range(start_date, end_date):
+        key = (t.date.year, t.date.month)
+        totals[key] = totals.get(key, 0.0) + t.total
+    return totals
+
+def bench_trend(count: int = 500_000):
+    today = date.today()
+    transactions = make_transactions(count)
+    for t in transactions:
+        t.date = today - timedelta(days=t.transactionID % (5 * 365))
+    manager = TransactionManager()
+    manager.add_transactions(transactions)
+
+    print(f"spending trend over {count} transactions")
+    for months in (6, 12, 36):
+        start = today - timedelta(days=30 * months)
+        baseline = best_of(lambda: scan_month_totals(manager, start, today))
+        report(f"{months} months: scan date range", baseline)
+        report(f"{months} months: slice monthly series", best_of(lambda: manager.get_spending_series(start, today)), baseline)
+    start = today - timedelta(days=5 * 365)
+    report("5 years of days, max 100 points", best_of(lambda: manager.get_spending_series(start, today, 'day', maxPoints=100)))
+
+def bench_tooltips(categories: int = 200, hovers: int = 10_000):
+    from budget import Budget, BudgetManager, Category
+    from chart import BudgetChartManager
+
+    manager = TransactionManager()
+    manager.add_transactions(make_transactions(50_000))
+    budgetManager = BudgetManager()
+    budget = Budget(1, "user1", "Monthly Budget", 0.0, date.today().strftime('%B'), 50_000.0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for categoryID in range(1, categories + 1):
+            category = Category(categoryID, f"Category {categoryID}", "Expense", 100, 100, None)
+            budget.attach_category(category)
+            budgetManager.add_category(category)
+    charts = BudgetChartManager(budgetManager, manager)
+    position = {'x': 0, 'y': 0}
+
+    print(f"{hovers} hovers over a {categories}-category budget")
+    baseline = best_of(lambda: [charts.tooltipManager.create_tooltip_data('category_breakdown', i % categories, {}, budget)
+                                for i in range(hovers)])
+    report("tooltip built per hover", baseline)
+    report("precomputed tooltips", best_of(lambda: [charts.handle_chart_hover('category_breakdown', i % categories, {}, budget, position)
+                                                    for i in range(hovers)]), baseline)
+
+def bench_downsample(years: int = 10, maxPoints: int = 200):
+    from downsample import DOWNSAMPLERS
+    from serializer import dumps
+
+    today = date.today()
+    transactions = make_transactions(200_000)
+    for t in transactions:
+        t.date = today - timedelta(days=t.transactionID % (years * 365))
+    manager = TransactionManager()
+    manager.add_transactions(transactions)
+    start = today - timedelta(days=years * 365)
+
+    print(f"{years} years of daily spending, reduced to {maxPoints} points")
+    full = manager.get_spending_series(start, today, 'day')
+    baseline = best_of(lambda: manager.get_spending_series(start, today, 'day'))
+    print(f"  {'full series':<38}{baseline * 1000:10.2f} ms, {len(full['totals'])} points, {len(dumps(full))} bytes")
+    for mode in DOWNSAMPLERS:
+        reduced = manager.get_spending_series(start, today, 'day', maxPoints=maxPoints, mode=mode)
+        seconds = best_of(lambda: manager.get_spending_series(start, today, 'day', maxPoints=maxPoints, mode=mode))
+        print(f"  {mode:<38}{seconds * 1000:10.2f} ms, {len(reduced['totals'])} points, {len(dumps(reduced))} bytes")
+
+def bench_render(statements: int = 200):
+    from chart import ChartTheme
+    from chartRenderer import RENDERERS, ChartImageCache
+
+    charts = {
+        'category_breakdown': {'labels': [f"Category {i}" for i in range(10)], 'data': [[100.0 + i * 25 for i in range(10)]]},
+        'actual_vs_planned': {'labels': [f"Category {i}" for i in range(10)], 'data': [[300.0] * 10, [50.0 + i * 40 for i in range(10)]]},
+        'spending_trend': {'labels': [f"2026/{month:02d}" for month in range(1, 13)], 'data': [[800.0 + month * 13 for month in range(12)]]},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ChartImageCache(directory)
+        for fileFormat, (renderer, mimetype, extension) in RENDERERS.items():
+            print(f"{statements} statements with {len(charts)} {fileFormat} charts each")
+            started = time.perf_counter()
+            for i in range(statements):
+                for name, chart in charts.items():
+                    renderer(name, chart['labels'], chart['data'], ChartTheme.COLORFUL)
+            baseline = time.perf_counter() - started
+            report("render every chart", baseline)
+            started = time.perf_counter()
+            for i in range(statements):
+                for name, chart in charts.items():
+                    cache.get_or_render(name, chart, ChartTheme.COLORFUL, fileFormat)
+            report("content-addressed cache", time.perf_counter() - started, baseline)
+            print(f"  {statements * len(charts) / baseline:.0f} renders/s uncached")
+
+BENCHMARKS = {
+    'columnar': bench_columnar,
+    'memory': bench_transaction_memory,
+    'import': bench_bulk_import,
+    'concurrency': bench_concurrency,
+    'recent': bench_recent,
+    'paging': bench_paging,
+    'serializer': bench_serializer,
+    'export': bench_export,
+    'charts': bench_charts,
+    'bundle': bench_chart_bundle,
+    'trend': bench_trend,
+    'tooltips': bench_tooltips,
+    'downsample': bench_downsample,
+    'render': bench_render,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
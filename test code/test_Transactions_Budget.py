@@ -1,9 +1,17 @@
 import unittest
+import importlib.util
+import io
 from datetime import date
 from User import *
 from Money import *
 from budget import *
 from Pages import *
+from transactionImport import *
+from transactionExport import *
+from userState import *
+from responseCache import ResponseCache
+import serializer
+from downsample import DOWNSAMPLERS, downsample
 
 
 class TestLogin(unittest.TestCase):
@@ -187,6 +195,19 @@ class TestBudgetEditing(unittest.TestCase):
         self.assertEqual(len(data['categories']), 3)
         self.assertEqual(data['categories'][0]['name'], "Groceries")
     
+    def test_version_moves_with_category_and_income_edits(self):
+        seen = {self.budget.get_version()}
+        for edit in (lambda: self.cat1.editLimit(999), lambda: self.cat2.setPlannedAmnt(10.0),
+                     lambda: self.cat3.setPlannedPercentage(5, 5000.0), lambda: self.cat1.editCategory(name="Food")):
+            edit()
+            self.assertNotIn(self.budget.get_version(), seen)
+            seen.add(self.budget.get_version())
+        
+        empty = Budget(2, "user123", "Empty", 0.0, "2025-10", 0.0)
+        before = empty.get_version()
+        empty.setIncome(4000.0)
+        self.assertNotEqual(empty.get_version(), before)
+    
     def test_update_category_amount(self):
         original_total = self.budget.totalPlannedAmnt
         
@@ -308,6 +329,138 @@ class TestSpendingCharts(unittest.TestCase):
         self.assertIn(2, spending)
         self.assertEqual(spending[1], 120.0)
         self.assertEqual(spending[2], 50.0)
+    
+    def test_get_spending_aggregate(self):
+        aggregate = self.manager.get_spending_aggregate(date(2025, 1, 1), date(2025, 12, 31))
+        
+        self.assertEqual(aggregate['by_category'], {1: 320.0, 2: 50.0})
+        self.assertEqual(aggregate['by_month']['2025-10'], {1: 120.0, 2: 50.0})
+        self.assertEqual(aggregate['month_totals'], {'2025-09': 200.0, '2025-10': 170.0})
+        self.assertEqual(aggregate['total_spending'], 370.0)
+        self.assertEqual(aggregate['transaction_count'], 3)
+    
+    def test_spending_aggregate_scans_partial_months(self):
+        aggregate = self.manager.get_spending_aggregate(date(2025, 9, 11), date(2025, 10, 14))
+        
+        self.assertEqual(aggregate['by_month'], {'2025-10': {1: 120.0}})
+        self.assertEqual(aggregate['transaction_count'], 1)
+        self.assertEqual(self.manager.get_spending_aggregate(date(2025, 9, 1), date(2025, 10, 31))['month_totals'],
+                         {'2025-09': 200.0, '2025-10': 170.0})
+    
+    def test_yearly_breakdown_matches_monthly(self):
+        yearly = self.manager.get_yearly_spending_chart_data(2025)
+        
+        for month in range(1, 13):
+            monthly = self.manager.get_monthly_spending_chart_data(2025, month)
+            self.assertEqual(yearly['monthly_breakdown'][monthly['period']], monthly['spending'])
+    
+    def test_charts_read_the_rollup(self):
+        aggregate = self.manager.get_spending_aggregate(date(2025, 1, 1), date(2025, 12, 31))
+        self.manager.store.get_date_range = None
+        
+        self.assertEqual(self.manager.get_yearly_spending_chart_data(2025)['total_spending'], aggregate['by_category'])
+        self.assertEqual(self.manager.get_monthly_spending_chart_data(2025, 10)['spending'], aggregate['by_month']['2025-10'])
+        self.manager.delete_transaction(3)
+        self.assertEqual(self.manager.get_yearly_spending_chart_data(2025)['monthly_breakdown']['2025-09'], {})
+
+
+class TestBudgetChartManager(unittest.TestCase):
+    
+    def setUp(self):
+        import contextlib
+        self.transaction_manager = TransactionManager()
+        self.budget_manager = BudgetManager()
+        self.budget = Budget(1, "user1", "October", 1500.0, "October", 3000.0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for category in [Category(1, "Groceries", "Food", 300, 200, None), Category(2, "Rent", "Housing", 1200, 1200, None)]:
+                self.budget.addCategory(category)
+                self.budget_manager.add_category(category)
+            transaction = Transaction(1, "user1", 80.0, date.today(), "Store", 1, "", False, None, ExpenseType.VARIABLE)
+            self.transaction_manager.add_transaction(transaction)
+            self.budget_manager.record_transaction(transaction)
+        self.chart_manager = BudgetChartManager(self.budget_manager, self.transaction_manager)
+    
+    def test_get_all_chart_data(self):
+        charts = self.chart_manager.get_all_chart_data(self.budget)
+        
+        self.assertEqual(charts['actual_vs_planned']['datasets'][1]['data'], [80.0, 0.0])
+        self.assertEqual(charts['category_breakdown']['datasets'][0]['backgroundColor'], ['#FF6384', '#36A2EB'])
+        self.assertEqual(charts['category_breakdown']['datasets'][0]['hoverBackgroundColor'][0], '#ff81a2')
+        self.assertEqual(charts['spending_trend']['datasets'][0]['data'][-1], 80.0)
+        self.assertIn('pie', charts['chart_configs'])
+    
+    def test_data_only_leaves_styles_to_static_config(self):
+        charts = self.chart_manager.get_all_chart_data(self.budget)
+        data_only = self.chart_manager.get_chart_data_only(self.budget)
+        static = self.chart_manager.get_static_chart_config()
+        
+        for name, chart in data_only.items():
+            self.assertEqual(chart['labels'], charts[name]['labels'])
+            self.assertEqual(chart['data'], [dataset['data'] for dataset in charts[name]['datasets']])
+            self.assertEqual(len(static['dataset_styles'][name]), len(chart['data']))
+        self.assertEqual(static['dataset_styles']['actual_vs_planned'][1]['label'], 'Actual')
+        self.assertEqual(static['chart_configs'], charts['chart_configs'])
+    
+    def test_chart_bundle_matches_individual_charts(self):
+        bundle = self.chart_manager.get_chart_bundle(self.budget)
+        snapshot = self.chart_manager.take_chart_snapshot(self.budget)
+        
+        self.assertEqual(bundle['income_vs_expenses'], self.chart_manager.get_income_vs_expenses_data(self.budget))
+        self.assertEqual(bundle['category_breakdown'], self.chart_manager.get_category_breakdown_data(self.budget))
+        self.assertEqual(bundle['spending_trend'], self.chart_manager.get_spending_trend_data())
+        self.assertEqual(bundle['actual_vs_planned'], self.chart_manager.get_actual_vs_planned_data(self.budget))
+        self.assertEqual(bundle['expense_type_breakdown'], self.chart_manager.get_expense_type_breakdown())
+        self.assertEqual(snapshot.spending[1], 80.0)
+        self.assertEqual(snapshot.expenseTypeTotals[ExpenseType.VARIABLE], (80.0, 1))
+    
+    def test_tooltips_are_precomputed_with_the_charts(self):
+        charts = self.chart_manager.get_all_chart_data(self.budget)
+        tooltips = charts['tooltips']
+        hover = self.chart_manager.handle_chart_hover('actual_vs_planned', 0, {}, self.budget, {'x': 5, 'y': 6})
+        
+        self.assertIs(self.chart_manager.get_chart_tooltips(self.budget), tooltips)
+        self.assertEqual(hover['tooltip']['actual'], '$80.00')
+        self.assertEqual(hover['tooltip']['position'], {'x': 5, 'y': 6})
+        self.assertNotIn('position', tooltips['actual_vs_planned'][0])
+        self.assertEqual(tooltips['category_breakdown'][1]['percentage'], '85.7%')
+        self.assertEqual(tooltips['spending_trend'][-1]['title'], charts['spending_trend']['labels'][-1])
+        self.assertEqual(tooltips['expense_type_breakdown'][1]['amount'], '$80.00')
+        
+        self.transaction_manager.add_transaction(
+            Transaction(2, "user1", 20.0, date.today(), "Store", 1, "", False, None, ExpenseType.VARIABLE))
+        refreshed = self.chart_manager.get_chart_tooltips(self.budget)
+        self.assertIsNot(refreshed, tooltips)
+        self.assertEqual(refreshed['expense_type_breakdown'][1]['amount'], '$100.00')
+    
+    def test_theme_change_rebuilds_tooltips(self):
+        from chart import COLOR_PALETTES, ChartTheme
+        light = self.chart_manager.get_chart_tooltips(self.budget)['category_breakdown'][0]['color']
+        self.chart_manager.update_chart_preferences({'theme': 'dark'})
+        dark = self.chart_manager.get_chart_tooltips(self.budget)['category_breakdown'][0]['color']
+        
+        self.assertNotEqual(dark, light)
+        self.assertEqual(dark, COLOR_PALETTES[ChartTheme.DARK][0])
+    
+    def test_chart_configs_are_cached_and_read_only(self):
+        config = self.chart_manager.get_interactive_chart_config(ChartType.PIE)
+        other = BudgetChartManager(self.budget_manager, self.transaction_manager)
+        
+        self.assertIs(other.get_interactive_chart_config(ChartType.PIE), config)
+        self.assertIn('percentage', config['plugins']['tooltip']['callbacks']['label'])
+        with self.assertRaises(TypeError):
+            config['plugins']['legend']['position'] = 'bottom'
+        self.assertEqual(serializer.dumps(config)[:1], b'{')
+    
+    def test_theme_palettes_are_precomputed(self):
+        from chart import ChartTheme, get_theme_palette
+        self.chart_manager.update_chart_preferences({'theme': ChartTheme.DARK})
+        palette = get_theme_palette(ChartTheme.DARK)
+        style = self.chart_manager.get_category_breakdown_style(12)
+        
+        self.assertEqual(style['backgroundColor'], self.chart_manager.generate_colors(12))
+        self.assertEqual(style['borderColor'], [self.chart_manager.darken_color(color) for color in style['backgroundColor']])
+        self.assertEqual(style['hoverBackgroundColor'], [self.chart_manager.lighten_color(color) for color in style['backgroundColor']])
+        self.assertIs(get_theme_palette(ChartTheme.DARK), palette)
 
 
 class TestDashboardCharts(unittest.TestCase):
@@ -393,6 +546,18 @@ class TestBudgetManagerCharts(unittest.TestCase):
         self.assertEqual(len(chart_data['labels']), 2)
         self.assertEqual(chart_data['period'], 'current_month')
     
+    def test_version_moves_with_writes(self):
+        version = self.manager.version
+        
+        self.manager.get_chart_data()
+        self.assertEqual(self.manager.version, version)
+        self.manager.record_transaction(Transaction(3, "user1", 10.0, date(2025, 10, 6), "Store", 1))
+        self.assertGreater(self.manager.version, version)
+        
+        version = self.manager.version
+        self.manager.record_transactions([Transaction(4, "user1", 10.0, date(2025, 10, 6), "Store", 99)])
+        self.assertEqual(self.manager.version, version)
+    
     def test_get_chart_data_excludes_zero_spending(self):
         cat3 = Category(3, "Savings", "fixed", 500.0, 0.0, 0.0)
         self.manager.add_category(cat3)
@@ -828,5 +993,824 @@ class TestTravelRelatedTransactions(unittest.TestCase):
         self.assertEqual(summary['total_travel_spending'], 0.0)
         self.assertEqual(summary['transaction_count'], 0)
 
+
+class TestTransactionStoreIndexes(unittest.TestCase):
+    
+    def setUp(self):
+        self.manager = TransactionManager()
+        
+        self.manager.add_transaction(
+            Transaction(1, "user1", 40.0, date(2025, 10, 2), "Store", 1, 
+                       "Groceries", False, None, ExpenseType.VARIABLE)
+        )
+        self.manager.add_transaction(
+            Transaction(2, "user2", 900.0, date(2025, 10, 3), "Landlord", 2, 
+                       "Rent", True, None, ExpenseType.FIXED, isTaxRelated=True)
+        )
+        self.manager.add_transaction(
+            Transaction(3, "user1", 60.0, date(2025, 10, 4), "Airline", 3, 
+                       "Flight", False, None, None, isTravelRelated=True)
+        )
+    
+    def test_get_transaction_by_id(self):
+        self.assertEqual(self.manager.get_transaction_by_id(2).payee, "Landlord")
+        self.assertIsNone(self.manager.get_transaction_by_id(999))
+    
+    def test_duplicate_id_rejected(self):
+        with self.assertRaises(ValueError):
+            self.manager.add_transaction(Transaction(1, "user1", 5.0, date(2025, 10, 5), "Dup", 1))
+        
+        self.assertEqual(len(self.manager.transactions), 3)
+    
+    def test_secondary_indexes(self):
+        self.assertEqual([t.transactionID for t in self.manager.get_transactions_by_expense_type(ExpenseType.FIXED)], [2])
+        self.assertEqual([t.transactionID for t in self.manager.get_transactions_by_expense_type(None)], [3])
+        self.assertEqual([t.transactionID for t in self.manager.get_recent_transactions("user1")], [3, 1])
+        self.assertEqual([t.transactionID for t in self.manager.get_tax_related_transactions()], [2])
+    
+    def test_edit_transaction_reindexes(self):
+        success = self.manager.edit_transaction(1, categoryID=3, expenseType=ExpenseType.FIXED)
+        
+        self.assertTrue(success)
+        self.assertEqual(self.manager.get_category_transactions(1), [])
+        self.assertEqual(len(self.manager.get_category_transactions(3)), 2)
+        self.assertEqual(len(self.manager.get_transactions_by_expense_type(ExpenseType.FIXED)), 2)
+        self.assertFalse(self.manager.edit_transaction(999, total=1.0))
+    
+    def test_delete_transaction(self):
+        self.assertTrue(self.manager.delete_transaction(3))
+        
+        self.assertIsNone(self.manager.get_transaction_by_id(3))
+        self.assertEqual(len(self.manager.transactions), 2)
+        self.assertEqual(self.manager.get_travel_transactions(), [])
+        self.assertFalse(self.manager.delete_transaction(3))
+    
+    def test_delete_swaps_in_the_last_transaction(self):
+        self.manager.delete_transaction(1)
+        self.manager.delete_transaction(2)
+        
+        self.assertEqual([t.transactionID for t in self.manager.transactions], [3])
+        self.assertEqual(self.manager.store.positions, {3: 0})
+    
+    def test_expense_type_stats_stay_live(self):
+        stats = self.manager.get_expense_type_stats()
+        
+        self.assertEqual((stats['fixed_count'], stats['variable_count']), (1, 1))
+        self.assertEqual(stats['total_expenses'], 1000.0)
+        self.assertEqual(stats['fixed_percentage'], 90.0)
+        
+        self.manager.add_transaction(Transaction(4, "user1", 100.0, date(2025, 11, 1), "Gym", 4,
+                                                 "", True, None, ExpenseType.FIXED))
+        self.manager.delete_transaction(1)
+        stats = self.manager.get_expense_type_stats()
+        
+        self.assertEqual((stats['fixed_count'], stats['variable_count']), (2, 0))
+        self.assertEqual(stats['fixed_amount'], 1000.0)
+        self.assertEqual(stats['total_expenses'], 1060.0)
+    
+    def test_expense_type_stats_date_range(self):
+        stats = self.manager.get_expense_type_stats(date(2025, 10, 3), date(2025, 10, 4))
+        
+        self.assertEqual(stats['fixed_count'], 1)
+        self.assertEqual(stats['variable_count'], 0)
+        self.assertEqual(stats['total_expenses'], 960.0)
+    
+    def test_compact_transaction_record(self):
+        transaction = Transaction(4, "user1", 19.99, date(2025, 10, 6), "".join(["Land", "lord"]), 2)
+        
+        self.assertEqual(transaction.totalCents, 1999)
+        self.assertEqual(transaction.get_total(), 19.99)
+        self.assertIs(transaction.payee, self.manager.get_transaction_by_id(2).payee)
+        self.assertFalse(hasattr(transaction, '__dict__'))
+        
+        transaction.set_total(0.1 + 0.2)
+        self.assertEqual(transaction.total, 0.3)
+    
+    def test_reindex_after_direct_flag(self):
+        transaction = self.manager.get_transaction_by_id(1)
+        transaction.flag_as_tax_related()
+        self.manager.reindex_transaction(transaction)
+        
+        self.assertEqual(len(self.manager.get_tax_related_transactions()), 2)
+    
+    def test_date_range_uses_date_order(self):
+        self.manager.add_transaction(Transaction(4, "user1", 10.0, date(2025, 9, 30), "Cafe", 1))
+        self.manager.add_transaction(Transaction(5, "user1", 10.0, date(2025, 10, 3), "Cafe", 1))
+        
+        transactions = self.manager.get_transactions_by_date_range(date(2025, 10, 1), date(2025, 10, 3))
+        
+        self.assertEqual([t.transactionID for t in transactions], [1, 2, 5])
+    
+    def test_date_range_after_edit_and_delete(self):
+        self.manager.edit_transaction(3, date=date(2025, 11, 1))
+        self.manager.delete_transaction(2)
+        
+        october = self.manager.get_transactions_by_date_range(date(2025, 10, 1), date(2025, 10, 31))
+        november = self.manager.get_transactions_by_date_range(date(2025, 11, 1), date(2025, 11, 30))
+        
+        self.assertEqual([t.transactionID for t in october], [1])
+        self.assertEqual([t.transactionID for t in november], [3])
+    
+    def test_rollup_follows_edits_and_deletes(self):
+        rollup = self.manager.store.rollup
+        
+        self.assertEqual(rollup.get_category_total(1), (40.0, 1))
+        self.manager.edit_transaction(1, total=55.0, date=date(2025, 11, 2))
+        self.manager.delete_transaction(2)
+        
+        self.assertEqual(rollup.get_category_total(1), (55.0, 1))
+        self.assertEqual(rollup.get_category_total(2), (0.0, 0))
+        self.assertEqual(rollup.get_spending_by_category((2025, 10), (2025, 10)), {3: 60.0})
+        self.assertEqual(rollup.get_spending_by_category((2025, 11), (2025, 11), userID="user1"), {1: 55.0})
+        self.assertEqual(self.manager.get_expense_type_summary()['total_expenses'], 115.0)
+    
+    def test_recent_transactions_follow_inserts_and_deletes(self):
+        self.manager.add_transactions([
+            Transaction(4, "user1", 10.0, date(2025, 9, 1), "Cafe", 1),
+            Transaction(5, "user1", 10.0, date(2025, 12, 1), "Cafe", 1),
+        ])
+        self.manager.add_transaction(Transaction(6, "user1", 10.0, date(2025, 10, 3), "Cafe", 1))
+        self.manager.delete_transaction(5)
+        self.manager.edit_transaction(1, date=date(2025, 11, 1))
+        
+        self.assertEqual([t.transactionID for t in self.manager.get_recent_transactions("user1", 3)], [1, 3, 6])
+        self.assertEqual([t.transactionID for t in self.manager.get_recent_transactions("user1")], [1, 3, 6, 4])
+        self.assertEqual(self.manager.get_recent_transactions("nobody"), [])
+    
+    def test_transactions_page_walks_every_sort(self):
+        self.manager.add_transactions([
+            Transaction(i, "user1", float(i % 7), date(2025, 11, i % 28 + 1), f"Payee {i % 5}", i % 4)
+            for i in range(10, 40)
+        ])
+        
+        for sort_by in ('date', 'amount', 'payee', 'category'):
+            for descending in (True, False):
+                seen = []
+                cursor = None
+                while True:
+                    page, cursor = self.manager.get_transactions_page("user1", sort_by, descending, 7, cursor)
+                    seen.extend(t.transactionID for t in page)
+                    if cursor is None:
+                        break
+                
+                expected = self.manager.store.get_sort_index("user1", sort_by).items
+                self.assertEqual(seen, [t.transactionID for t in (expected[::-1] if descending else expected)])
+                self.assertEqual(len(seen), 32)
+    
+    def test_transactions_page_follows_changes(self):
+        page, cursor = self.manager.get_transactions_page("user1", 'amount', True, 1)
+        self.assertEqual([t.transactionID for t in page], [3])
+        
+        self.manager.edit_transaction(1, total=30.0)
+        self.manager.add_transaction(Transaction(4, "user1", 50.0, date(2025, 10, 5), "Cafe", 1))
+        self.manager.add_transaction(Transaction(5, "user1", 80.0, date(2025, 10, 5), "Cafe", 1))
+        page, cursor = self.manager.get_transactions_page("user1", 'amount', True, 5, cursor)
+        
+        self.assertEqual([t.transactionID for t in page], [4, 1])
+        self.assertIsNone(cursor)
+    
+    def test_transactions_page_rejects_bad_input(self):
+        page, cursor = self.manager.get_transactions_page("user1", 'date', True, 1)
+        
+        with self.assertRaises(ValueError):
+            self.manager.get_transactions_page("user1", 'amount', True, 1, cursor)
+        with self.assertRaises(ValueError):
+            self.manager.get_transactions_page("user1", 'date', True, 1, "not-a-cursor")
+        with self.assertRaises(ValueError):
+            self.manager.get_transactions_page("user1", 'notes')
+    
+    def test_version_moves_with_user_writes(self):
+        before = self.manager.get_version("user1")
+        other = self.manager.get_version("user2")
+        
+        self.manager.edit_transaction(1, notes="Weekly shop")
+        edited = self.manager.get_version("user1")
+        self.manager.get_recent_transactions("user1")
+        self.assertEqual(self.manager.get_version("user1"), edited)
+        self.manager.delete_transaction(3)
+        
+        self.assertLess(before, edited)
+        self.assertLess(edited, self.manager.get_version("user1"))
+        self.assertEqual(self.manager.get_version("user2"), other)
+        self.assertEqual(self.manager.get_version("nobody"), 0)
+    
+    def test_spending_by_category_period_partial_months(self):
+        self.manager.add_transaction(Transaction(4, "user1", 25.0, date(2025, 9, 30), "Cafe", 1))
+        self.manager.add_transaction(Transaction(5, "user1", 15.0, date(2025, 11, 1), "Cafe", 2))
+        
+        self.assertEqual(self.manager.get_spending_by_category_period(date(2025, 9, 30), date(2025, 11, 1)),
+                         {1: 65.0, 2: 915.0, 3: 60.0})
+        self.assertEqual(self.manager.get_spending_by_category_period(date(2025, 10, 3), date(2025, 10, 4)),
+                         {2: 900.0, 3: 60.0})
+    
+    def test_spending_series_follows_writes(self):
+        self.manager.add_transaction(Transaction(4, "user1", 25.0, date(2025, 8, 30), "Cafe", 1))
+        weekly = self.manager.get_spending_series(date(2025, 9, 29), date(2025, 10, 12), 'week', "user1")
+        self.manager.edit_transaction(4, date=date(2025, 10, 6))
+        self.manager.delete_transaction(3)
+        
+        self.assertEqual(weekly['labels'], [date(2025, 9, 29), date(2025, 10, 6)])
+        self.assertEqual(weekly['totals'], [100.0, 0.0])
+        self.assertEqual(self.manager.get_spending_series(date(2025, 8, 1), date(2025, 10, 31))['totals'],
+                         [0.0, 0.0, 965.0])
+        self.assertEqual(self.manager.get_spending_series(date(2025, 9, 29), date(2025, 10, 12), 'week', "user1")['totals'],
+                         [40.0, 25.0])
+        self.assertEqual(self.manager.get_spending_series(date(2025, 10, 1), date(2025, 10, 6), 'day', "user2")['totals'],
+                         [0.0, 0.0, 900.0, 0.0, 0.0, 0.0])
+    
+    def test_spending_series_downsampling(self):
+        series = self.manager.get_spending_series(date(2025, 9, 28), date(2025, 10, 4), 'day', maxPoints=3)
+        
+        self.assertEqual(series['labels'], [date(2025, 9, 28), date(2025, 10, 1), date(2025, 10, 4)])
+        self.assertEqual(series['totals'], [0.0, 940.0, 60.0])
+        with self.assertRaises(ValueError):
+            self.manager.get_spending_series(date(2025, 9, 28), date(2025, 10, 4), 'year')
+        
+        series = self.manager.get_spending_series(date(2025, 9, 28), date(2025, 10, 4), 'day', maxPoints=4, mode='lttb')
+        self.assertEqual(series['labels'], [date(2025, 9, 28), date(2025, 9, 30), date(2025, 10, 3), date(2025, 10, 4)])
+        self.assertEqual(series['totals'], [0.0, 0.0, 900.0, 60.0])
+
+
+class TestTransactionIDAllocator(unittest.TestCase):
+    
+    def setUp(self):
+        self.manager = TransactionManager()
+        self.manager.add_transaction(Transaction(1, "user1", 40.0, date(2025, 10, 2), "Store", 1))
+        self.manager.add_transaction(Transaction(7, "user1", 60.0, date(2025, 10, 4), "Airline", 3))
+    
+    def test_next_id_continues_after_existing_ids(self):
+        self.assertEqual(self.manager.next_transaction_id(), 8)
+        self.assertEqual(self.manager.next_transaction_id(), 9)
+    
+    def test_ids_not_reused_after_delete(self):
+        self.manager.delete_transaction(7)
+        
+        self.assertEqual(self.manager.next_transaction_id(), 8)
+    
+    def test_reserve_block(self):
+        block = self.manager.reserve_transaction_ids(3)
+        
+        self.assertEqual(list(block), [8, 9, 10])
+        self.assertEqual(self.manager.next_transaction_id(), 11)
+    
+    def test_concurrent_ids_unique(self):
+        import threading
+        allocator = TransactionIDAllocator()
+        issued = []
+        
+        def worker():
+            ids = [allocator.next_id() for _ in range(500)]
+            ids.extend(allocator.reserve(50))
+            issued.extend(ids)
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(issued), 8 * 550)
+        self.assertEqual(len(set(issued)), len(issued))
+
+
+class TestConcurrentManagers(unittest.TestCase):
+    
+    def setUp(self):
+        self.manager = TransactionManager()
+        self.budget_manager = BudgetManager()
+        self.budget_manager.add_category(Category(1, "Groceries", "variable", 1e9, 0.0, None))
+    
+    def test_no_lost_updates(self):
+        import contextlib
+        import threading
+        
+        def worker():
+            for _ in range(200):
+                transaction = Transaction(self.manager.next_transaction_id(), "user1", 1.25, date(2025, 10, 2), "Store", 1)
+                self.manager.add_transaction(transaction)
+                self.budget_manager.record_transaction(transaction)
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            threads = [threading.Thread(target=worker) for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        self.assertEqual(len(self.manager.transactions), 1200)
+        self.assertEqual(self.budget_manager.get_spending_snapshot(), {1: 1500.0})
+        self.assertEqual(self.manager.get_spending_by_category_period(date(2025, 10, 1), date(2025, 10, 31)), {1: 1500.0})
+    
+    def test_lock_is_reentrant(self):
+        with self.manager.lock.write_locked():
+            self.manager.add_transaction(Transaction(1, "user1", 5.0, date(2025, 10, 2), "Store", 1))
+            self.assertEqual(len(self.manager.get_recent_transactions("user1")), 1)
+        
+        with self.manager.lock.read_locked():
+            self.assertIsNotNone(self.manager.get_transaction_by_id(1))
+            with self.assertRaises(RuntimeError):
+                self.manager.delete_transaction(1)
+
+
+class TestUserStateRegistry(unittest.TestCase):
+    
+    def setUp(self):
+        self.loaded = []
+        self.registry = UserStateRegistry(self.load, maxUsers=2, maxTransactions=4)
+    
+    def load(self, userID):
+        self.loaded.append(userID)
+        transactions = [Transaction(len(self.loaded) * 100 + i, userID, 10.0, date(2025, 10, 1), "Store", 1)
+                        for i in range(2)]
+        return UserState(userID, transactions=transactions)
+    
+    def test_loads_lazily_once(self):
+        first = self.registry.get("alice")
+        
+        self.assertIs(self.registry.get("alice"), first)
+        self.assertEqual(self.loaded, ["alice"])
+        self.assertEqual(first.dashboard.get_recent_transaction(5)[0].userID, "alice")
+    
+    def test_evicts_least_recently_used(self):
+        self.registry.get("alice")
+        self.registry.get("bob")
+        self.registry.get("alice")
+        self.registry.get("carol")
+        
+        self.assertEqual(list(self.registry.states), ["alice", "carol"])
+        self.assertEqual(self.registry.get_stats()['evictions'], 1)
+    
+    def test_evicts_over_transaction_cap(self):
+        alice = self.registry.get("alice")
+        alice.transactionManager.add_transaction(
+            Transaction(999, "alice", 1.0, date(2025, 10, 2), "Cafe", 1))
+        alice.mark_saved()
+        self.registry.get("bob")
+        
+        self.assertEqual(list(self.registry.states), ["bob"])
+        self.registry.get("alice")
+        self.assertEqual(self.loaded, ["alice", "bob", "alice"])
+    
+    def test_keeps_unsaved_and_active_users(self):
+        alice = self.registry.get("alice")
+        alice.transactionManager.add_transaction(
+            Transaction(999, "alice", 1.0, date(2025, 10, 2), "Cafe", 1))
+        bob = self.registry.acquire("bob")
+        self.registry.get("carol")
+        
+        self.assertTrue(alice.has_unsaved_writes())
+        self.assertEqual(list(self.registry.states), ["alice", "bob", "carol"])
+        self.assertEqual(self.registry.get_stats()['unsaved'], 1)
+        
+        self.registry.release(bob)
+        alice.mark_saved()
+        self.registry.get("dave")
+        self.assertEqual(list(self.registry.states), ["carol", "dave"])
+
+
+class TestResponseCache(unittest.TestCase):
+    
+    def setUp(self):
+        self.cache = ResponseCache(maxEntries=2, maxBytes=10)
+    
+    def test_hit_only_for_same_version(self):
+        self.cache.put(("user1", "/api/dashboard", ()), "v1", b"{}", "application/json")
+        
+        self.assertEqual(self.cache.get(("user1", "/api/dashboard", ()), "v1"), (b"{}", "application/json"))
+        self.assertIsNone(self.cache.get(("user1", "/api/dashboard", ()), "v2"))
+        self.assertIsNone(self.cache.get(("user1", "/api/dashboard", ()), "v1"))
+        
+        stats = self.cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stale']), (1, 2, 1))
+    
+    def test_lru_bounds(self):
+        self.cache.put(("user1", "a", ()), "v1", b"1234", "application/json")
+        self.cache.put(("user1", "b", ()), "v1", b"1234", "application/json")
+        self.cache.get(("user1", "a", ()), "v1")
+        self.cache.put(("user2", "c", ()), "v1", b"1234", "application/json")
+        self.cache.put(("user2", "d", ()), "v1", b"12345678901", "application/json")
+        
+        self.assertEqual([key[1] for key in self.cache.entries], ["a", "c"])
+        self.assertEqual(self.cache.get_stats()['bytes'], 8)
+        self.assertEqual(self.cache.invalidate_user("user1"), 1)
+
+
+@unittest.skipUnless(importlib.util.find_spec("flask_cors"), "flask_cors is not installed")
+class TestCachedEndpoints(unittest.TestCase):
+    
+    def setUp(self):
+        import app
+        self.api = app
+        self.client = app.app.test_client()
+        with self.client.session_transaction() as session:
+            session['userID'] = 'user1'
+        self.category = app.userStates.get('user1').budget.getCategoryByID(1)
+        #the demo user is shared with every other test that imports app
+        self.saved = (self.category.categoryLimit, self.category.plannedAmnt, self.category.plannedPercentage)
+    
+    def tearDown(self):
+        import contextlib
+        limit, plannedAmnt, plannedPercentage = self.saved
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.category.editLimit(limit)
+            self.category.editCategory(plannedAmnt=plannedAmnt, plannedPercentage=plannedPercentage)
+    
+    def get(self, path):
+        first = self.client.get(path)
+        #the second request is answered from the response cache
+        cached = self.client.get(path)
+        self.assertEqual(cached.get_json(), first.get_json())
+        return first
+    
+    def test_category_edits_refresh_cached_responses(self):
+        dashboard = self.get('/api/dashboard')
+        budgets = self.get('/api/budgets')
+        
+        self.category.editLimit(self.category.categoryLimit + 50)
+        self.assertEqual(self.client.get('/api/dashboard', headers={'If-None-Match': dashboard.headers['ETag']}).status_code, 200)
+        self.assertEqual(self.get('/api/dashboard').get_json()['budgets'][0]['total'], self.category.categoryLimit)
+        
+        self.category.setPlannedAmnt(self.category.plannedAmnt + 25)
+        self.assertEqual(self.client.get('/api/budgets', headers={'If-None-Match': budgets.headers['ETag']}).status_code, 200)
+        self.assertEqual(self.get('/api/budgets').get_json()['categories'][0]['plannedAmnt'], self.category.plannedAmnt)
+        
+        unchanged = self.client.get('/api/budgets', headers={'If-None-Match': self.get('/api/budgets').headers['ETag']})
+        self.assertEqual(unchanged.status_code, 304)
+    
+    def test_cache_stats_only_for_admins(self):
+        self.assertEqual(self.client.get('/api/cache-stats').status_code, 403)
+        
+        self.api.adminUserIDs.add('user1')
+        try:
+            self.assertIn('responses', self.client.get('/api/cache-stats').get_json())
+        finally:
+            self.api.adminUserIDs.discard('user1')
+    
+    def test_cors_allows_only_frontend_origins(self):
+        allowed = self.client.get('/api/budgets', headers={'Origin': self.api.frontendOrigins[0]})
+        foreign = self.client.get('/api/budgets', headers={'Origin': 'https://evil.example'})
+        
+        self.assertEqual(allowed.headers['Access-Control-Allow-Origin'], self.api.frontendOrigins[0])
+        self.assertNotIn('Access-Control-Allow-Origin', foreign.headers)
+        self.assertNotIn('Access-Control-Allow-Credentials', foreign.headers)
+    
+    def test_batch_reports_overflowing_rows(self):
+        response = self.client.post('/api/transactions/batch', json={'transactions': [
+            {'amount': "1e400", 'date': "2025-10-03", 'payee': "Kroger"},
+            {'amount': 5.0, 'date': "2025-10-03", 'payee': "Kroger", 'categoryID': 1e400},
+        ]})
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['results'][0]['error'], "Amount is not a finite number: 1e400")
+        self.assertIn('error', response.get_json()['results'][1])
+
+
+@unittest.skipUnless(importlib.util.find_spec("flask_cors"), "flask_cors is not installed")
+class TestDatabaseBackedApi(unittest.TestCase):
+    
+    def setUp(self):
+        import os
+        import bcrypt
+        from unittest.mock import MagicMock, patch
+        self.cursor = MagicMock()
+        #MAX(idbankTransaction), then the bankUser row of the login
+        self.cursor.fetchone.side_effect = [(100,), (7, bcrypt.hashpw(b"secret", bcrypt.gensalt(4)).decode())]
+        self.cursor.fetchall.return_value = []
+        connection = MagicMock()
+        connection.cursor.return_value = self.cursor
+        
+        #a separate copy of the app module, configured for a database
+        spec = importlib.util.spec_from_file_location("database_app", os.path.join(os.path.dirname(serializer.__file__), "app.py"))
+        self.api = importlib.util.module_from_spec(spec)
+        with patch.dict(os.environ, {'BANK_DB_NAME': "banking_db"}), patch('mysql.connector.connect', return_value=connection):
+            spec.loader.exec_module(self.api)
+        self.client = self.api.app.test_client()
+    
+    def test_logs_in_bank_users_and_saves_their_writes(self):
+        login = self.client.post('/api/login', json={'email': "user@example.com", 'password': "secret"})
+        self.assertEqual(login.get_json()['userID'], "7")
+        
+        added = self.client.post('/api/transactions', json={'amount': 12.5, 'date': "2025-10-03", 'payee': "Kroger"})
+        
+        self.assertEqual(added.get_json()['id'], 101)
+        self.assertEqual(self.cursor.executemany.call_args[0][1][0][:3], (101, "7", 12.5))
+        state = self.api.userStates.states["7"]
+        self.assertEqual(len(state.transactionManager.transactions), 1)
+        self.assertFalse(state.has_unsaved_writes())
+    
+    def test_rejects_wrong_password(self):
+        login = self.client.post('/api/login', json={'email': "user@example.com", 'password': "wrong"})
+        
+        self.assertEqual(login.status_code, 401)
+        self.assertEqual(self.client.get('/api/dashboard').status_code, 401)
+
+
+class TestSerializer(unittest.TestCase):
+    
+    def test_encoders_handle_api_types(self):
+        from decimal import Decimal
+        import json
+        payload = {
+            'date': date(2025, 10, 2),
+            'expenseType': ExpenseType.FIXED,
+            'amount': Decimal("12.50"),
+            'by_category': {1: 40.0, 2: 900.0},
+            'none': None
+        }
+        
+        for name, encode in serializer.ENCODERS.items():
+            self.assertEqual(json.loads(encode(payload)), {
+                'date': "2025-10-02",
+                'expenseType': "fixed",
+                'amount': 12.5,
+                'by_category': {'1': 40.0, '2': 900.0},
+                'none': None
+            }, name)
+    
+    def test_encoders_agree(self):
+        from decimal import Decimal
+        payload = {
+            'by_type': {ExpenseType.FIXED: 1100.0, ExpenseType.VARIABLE: float('nan')},
+            'by_day': {date(2025, 10, 2): [float('inf'), Decimal("2.50"), (1, -float('inf'))]},
+            'flags': {None: 1, True: 2, 1.5: 3}
+        }
+        expected = (b'{"by_type":{"fixed":1100.0,"variable":null},"by_day":{"2025-10-02":[null,2.5,[1,null]]},'
+                    b'"flags":{"null":1,"true":2,"1.5":3}}')
+        
+        for name, encode in serializer.ENCODERS.items():
+            self.assertEqual(encode(payload), expected, name)
+    
+    def test_unknown_types_rejected(self):
+        for encode in serializer.ENCODERS.values():
+            with self.assertRaises(TypeError):
+                encode({'transaction': object()})
+        with self.assertRaises(ValueError):
+            serializer.get_encoder('yaml')
+
+
+class TestTransactionImport(unittest.TestCase):
+    
+    def setUp(self):
+        self.manager = TransactionManager()
+        self.budget_manager = BudgetManager()
+        self.budget_manager.add_category(Category(1, "Groceries", "variable", 300.0, 0.0, None))
+        self.budget_manager.add_category(Category(2, "Rent", "fixed", 1200.0, 0.0, None))
+        self.importer = TransactionImporter(self.manager, self.budget_manager, chunkSize=2)
+    
+    def test_import_csv(self):
+        csv_data = io.StringIO(
+            "date,amount,payee,categoryID,expenseType\n"
+            "2025-10-03,45.10,Kroger,1,variable\n"
+            "2025-10-01,1100.00,Landlord,2,fixed\n"
+            "2025-10-02,not-a-number,Cafe,1,\n"
+            "2025-10-04,12.40,Kroger,1,\n"
+        )
+        
+        result = self.importer.import_rows(iter_csv_rows(csv_data), "user1")
+        
+        self.assertEqual(result['imported'], 3)
+        self.assertEqual(result['failed'], 1)
+        self.assertEqual(result['errors'][0]['line'], 4)
+        self.assertIn('rows_per_sec', result)
+        self.assertEqual(self.budget_manager.spending, {1: 57.5, 2: 1100.0})
+        self.assertEqual([t.payee for t in self.manager.get_transactions_by_date_range(date(2025, 10, 1), date(2025, 10, 31))],
+                         ["Landlord", "Kroger", "Kroger"])
+    
+    def test_import_batch_all_or_nothing(self):
+        rows = [
+            {'amount': 20.0, 'date': "2025-10-03", 'payee': "Kroger", 'categoryID': 1, 'clientID': "a"},
+            {'amount': 30.0, 'date': "2025-10-04", 'payee': "Kroger", 'categoryID': 1},
+            {'amount': 5.0, 'payee': "Cafe", 'categoryID': 1},
+        ]
+        
+        result = self.importer.import_batch(rows, "user1")
+        self.assertFalse(result['applied'])
+        self.assertEqual(result['results'][2], {'index': 2, 'error': "Missing date"})
+        self.assertEqual(len(self.manager.transactions), 0)
+        self.assertEqual(self.budget_manager.spending[1], 0.0)
+        
+        result = self.importer.import_batch(rows[:2], "user1")
+        self.assertTrue(result['applied'])
+        self.assertEqual(result['results'], [{'index': 0, 'clientID': "a", 'id': 1}, {'index': 1, 'id': 2}])
+        self.assertEqual(self.budget_manager.spending[1], 50.0)
+    
+    def test_import_jsonl(self):
+        jsonl_data = io.StringIO(
+            '{"date": "2025-10-05", "amount": 20, "payee": "Target", "categoryID": 1, "isTaxRelated": true}\n'
+            '\n'
+            '{"date": "2025-10-06", "payee": "Missing amount"}\n'
+        )
+        
+        result = self.importer.import_rows(iter_jsonl_rows(jsonl_data), "user1")
+        
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(result['errors'], [{'line': 3, 'error': 'Missing amount'}])
+        self.assertEqual(len(self.manager.get_tax_related_transactions()), 1)
+    
+    def test_import_reports_overflowing_rows(self):
+        jsonl_data = io.StringIO(
+            '{"date": "2025-10-05", "amount": "inf", "payee": "Target"}\n'
+            '{"date": "2025-10-05", "amount": "1e400", "payee": "Target"}\n'
+            '{"date": "2025-10-05", "amount": 20, "payee": "Target", "categoryID": 1e400}\n'
+            '{"date": "2025-10-06", "amount": 20, "payee": "Target"}\n'
+        )
+        
+        result = self.importer.import_rows(iter_jsonl_rows(jsonl_data), "user1")
+        
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual([error['line'] for error in result['errors']], [1, 2, 3])
+        self.assertEqual(result['errors'][1]['error'], "Amount is not a finite number: 1e400")
+    
+    def test_import_ofx_skips_credits(self):
+        ofx_data = io.StringIO(
+            "<OFX><BANKTRANLIST>\n"
+            "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20251007120000<TRNAMT>-64.25<NAME>Shell<MEMO>Fuel\n"
+            "</STMTTRN>\n"
+            "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20251008<TRNAMT>2500.00<NAME>Payroll</STMTTRN>\n"
+            "</BANKTRANLIST></OFX>\n"
+        )
+        
+        result = self.importer.import_rows(iter_ofx_rows(ofx_data), "user1")
+        
+        self.assertEqual(result['imported'], 1)
+        transaction = self.manager.transactions[0]
+        self.assertEqual((transaction.payee, transaction.total, transaction.date), ("Shell", 64.25, date(2025, 10, 7)))
+        self.assertEqual(transaction.notes, "Fuel")
+
+
+class TestTransactionExport(unittest.TestCase):
+    
+    def setUp(self):
+        self.manager = TransactionManager()
+        self.manager.add_transactions([
+            Transaction(i, "user1", float(i), date(2025, 10, i), f"Payee {i}", i % 2 + 1, "", False, None,
+                        ExpenseType.FIXED if i % 3 == 0 else None, isTaxRelated=i % 4 == 0)
+            for i in range(1, 11)
+        ])
+        self.manager.add_transaction(Transaction(11, "user2", 99.0, date(2025, 10, 5), "Other", 1))
+    
+    def test_iter_transactions_filters_in_chunks(self):
+        ids = lambda **filters: [t.transactionID for t in self.manager.iter_transactions("user1", chunkSize=3, **filters)]
+        
+        self.assertEqual(ids(), list(range(1, 11)))
+        self.assertEqual(ids(start_date=date(2025, 10, 4), end_date=date(2025, 10, 8)), [4, 5, 6, 7, 8])
+        self.assertEqual(ids(categoryID=1, end_date=date(2025, 10, 6)), [2, 4, 6])
+        self.assertEqual(ids(taxRelated=True), [4, 8])
+        self.assertEqual(ids(start_date=date(2025, 11, 1)), [])
+    
+    def test_csv_export_imports_back(self):
+        exported = b"".join(iter_csv(self.manager.iter_transactions("user1"), chunkRows=4)).decode()
+        copy = TransactionManager()
+        
+        result = TransactionImporter(copy).import_rows(iter_csv_rows(io.StringIO(exported)), "user1")
+        
+        self.assertEqual(result['imported'], 10)
+        self.assertEqual([(t.total, t.date, t.expenseType, t.isTaxRelated) for t in copy.iter_transactions("user1")],
+                         [(t.total, t.date, t.expenseType, t.isTaxRelated) for t in self.manager.iter_transactions("user1")])
+    
+    def test_ndjson_export(self):
+        chunks = list(iter_ndjson(self.manager.iter_transactions("user1", categoryID=2), chunkRows=2))
+        lines = b"".join(chunks).splitlines()
+        
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(lines), 5)
+        self.assertIn(b'"date":"2025-10-03"', lines[1])
+        self.assertIn(b'"expenseType":"fixed"', lines[1])
+
+
+
+class TestDownsample(unittest.TestCase):
+    
+    def setUp(self):
+        self.values = [10] * 100
+        self.values[37] = 500
+        self.values[80] = 0
+    
+    def test_every_mode_respects_the_point_budget(self):
+        for mode in DOWNSAMPLERS:
+            for maxPoints in (1, 2, 3, 7, 20):
+                positions, values = downsample(self.values, maxPoints, mode)
+                
+                self.assertLessEqual(len(positions), maxPoints, mode)
+                self.assertEqual(positions, sorted(set(positions)), mode)
+        self.assertEqual(downsample(self.values[:5], 20, 'lttb'), ([0, 1, 2, 3, 4], self.values[:5]))
+    
+    def test_modes_keep_totals_or_extremes(self):
+        positions, totals = downsample(self.values, 10, 'sum')
+        self.assertEqual(sum(totals), sum(self.values))
+        self.assertEqual(positions[:2], [0, 10])
+        
+        positions, values = downsample(self.values, 10, 'minmax')
+        self.assertIn(500, values)
+        self.assertIn(0, values)
+        
+        positions, values = downsample(self.values, 10, 'lttb')
+        self.assertEqual((positions[0], positions[-1]), (0, 99))
+        self.assertIn(37, positions)
+        self.assertIn(80, positions)
+    
+    def test_rejects_bad_arguments(self):
+        with self.assertRaises(ValueError):
+            downsample(self.values, 10, 'average')
+        with self.assertRaises(ValueError):
+            downsample(self.values, 0)
+
+
+class TestChartRenderer(unittest.TestCase):
+    
+    def setUp(self):
+        import contextlib
+        import tempfile
+        from chartRenderer import ChartImageCache
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ChartImageCache(self.directory.name)
+        self.budget_manager = BudgetManager()
+        self.budget = Budget(1, "user1", "October", 1500.0, "October", 3000.0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for category in [Category(1, "Groceries & Food", "Food", 300, 200, None), Category(2, "Rent", "Housing", 1200, 1200, None)]:
+                self.budget.addCategory(category)
+                self.budget_manager.add_category(category)
+        self.chart_manager = BudgetChartManager(self.budget_manager, TransactionManager())
+    
+    def tearDown(self):
+        self.directory.cleanup()
+    
+    def test_every_chart_renders_as_svg(self):
+        import xml.etree.ElementTree as ElementTree
+        for name, chart in self.chart_manager.get_chart_bundle(self.budget).items():
+            image, mimetype = self.cache.get_or_render(name, chart)
+            
+            self.assertEqual(mimetype, 'image/svg+xml')
+            self.assertTrue(ElementTree.fromstring(image).tag.endswith('svg'), name)
+        self.assertIn(b'Groceries &amp; Food', self.cache.get_or_render('category_breakdown', self.chart_manager.get_category_breakdown_data(self.budget))[0])
+    
+    def test_cache_is_keyed_by_content_and_theme(self):
+        from chart import ChartTheme
+        chart = self.chart_manager.get_category_breakdown_data(self.budget)
+        first = self.cache.get_or_render('category_breakdown', chart)
+        again = self.cache.get_or_render('category_breakdown', {'labels': chart['labels'], 'data': [chart['datasets'][0]['data']]})
+        dark = self.cache.get_or_render('category_breakdown', chart, ChartTheme.DARK)
+        
+        self.assertEqual(again, first)
+        self.assertNotEqual(dark, first)
+        self.assertEqual(self.cache.get_stats()['hits'], 1)
+        self.assertEqual(self.cache.get_stats()['misses'], 2)
+        with self.assertRaises(ValueError):
+            self.cache.get_or_render('category_breakdown', chart, fileFormat='gif')
+    
+    def test_statement_email_embeds_charts(self):
+        from chartRenderer import STATEMENT_CHARTS, render_statement_charts
+        from BankEmail import build_statement_message
+        images = render_statement_charts(self.chart_manager, self.budget, self.cache, 'svg')
+        message = build_statement_message("user@example.com", "October statement", "Your statement\nis ready", images)
+        
+        self.assertEqual(list(images), list(STATEMENT_CHARTS))
+        parts = message.get_payload()
+        self.assertEqual([part['Content-ID'] for part in parts[1:]], [f"<{name}>" for name in STATEMENT_CHARTS])
+        html = parts[0].get_payload()[1].get_payload()
+        self.assertIn('cid:spending_trend', html)
+        self.assertTrue(html.startswith('<html><body><p>Your statement<br>is ready</p><p><img '))
+
+
+@unittest.skipUnless(importlib.util.find_spec("numpy"), "numpy is not installed")
+class TestColumnarTransactionStore(unittest.TestCase):
+    
+    def setUp(self):
+        from columnarStore import ColumnarTransactionStore
+        
+        self.manager = TransactionManager(store=ColumnarTransactionStore(capacity=2))
+        self.manager.add_transaction(
+            Transaction(1, "user1", 120.25, date(2025, 10, 5), "Grocery Store", 1,
+                       "Groceries", False, None, ExpenseType.VARIABLE, isTaxRelated=True)
+        )
+        self.manager.add_transaction(
+            Transaction(2, "user1", 900.0, date(2025, 10, 1), "Landlord", 2,
+                       "Rent", True, None, ExpenseType.FIXED)
+        )
+        self.manager.add_transaction(
+            Transaction(3, "user1", 310.5, date(2025, 9, 20), "Hotel", 3,
+                       "Trip", False, None, ExpenseType.VARIABLE, isTravelRelated=True)
+        )
+    
+    def test_spending_by_category_period(self):
+        spending = self.manager.get_spending_by_category_period(date(2025, 10, 1), date(2025, 10, 31))
+        
+        self.assertEqual(spending, {1: 120.25, 2: 900.0})
+    
+    def test_expense_type_stats(self):
+        stats = self.manager.get_expense_type_stats()
+        
+        self.assertEqual(stats['fixed_amount'], 900.0)
+        self.assertEqual(stats['variable_amount'], 430.75)
+        self.assertEqual(stats['variable_count'], 2)
+    
+    def test_columns_follow_edits_and_deletes(self):
+        self.manager.edit_transaction(1, total=20.0, categoryID=3)
+        self.manager.delete_transaction(2)
+        
+        self.assertEqual(self.manager.get_tax_summary(2025)['category_breakdown'][3]['total'], 20.0)
+        self.assertEqual(self.manager.get_travel_summary()['total_travel_spending'], 310.5)
+        self.assertEqual(self.manager.get_expense_type_summary()[ExpenseType.FIXED], 0.0)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file